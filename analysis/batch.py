@@ -0,0 +1,106 @@
+"""
+analysis/batch.py
+
+Runs the analysis sections for many tickers without a UI and collects the
+results into one tidy table (ticker, section, metric, period, value).
+"""
+
+import pandas as pd
+
+from analysis.ratios import ratio_history
+from analysis.growth import growth_panel, CAGR_YEARS
+from analysis.valuation import get_valuation_metrics
+from analysis.performance import calculate_efficiency_metrics, calculate_stock_metrics
+from data.fetcher import get_price_histories, select_ticker
+from data.scheduler import prefetch, STATEMENT_FIELDS
+from data.snapshot import TickerSnapshot
+
+SECTIONS = ["ratios", "growth", "valuation", "stock", "efficiency"]
+
+
+def _period_label(period):
+    """periods are dates (ratios, quarterly and TTM statements) or years (annual growth, efficiency); store as text so every format can hold them"""
+    return period.strftime("%Y-%m-%d") if hasattr(period, "strftime") else str(period)
+
+
+def _series_rows(ticker, section, metric, series):
+    """one row per period of a metric series"""
+    if series is None:
+        return []
+    return [(ticker, section, metric, _period_label(period), value) for period, value in series.items()]
+
+
+def section_rows(snapshot: TickerSnapshot, section, prices=None):
+    """Compute one analysis section for a loaded snapshot, as (ticker, section, metric, period, value) rows."""
+    ticker = snapshot.ticker
+    rows = []
+
+    if section == "ratios":
+        history = ratio_history(snapshot.financials, snapshot.balance_sheet)
+        for metric in history.columns:
+            rows += _series_rows(ticker, section, metric, history[metric].dropna())
+
+    elif section == "growth":
+        panel = growth_panel({ticker: (snapshot.financials, snapshot.cashflow)})
+        for label in panel["value"].columns.get_level_values("label"):
+            for measure, metric in [("value", label), ("growth", f"{label} Growth"),
+                                    ("cagr", f"{label} {CAGR_YEARS}Y CAGR"), ("acceleration", f"{label} Acceleration")]:
+                rows += _series_rows(ticker, section, metric, panel[measure][(label, ticker)].dropna())
+
+    elif section == "valuation":
+        for metric, data in get_valuation_metrics(snapshot.info).items():
+            rows.append((ticker, section, metric, None, data.value))
+
+    elif section == "stock":
+        if prices is not None and not prices.empty:
+            for metric, data in calculate_stock_metrics(prices).items():
+                rows.append((ticker, section, metric, None, data.value))
+
+    elif section == "efficiency":
+        metrics = calculate_efficiency_metrics(snapshot.cashflow, snapshot.financials, snapshot.balance_sheet)
+        for metric, series in metrics.items():
+            rows += _series_rows(ticker, section, metric, series)
+
+    else:
+        raise ValueError(f"Unknown section '{section}', expected one of {', '.join(SECTIONS)}")
+
+    return rows
+
+
+def analyze(tickers, sections=SECTIONS, frequency="annual"):
+    """
+    Fetch data for every ticker concurrently and run the requested sections, on annual,
+    quarterly or trailing-twelve-month statements (frequency, see data/periods.py).
+    Returns a tidy DataFrame; tickers that failed are listed in result.attrs["failed"] and
+    statement labels outside the line-item schema in result.attrs["unmapped"].
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    snapshots = [TickerSnapshot(t, compact=True, frequency=frequency) for t in tickers]
+
+    fields = ["info"] + (STATEMENT_FIELDS if set(sections) - {"valuation", "stock"} else [])
+    failed = prefetch(snapshots, fields)
+    histories = get_price_histories([t for t in tickers if t not in failed]) if "stock" in sections else None
+
+    rows = []
+    for snapshot in snapshots:
+        if snapshot.ticker in failed:
+            continue
+        if not snapshot.exists():
+            failed[snapshot.ticker] = "ticker not found"
+            continue
+
+        prices = None
+        if histories is not None and snapshot.ticker in histories.columns.get_level_values("Ticker"):
+            prices = select_ticker(histories, snapshot.ticker)
+
+        for section in sections:
+            try:
+                rows += section_rows(snapshot, section, prices)
+            except Exception as e:
+                failed[snapshot.ticker] = f"{section}: {e}"
+
+    result = pd.DataFrame(rows, columns=["ticker", "section", "metric", "period", "value"])
+    result["value"] = pd.to_numeric(result["value"], errors="coerce")
+    result.attrs["failed"] = failed
+    result.attrs["unmapped"] = {s.ticker: s.unmapped_labels() for s in snapshots if s.unmapped_labels()}
+    return result
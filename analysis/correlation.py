@@ -0,0 +1,127 @@
+"""
+analysis/correlation.py
+
+Cross-asset statistics for a set of tickers: aligned daily returns,
+correlation and covariance matrices and rolling correlation, computed with
+a few matrix products rather than one pass per pair.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.memo import memoize
+
+# fewest overlapping returns for a pair's correlation or covariance to be reported
+MIN_PERIODS = 20
+
+# rolling correlation window in trading days (about three months)
+ROLLING_WINDOW = 63
+
+
+def returns_matrix(closes):
+    """
+    Daily returns (dates x tickers) from a wide close-price frame, e.g.
+    get_price_histories(...)["Close"]. Each return is taken against the ticker's
+    previous bar, so a day one exchange is closed neither leaves a gap in the
+    other tickers nor turns into a two-day return for the closed one. Days a
+    ticker has no bar are NaN.
+    """
+    close = closes.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(close)
+    rows = np.arange(len(close))[:, None]
+    last_seen = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+
+    # previous bar of each row = the close at the last valid row before it
+    before = np.vstack([np.full((1, close.shape[1]), -1), last_seen[:-1]])
+    previous = np.take_along_axis(close, np.maximum(before, 0), axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.where(valid & (before >= 0), close / previous - 1, np.nan)
+    return pd.DataFrame(returns, index=closes.index, columns=closes.columns)
+
+
+def _pairwise_moments(returns):
+    """
+    Pairwise-complete sums for every pair of columns, as (count, sum_x, sum_y, sum_xx, sum_yy, sum_xy)
+    matrices where entry (i, j) only uses the days both i and j have a return.
+    """
+    values = returns.to_numpy(dtype=np.float64, na_value=np.nan)
+    mask = (~np.isnan(values)).astype(np.float64)
+    x = np.where(mask > 0, values, 0.0)
+
+    # centering each column first keeps the sums of squares numerically stable
+    x -= (x.sum(axis=0) / np.maximum(mask.sum(axis=0), 1)) * mask
+    count = mask.T @ mask
+    sum_x = x.T @ mask
+    sum_xx = (x * x).T @ mask
+    sum_xy = x.T @ x
+    return count, sum_x, sum_x.T, sum_xx, sum_xx.T, sum_xy
+
+
+def covariance_matrix(returns, min_periods=MIN_PERIODS):
+    """sample covariance of every pair of columns over the days both have returns (like DataFrame.cov)"""
+    count, sum_x, sum_y, _, _, sum_xy = _pairwise_moments(returns)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = (sum_xy - sum_x * sum_y / count) / (count - 1)
+    cov[count < max(min_periods, 2)] = np.nan
+    return pd.DataFrame(cov, index=returns.columns, columns=returns.columns)
+
+
+def correlation_matrix(returns, min_periods=MIN_PERIODS):
+    """Pearson correlation of every pair of columns over the days both have returns (like DataFrame.corr)"""
+    count, sum_x, sum_y, sum_xx, sum_yy, sum_xy = _pairwise_moments(returns)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sum_xy - sum_x * sum_y / count
+        var_x = sum_xx - sum_x ** 2 / count
+        var_y = sum_yy - sum_y ** 2 / count
+        corr = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+    corr[count < max(min_periods, 2)] = np.nan
+    return pd.DataFrame(corr, index=returns.columns, columns=returns.columns)
+
+
+def rolling_correlation(returns, base, window=ROLLING_WINDOW):
+    """
+    Rolling correlation of every column with the `base` column over `window` trading days
+    (dates x tickers), from windowed differences of cumulative sums. A window needs
+    `window` days on which both tickers have returns, as with pandas' rolling().corr().
+    """
+    values = returns.to_numpy(dtype=np.float64, na_value=np.nan)
+    x = values[:, [returns.columns.get_loc(base)]]
+    both = ~np.isnan(values) & ~np.isnan(x)
+    x = np.where(both, x, 0.0)
+    y = np.where(both, values, 0.0)
+
+    def windowed(a):
+        total = np.cumsum(np.vstack([np.zeros((1, a.shape[1])), a]), axis=0)
+        return total[window:] - total[:-window]
+
+    count = windowed(both.astype(np.float64))
+    sum_x, sum_y = windowed(x), windowed(y)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = windowed(x * y) - sum_x * sum_y / count
+        var_x = windowed(x * x) - sum_x ** 2 / count
+        var_y = windowed(y * y) - sum_y ** 2 / count
+        corr = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+    corr[count < window] = np.nan
+
+    rolled = np.full(values.shape, np.nan)
+    rolled[window - 1:] = corr
+    return pd.DataFrame(rolled, index=returns.index, columns=returns.columns).drop(columns=base)
+
+
+@memoize
+def correlation_stats(closes, window=ROLLING_WINDOW):
+    """
+    Returns, correlation, covariance and rolling correlation with the first ticker for a wide
+    close-price frame, as a dict of DataFrames.
+
+    Memoized on the closes' fingerprint (registered when the prices are fetched, so a refresh or
+    a dividend back-adjustment is a new key), and callers get their own copy of the result.
+    """
+    returns = returns_matrix(closes)
+    base = closes.columns[0]
+    return {
+        "returns": returns,
+        "correlation": correlation_matrix(returns),
+        "covariance": covariance_matrix(returns),
+        "rolling": rolling_correlation(returns, base, window),
+    }
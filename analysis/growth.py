@@ -3,11 +3,27 @@ analysis/growth.py
 
 Handles revenue and net income growth visualizations.
 Includes Plotly line charts and commentary modules for trend analysis.
+growth_panel computes every growth label for every compared ticker at once.
 """
 
+from collections import defaultdict
+
+import numpy as np
 import pandas as pd
-import streamlit as st
+
+from utils.memo import memoize
 from analysis.performance import calculate_fcf
+from data.line_items import period_item, line_item_key, extract_items, statement_frequency
+from utils.constants import GROWTH_LABELS, FCF
+
+# span of the compound annual growth rate in growth_panel
+CAGR_YEARS = 3
+
+# how far a quarter end may be from exactly N years earlier and still count as the same quarter
+# (52/53-week fiscal years move quarter ends by up to a week)
+LAG_TOLERANCE_DAYS = 20
+
+GROWTH_MEASURES = ["value", "growth", "cagr", "acceleration"]
 
 def calculate_growth_series(series):
     """
@@ -17,23 +33,174 @@ def calculate_growth_series(series):
     return series.pct_change().dropna()
 
 # store growth metrics in cache for performance
-@st.cache_data
+@memoize
 def get_growth_metrics(financials, cash_flows, label):
     """
-    Extracts a time series for a given label from the financials DataFrame.
-    Returns a Series indexed by year.
+    Extracts a time series for a given label (provider label or canonical key) from the financials DataFrame.
+    Returns a Series indexed by year (period end date for quarterly and TTM statements).
     """
-    # Handle special case for Free Cash Flows
-    if label not in financials.index:
+    try:
+        series = period_item(financials, line_item_key(label)).rename(label)  # keep the display label for chart titles
+    except KeyError:
+        # Handle special case for Free Cash Flows
         if label == "Free Cash Flows":
             series = calculate_fcf(cash_flows)
         else:
             return None
-    else:
-        series = financials.loc[label]
-        # Ensure index is datetime or year
-        if not isinstance(series.index[0], (int, float)):
-            series.index = pd.to_datetime(series.index).year
-        
-    return series.sort_index()
 
+    return series.sort_index() if series is not None else None
+
+
+
+def _items(statement, keys):
+    """(periods, periods x keys float matrix) of a statement in one keyed lookup"""
+    items = extract_items(statement, keys)
+    index = pd.DatetimeIndex(items.index)
+    if statement_frequency(statement) == "annual":
+        return index.year.to_numpy(dtype="int64"), items.to_numpy()
+    return index.to_numpy(dtype="datetime64[D]"), items.to_numpy()
+
+
+def _label_values(financials, cash_flows, labels):
+    """
+    {label: (periods, values)} for the labels a ticker reports, reading every financials item
+    in one keyed lookup. Free Cash Flows falls back to operating cash flow minus capex.
+    """
+    keys = {label: line_item_key(label) for label in labels}
+    found = {}
+    if financials is not None:
+        columns = [key for key in keys.values() if key]
+        periods, matrix = _items(financials, columns)
+        reported = ~np.isnan(matrix).all(axis=0)
+        for label, key in keys.items():
+            if key is not None and reported[columns.index(key)]:
+                found[label] = (periods, matrix[:, columns.index(key)])
+
+    if FCF in keys and FCF not in found and cash_flows is not None:
+        periods, matrix = _items(cash_flows, ["operating_cash_flow", "capital_expenditure"])
+        fcf = matrix[:, 0] - matrix[:, 1]
+        if not np.isnan(fcf).all():
+            found[FCF] = (periods, fcf)
+    return found
+
+
+def _period_numbers(periods):
+    """a sorted period axis as integers (days for period end dates, years for fiscal years) and the tolerance for matching them"""
+    if periods.dtype.kind == "M":
+        return periods.astype("datetime64[D]").astype(np.int64), LAG_TOLERANCE_DAYS, 365.25
+    return periods.astype(np.int64), 0, 1
+
+
+def _nearest_rows(p, target, tolerance):
+    """row of the nearest value of sorted p to each target, -1 where it is further than tolerance"""
+    if not len(p):
+        return np.full(len(target), -1, dtype=np.int64)
+    after = np.clip(np.searchsorted(p, target), 0, len(p) - 1)
+    before = np.clip(after - 1, 0, len(p) - 1)
+    nearest = np.where(np.abs(p[before] - target) < np.abs(p[after] - target), before, after)
+    return np.where(np.abs(p[nearest] - target) <= tolerance, nearest, -1)
+
+
+def _lag_rows(periods, years):
+    """
+    Row of the period `years` before each period of a sorted period axis (fiscal years, or
+    period end dates matched within LAG_TOLERANCE_DAYS), -1 where there is none.
+    """
+    p, tolerance, per_year = _period_numbers(periods)
+    return _nearest_rows(p, p - round(per_year * years), tolerance)
+
+
+def _growth_block(values, periods, cagr_years):
+    """
+    (growth, cagr, acceleration) of a periods x columns block whose columns all report on the
+    sorted period axis `periods`, each lag looked up on that axis
+    """
+    year_ago = _lag_rows(periods, 1)
+    start = _lag_rows(periods, cagr_years)
+    padded = np.vstack([values, np.full((1, values.shape[1]), np.nan)])  # the last row stays NaN for missing lags
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = values / padded[year_ago] - 1
+        base = padded[start]
+        cagr = np.where((values > 0) & (base > 0), (values / base) ** (1 / cagr_years) - 1, np.nan)
+    acceleration = growth - np.vstack([growth, np.full((1, values.shape[1]), np.nan)])[year_ago]
+    return growth, cagr, acceleration
+
+
+@memoize
+def growth_panel(statements, labels=GROWTH_LABELS, cagr_years=CAGR_YEARS):
+    """
+    Growth of every label for every ticker in one pass.
+
+    statements maps each ticker to its (financials, cash_flows) at one common frequency. All
+    items go into one periods x (label, ticker) matrix, and YoY growth (against the same period
+    a year earlier), CAGR over cagr_years and acceleration (the change in YoY growth from a year
+    earlier) are computed at once for every block of columns reporting on the same periods.
+
+    Returns a dict of DataFrames keyed by GROWTH_MEASURES, each indexed by period (fiscal year,
+    or period end date for quarterly and TTM statements) with (label, ticker) columns. Labels a
+    ticker doesn't report are left out.
+    """
+    columns, series = [], []
+    for ticker, (financials, cash_flows) in statements.items():
+        found = _label_values(financials, cash_flows, labels)
+        for label in labels:
+            if label in found:
+                columns.append((label, ticker))
+                series.append(found[label])
+
+    periods = np.unique(np.concatenate([p for p, _ in series])) if series else np.empty(0, dtype=np.int64)
+    measures = {name: np.full((len(periods), len(series)), np.nan) for name in GROWTH_MEASURES}
+
+    # lags are looked up on each column's own periods, as companies' quarter ends can be days
+    # apart on the shared axis; columns with the same periods (a ticker's labels, and tickers on
+    # one fiscal calendar) are computed together
+    axes = defaultdict(list)
+    for column, (p, _) in enumerate(series):
+        axes[np.sort(p).tobytes()].append(column)
+    for group in axes.values():
+        order = np.argsort(series[group[0]][0])
+        own = series[group[0]][0][order]
+        block = np.column_stack([series[column][1][np.argsort(series[column][0])] for column in group])
+        rows = np.searchsorted(periods, own)
+        for name, matrix in zip(GROWTH_MEASURES, (block, *_growth_block(block, own, cagr_years))):
+            measures[name][np.ix_(rows, group)] = matrix
+
+    index = pd.DatetimeIndex(periods.astype("datetime64[ns]")) if periods.dtype.kind == "M" else pd.Index(periods)
+    columns = pd.MultiIndex.from_tuples(columns, names=["label", "ticker"])
+    return {name: pd.DataFrame(matrix, index=index, columns=columns) for name, matrix in measures.items()}
+
+
+def latest_growth(panel, label):
+    """
+    Latest YoY growth of a label for each ticker in the panel, with the CAGR and acceleration of
+    the same period, as a tickers x ("period", *measures) DataFrame. A ticker whose last period
+    has no growth shows its last period that does, so "period" says how current each row is.
+    """
+    rows = {}
+    for ticker, growth in panel["growth"][label].items():
+        valid = growth.dropna()
+        period = valid.index[-1] if len(valid) else None
+        rows[ticker] = {"period": period, **{name: np.nan if period is None else panel[name].at[period, (label, ticker)]
+                                             for name in GROWTH_MEASURES[1:]}}
+    latest = pd.DataFrame.from_dict(rows, orient="index", columns=["period"] + GROWTH_MEASURES[1:])
+    # fiscal years stay integers next to tickers without any
+    latest["period"] = pd.Series([row["period"] for row in rows.values()], index=latest.index, dtype=object)
+    return latest
+
+
+def aligned_values(panel, label, tickers):
+    """
+    Values of a label for several tickers side by side, on the periods of the first ticker. The
+    other tickers' periods are matched to the nearest one (fiscal years exactly, period end dates
+    within LAG_TOLERANCE_DAYS), as different companies' quarters rarely end on the same day.
+    Periods without a value for every ticker are left out.
+    """
+    values = panel["value"][label]
+    first = values[tickers[0]].dropna()
+    p, tolerance, _ = _period_numbers(first.index.to_numpy())
+    columns = {tickers[0]: first.to_numpy()}
+    for ticker in tickers[1:]:
+        other = values[ticker].dropna()
+        rows = _nearest_rows(_period_numbers(other.index.to_numpy())[0], p, tolerance)
+        columns[ticker] = np.where(rows >= 0, other.to_numpy()[rows] if len(other) else np.nan, np.nan)
+    return pd.DataFrame(columns, index=first.index).dropna()
@@ -0,0 +1,197 @@
+"""
+analysis/peers.py
+
+Sector- and industry-relative normal ranges for the ratio and efficiency metrics.
+A PeerIndex keeps a screener universe table (analysis/screener.py) and, for
+every industry, sector and the whole universe, the PEER_QUANTILES of each
+metric. Bounds are read from a dict keyed by (scope, group, metric), so looking
+them up for every cell of a table costs a hash lookup each. Refreshing a few
+tickers only recomputes the groups they belong to.
+"""
+
+import os
+import threading
+
+from utils.config import PEER_INDEX_DIR
+from data.periods import PERIODS_PER_YEAR
+from utils.constants import RATIO_LABELS, CF_LABELS, FCF, PEER_QUANTILES, PERIOD_SCALED
+from utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# metrics with peer bounds (free cash flow is a dollar amount, not comparable across companies)
+PEER_METRICS = [label for label in RATIO_LABELS + CF_LABELS if label != FCF]
+
+# peer groups from the narrowest to the widest; "All" is the whole universe
+SCOPES = ["Industry", "Sector", "All"]
+
+# fewest companies reporting a metric for a group's quantiles to be used
+MIN_PEERS = 5
+
+UNIVERSE_FILE = "universe.parquet"
+BOUNDS_FILE = "bounds.parquet"
+
+
+class PeerIndex:
+    """Per-industry, per-sector and universe-wide quantiles of every peer metric."""
+
+    def __init__(self, directory=PEER_INDEX_DIR, quantiles=PEER_QUANTILES):
+        """
+        Initialize a PeerIndex, loading the one saved in `directory` if there is one.
+
+        Args:
+            directory (str): Directory holding universe.parquet and bounds.parquet.
+            quantiles (tuple, optional): (lower, upper) quantiles bounding the normal range.
+                Defaults to PEER_QUANTILES.
+        """
+        self.directory = directory
+        self.quantiles = tuple(quantiles)
+        self.universe = pd.DataFrame(columns=["Sector", "Industry"] + PEER_METRICS)
+        self._bounds = {}  # (scope, group, metric) -> (lower, upper, peers)
+
+        bounds_path = os.path.join(directory, BOUNDS_FILE)
+        if os.path.exists(bounds_path):
+            self.universe = pd.read_parquet(os.path.join(directory, UNIVERSE_FILE))
+            self._set_bounds(pd.read_parquet(bounds_path))
+
+    def __len__(self):
+        return len(self.universe)
+
+    def _set_bounds(self, table):
+        """load rows of a bounds table (scope, group, metric, lower, upper, peers) into the lookup dict"""
+        for scope, group, metric, lower, upper, peers in table.itertuples(index=False):
+            self._bounds[(scope, group, metric)] = (float(lower), float(upper), int(peers))
+
+    def _group_bounds(self, rows, scope):
+        """
+        Bounds table of every group of one scope over the given universe rows. Each metric is
+        sorted once by (group, value), and every group's quantiles are read off at their
+        positions within its run (linear interpolation, as pandas' quantile).
+        """
+        codes, groups = pd.factorize(rows[scope]) if scope != "All" else (np.zeros(len(rows), dtype=np.int64), ["All"])
+        values = rows[PEER_METRICS].to_numpy(dtype=float, na_value=np.nan)
+        table = {"group": np.repeat(np.asarray(groups, dtype=object), len(PEER_METRICS)),
+                 "metric": np.tile(PEER_METRICS, len(groups)),
+                 "lower": np.empty((len(groups), len(PEER_METRICS))),
+                 "upper": np.empty((len(groups), len(PEER_METRICS))),
+                 "peers": np.empty((len(groups), len(PEER_METRICS)), dtype=np.int64)}
+
+        for column in range(len(PEER_METRICS)):
+            valid = (codes >= 0) & ~np.isnan(values[:, column])
+            order = np.lexsort((values[valid, column], codes[valid]))
+            ordered = values[valid, column][order]
+            counts = np.bincount(codes[valid], minlength=len(groups))
+            starts = np.cumsum(counts) - counts
+            table["peers"][:, column] = counts
+            for name, q in zip(("lower", "upper"), self.quantiles):
+                position = np.maximum(counts - 1, 0) * q
+                below = np.floor(position).astype(np.int64)
+                above = np.minimum(below + 1, np.maximum(counts - 1, 0))
+                with np.errstate(invalid="ignore"):
+                    low = ordered[np.minimum(starts + below, len(ordered) - 1)] if len(ordered) else np.zeros(len(counts))
+                    high = ordered[np.minimum(starts + above, len(ordered) - 1)] if len(ordered) else np.zeros(len(counts))
+                    table[name][:, column] = np.where(counts > 0, low + (position - below) * (high - low), np.nan)
+
+        for name in ("lower", "upper", "peers"):
+            table[name] = table[name].ravel()
+        return pd.DataFrame({"scope": scope, **table})[["scope", "group", "metric", "lower", "upper", "peers"]]
+
+    def update(self, table):
+        """
+        Add or replace tickers from a build_universe table and recompute the quantiles of
+        every group they left or joined (the universe-wide ones always change).
+        Returns the index.
+        """
+        table = table.reindex(columns=self.universe.columns)
+        replaced = self.universe.loc[self.universe.index.intersection(table.index)]
+        kept = self.universe.drop(replaced.index)
+        self.universe = pd.concat([kept, table]) if len(kept) else table.copy()
+        self.universe.index.name = "Ticker"
+
+        changed = []
+        for scope in SCOPES:
+            if scope == "All":
+                rows = self.universe
+            else:
+                groups = set(table[scope].dropna()) | set(replaced[scope].dropna())
+                rows = self.universe[self.universe[scope].isin(groups)]
+                # a group whose last ticker moved away keeps no bounds
+                for group in groups - set(rows[scope]):
+                    for metric in PEER_METRICS:
+                        self._bounds.pop((scope, group, metric), None)
+            if len(rows):
+                changed.append(self._group_bounds(rows, scope))
+        if changed:
+            self._set_bounds(pd.concat(changed, ignore_index=True))
+        return self
+
+    def bounds(self, metric, sector=None, industry=None):
+        """
+        (lower, upper, scope) normal range of a metric for a company in the given sector and
+        industry: from its industry peers if there are at least MIN_PEERS, else its sector,
+        else the whole universe. None if no group has enough peers.
+        """
+        for scope, group in (("Industry", industry), ("Sector", sector), ("All", "All")):
+            entry = self._bounds.get((scope, group, metric)) if group else None
+            if entry is not None and entry[2] >= MIN_PEERS:
+                return entry[0], entry[1], "all companies" if scope == "All" else group
+        return None
+
+    def save(self):
+        """write the universe and the bounds table to the index directory"""
+        os.makedirs(self.directory, exist_ok=True)
+        rows = [(scope, group, metric, lower, upper, peers)
+                for (scope, group, metric), (lower, upper, peers) in self._bounds.items()]
+        bounds = pd.DataFrame(rows, columns=["scope", "group", "metric", "lower", "upper", "peers"])
+        for name, frame in ((UNIVERSE_FILE, self.universe), (BOUNDS_FILE, bounds)):
+            tmp_path = os.path.join(self.directory, f"{name}.{os.getpid()}.tmp")
+            frame.to_parquet(tmp_path)
+            os.replace(tmp_path, os.path.join(self.directory, name))
+
+
+def company_bounds(metric, info, default=None, frequency="annual"):
+    """
+    (lower, upper, peer group) normal range of a metric for a company, given its info dict, from
+    the shared peer index. Falls back to default, a static (lower, upper) pair, with no peer group.
+    Both are annual ranges; for PERIOD_SCALED metrics they are scaled down to one period of the
+    statement frequency, so quarterly values are compared with quarterly bounds.
+    """
+    found = get_peer_index().bounds(metric, info.get("sector"), info.get("industry"))
+    lower, upper, group = found if found is not None else (*(default or (None, None)), None)
+    periods = PERIODS_PER_YEAR[frequency] if metric in PERIOD_SCALED else 1
+    if periods != 1:
+        lower, upper = (None if bound is None else bound / periods for bound in (lower, upper))
+    return lower, upper, group
+
+
+def update_peer_index(tickers, index=None):
+    """
+    Compute the screener metrics for the tickers and fold them into the peer index (saved to disk).
+    Returns the index.
+    """
+    from analysis.screener import build_universe
+
+    index = get_peer_index() if index is None else index
+    index.update(build_universe(tickers, include_prices=False)).save()
+    return index
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_peer_index():
+    """Return the shared PeerIndex in FA_PEER_INDEX_DIR."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = PeerIndex()
+    return _index
+
+
+def set_peer_index(index):
+    """Replace the shared PeerIndex (e.g. an index in a scratch directory for benchmarks)."""
+    global _index
+    with _index_lock:
+        _index = index
@@ -2,41 +2,62 @@
 analysis/performance.py
 
 Calculates efficiency and stock performance metrics.
+Statement inputs may be DataFrames or CompactStatements (data/statement_store.py).
 """
 
 import numpy as np
 import pandas as pd
-from data.fetcher import get_value_by_label
-import streamlit as st
+from data.line_items import period_values
+from utils.memo import memoize
 from data.metric_data import MetricData
-from utils.constants import FCF, FCF_MARGIN, OP_MARGIN, AT, VOLATILITY, SHARPE_RATIO, MAX_DRAWDOWN, CUMULATIVE_RETURN
+from utils.constants import (FCF, FCF_MARGIN, OP_MARGIN, AT, VOLATILITY, SHARPE_RATIO, MAX_DRAWDOWN,
+                             CUMULATIVE_RETURN, STOCK_LABELS, STOCK_HORIZONS)
+
+# a horizon counts as covered if the history starts within this many days of the horizon's start
+# (a "5y" download starts 5 years before today, which can be a few days after 5 years before the last bar)
+HORIZON_SLACK_DAYS = 7
+
+def _period_series(periods, values):
+    """period-indexed Series sorted by period, without missing values"""
+    order = np.argsort(periods, kind="stable")
+    periods, values = periods[order], values[order]
+    keep = ~np.isnan(values)
+    return pd.Series(values[keep], index=periods[keep])
+
+
+def _combine(op, left, right):
+    """apply op to two (periods, values) pairs aligned by period, as a sorted period-indexed Series"""
+    (left_periods, left_values), (right_periods, right_values) = left, right
+    if np.array_equal(left_periods, right_periods):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _period_series(left_periods, op(left_values, right_values))
+
+    # the statements cover different periods: let pandas align them by period
+    result = op(pd.Series(left_values, index=left_periods), pd.Series(right_values, index=right_periods))
+    return result.sort_index().dropna()
+
+
+def _fcf_values(cash_flows):
+    """(periods, free cash flow) arrays in statement order"""
+    periods, operating_cf = period_values(cash_flows, "operating_cash_flow")
+    _, capex = period_values(cash_flows, "capital_expenditure")
+    return periods, operating_cf - capex
+
 
 def calculate_fcf(cash_flows):
     """Free Cash Flow = Operating Cash Flow - Capital Expenditures"""
 
     try:
-        operating_cf = get_value_by_label(cash_flows, ["Total Cash From Operating Activities", "Operating Cash Flow"])
-        capex = get_value_by_label(cash_flows, ["Capital Expenditures", "Purchase Of PPE"])
-
-        fcf = operating_cf - capex
-        fcf.index = pd.to_datetime(fcf.index).year
-
-        return fcf.sort_index().dropna()
+        return _period_series(*_fcf_values(cash_flows))
     except KeyError:
         return None
 
 
 def calculate_fcf_margin(cash_flows, financials):
     """FCF Margin = Free Cash Flow / Revenue"""
-    fcf = calculate_fcf(cash_flows)
 
     try:
-        revenue = get_value_by_label(financials, ["Total Revenue"])
-        revenue.index = revenue.index.year
-
-        margin = fcf / revenue
-
-        return margin.sort_index().dropna()
+        return _combine(np.divide, _fcf_values(cash_flows), period_values(financials, "total_revenue"))
     except (KeyError, TypeError):
         return None
 
@@ -45,13 +66,7 @@ def calculate_operating_margin(financials):
     """Operating Margin = Operating Income / Revenue"""
 
     try:
-        operating_income = financials.loc["Operating Income"]
-        revenue = financials.loc["Total Revenue"]
-
-        margin = operating_income / revenue
-        margin.index = margin.index.year
-
-        return margin.sort_index().dropna()
+        return _combine(np.divide, period_values(financials, "operating_income"), period_values(financials, "total_revenue"))
     except KeyError:
         return None
     
@@ -60,13 +75,7 @@ def calculate_asset_turnover(financials, balance_sheet):
     """Asset Turnover = Revenue / Total Assets"""
 
     try:
-        revenue = financials.loc["Total Revenue"]
-        assets = balance_sheet.loc["Total Assets"]
-
-        turnover = revenue / assets
-        turnover.index = turnover.index.year
-
-        return turnover.sort_index().dropna()
+        return _combine(np.divide, period_values(financials, "total_revenue"), period_values(balance_sheet, "total_assets"))
     except KeyError:
         return None
 
@@ -75,19 +84,13 @@ def calculate_interest_coverage(financials):
     """Interest Coverage = EBIT / Interest Expense"""
 
     try:
-        ebit = financials.loc["EBIT"]
-        interest = financials.loc["Interest Expense"]
-
-        coverage = ebit / interest
-        coverage.index = coverage.index.year
-
-        return coverage.sort_index().dropna()
+        return _combine(np.divide, period_values(financials, "ebit"), period_values(financials, "interest_expense"))
     except KeyError:
         return None
     
 
 # store calculated efficiency metrics in cache for performance
-@st.cache_data
+@memoize
 def calculate_efficiency_metrics(cash_flows, financials, balance_sheet):
     """Calculate efficiency metrics and return as a series"""
 
@@ -99,12 +102,12 @@ def calculate_efficiency_metrics(cash_flows, financials, balance_sheet):
     }
 
 # store calculated stock metrics in cache for performance
-@st.cache_data
+@memoize
 def calculate_stock_metrics(price_df, risk_free_rate=0.015):
     """Calculate stock performance metrics from historical price data."""
-    
-    price_df['Return'] = price_df['Close'].pct_change()
-    daily_returns = price_df['Return'].dropna()
+
+    # returns are kept out of price_df: the frame may be a cached object shared with other callers
+    daily_returns = price_df['Close'].pct_change().dropna()
 
     volatility = np.std(daily_returns)
     mean_return = np.mean(daily_returns)
@@ -122,3 +125,145 @@ def calculate_stock_metrics(price_df, risk_free_rate=0.015):
         MAX_DRAWDOWN: MetricData(MAX_DRAWDOWN, max_drawdown, fmt="{:.2%}"),
         CUMULATIVE_RETURN: MetricData(CUMULATIVE_RETURN, cumulative_return)
     }
+
+
+def _horizon_start(last, horizon):
+    """first date of a trailing horizon ('1M', '3M', 'YTD', '1Y', ...) ending at `last`"""
+    if horizon == "YTD":
+        return pd.Timestamp(last.year, 1, 1)
+    count, unit = int(horizon[:-1]), horizon[-1]
+    return last - (pd.DateOffset(months=count) if unit == "M" else pd.DateOffset(years=count))
+
+
+def _segment_drawdowns(close, bounds):
+    """
+    Max drawdown of every trailing window close[bounds[k]:], for all columns at once.
+
+    bounds are the sorted window start rows. The rows between consecutive starts form
+    segments; each segment is scanned once for its running max, prefix min and the suffix
+    min of its own drawdown. A window's running max inside a later segment is the larger of
+    the segment's running max and the max of the window's earlier segments (P), so the
+    window's worst drawdown there is found at the row where the segment's running max
+    overtakes P: before it the drawdown is prefix-min / P, after it the segment's own.
+    """
+    n_rows, n_cols = close.shape
+    edges = list(bounds) + [n_rows]
+    columns = np.arange(n_cols)
+    drawdowns = np.full((len(bounds), n_cols), np.nan)
+    segment_max = []
+
+    for j in range(len(bounds)):
+        segment = close[edges[j]:edges[j + 1]]
+        length = len(segment)
+        if length == 0:
+            segment_max.append(np.full(n_cols, np.nan))
+            continue
+        with np.errstate(invalid="ignore", divide="ignore"):
+            running = np.fmax.accumulate(segment, axis=0)
+            prefix_min = np.fmin.accumulate(segment, axis=0)
+            suffix_min = np.fmin.accumulate((segment / running - 1)[::-1], axis=0)[::-1]
+        top = running[-1]
+        segment_max.append(top)
+
+        # running max scaled into [0, 1] per column and offset by 2 * column, so one flat
+        # searchsorted call finds the overtaking row of every column
+        scale = np.where(np.isnan(top), 1.0, top)
+        keys = (np.nan_to_num(running, nan=0.0) / scale).T + 2.0 * columns[:, None]
+        keys = keys.ravel()
+
+        for k in range(j + 1):
+            earlier = np.vstack(segment_max[k:j]) if k < j else np.full((1, n_cols), np.nan)
+            with np.errstate(invalid="ignore"):
+                peak = np.fmax.reduce(earlier, axis=0)
+            query = np.where(np.isnan(peak), -0.5, np.minimum(peak / scale, 1.5)) + 2.0 * columns
+            split = np.searchsorted(keys, query, side="right") - columns * length
+
+            before = np.full(n_cols, np.nan)
+            has_before = (split > 0) & ~np.isnan(peak)
+            rows = np.clip(split - 1, 0, length - 1)
+            before[has_before] = prefix_min[rows, columns][has_before] / peak[has_before] - 1
+            after = np.where(split < length, suffix_min[np.clip(split, 0, length - 1), columns], np.nan)
+            drawdowns[k] = np.fmin(drawdowns[k], np.fmin(before, after))
+    return drawdowns
+
+
+@memoize
+def calculate_horizon_metrics(closes, horizons=STOCK_HORIZONS, risk_free_rate=0.015):
+    """
+    Volatility, Sharpe ratio, max drawdown and cumulative return over several trailing
+    horizons, for every ticker in a wide close-price frame (dates x tickers, e.g.
+    get_price_histories(...)["Close"]), in one pass over the data.
+
+    Each window's metrics match calculate_stock_metrics on the ticker's bars from the
+    horizon's start: return sums come from cumulative sums, drawdowns from one running-max
+    scan (see _segment_drawdowns). Horizons longer than a ticker's history are NaN.
+    The input is not modified.
+
+    Returns:
+        DataFrame indexed by (Ticker, Horizon) with one column per stock metric.
+    """
+    tickers = list(closes.columns)
+    if closes.empty:
+        return pd.DataFrame(columns=STOCK_LABELS,
+                            index=pd.MultiIndex.from_arrays([[], []], names=["Ticker", "Horizon"]))
+
+    dates = pd.DatetimeIndex(closes.index)
+    close = closes.to_numpy(dtype=np.float64, na_value=np.nan)
+    n_rows, n_cols = close.shape
+    valid = ~np.isnan(close)
+    row_numbers = np.arange(n_rows)[:, None]
+
+    # previous bar of each ticker (skipping days it has no bar) and the next bar at or after each row
+    last_seen = np.maximum.accumulate(np.where(valid, row_numbers, -1), axis=0)
+    next_seen = np.minimum.accumulate(np.where(valid, row_numbers, n_rows)[::-1], axis=0)[::-1]
+    filled = np.take_along_axis(close, np.maximum(last_seen, 0), axis=0)
+    previous = np.vstack([np.full((1, n_cols), np.nan), filled[:-1]])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.where(valid, close / previous - 1, np.nan)
+    has_return = ~np.isnan(returns)
+
+    # shifting by each ticker's mean return keeps the sum-of-squares variance numerically stable
+    with np.errstate(invalid="ignore"):
+        shift = np.nanmean(np.where(has_return, returns, np.nan), axis=0)
+    shift = np.nan_to_num(shift)
+    centered = np.where(has_return, returns - shift, 0.0)
+    sums = np.cumsum(centered, axis=0)
+    squares = np.cumsum(centered ** 2, axis=0)
+    counts = np.cumsum(has_return, axis=0)
+
+    last = dates[-1]
+    first_bar = np.where(valid.any(axis=0), dates.to_numpy()[np.clip(next_seen[0], 0, n_rows - 1)],
+                         np.datetime64("NaT"))
+    starts = {h: _horizon_start(last, h) for h in horizons}
+    start_rows = {h: int(dates.searchsorted(start)) for h, start in starts.items()}
+    bounds = sorted(set(start_rows.values()))
+    drawdowns = _segment_drawdowns(close, bounds)
+    end_sums, end_squares, end_counts = sums[-1], squares[-1], counts[-1]
+    final = filled[-1]
+    columns = np.arange(n_cols)
+
+    metrics = {}
+    for h in horizons:
+        row = start_rows[h]
+        first = next_seen[min(row, n_rows - 1)]
+        covered = (row < n_rows) & (first < n_rows)
+        covered &= first_bar <= np.datetime64(starts[h] + pd.Timedelta(days=HORIZON_SLACK_DAYS))
+        first = np.minimum(first, n_rows - 1)
+
+        # the first bar's return reaches back before the window, so sums start after it
+        n = end_counts - counts[first, columns]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = (end_sums - sums[first, columns]) / n
+            volatility = np.sqrt(np.maximum((end_squares - squares[first, columns]) / n - mean ** 2, 0.0))
+            mean = mean + shift
+            sharpe = np.where(volatility > 0, (mean - risk_free_rate / 252) / volatility, np.nan)
+            cumulative = final / close[first, columns] - 1
+        drawdown = drawdowns[bounds.index(row)]
+
+        values = np.column_stack([volatility, sharpe, drawdown, cumulative])
+        values[~(covered & (n > 0))] = np.nan
+        metrics[h] = values
+
+    index = pd.MultiIndex.from_product([tickers, list(horizons)], names=["Ticker", "Horizon"])
+    values = np.stack([metrics[h] for h in horizons], axis=1).reshape(-1, len(STOCK_LABELS))
+    return pd.DataFrame(values, index=index, columns=STOCK_LABELS)
@@ -3,132 +3,111 @@
 analysis/ratios.py
 
 Calculates key financial ratios from financial statements.
+Every ratio is computed for every available period in one pass over aligned
+statement rows; the current/previous metrics are read off that history.
+Statement inputs may be DataFrames or CompactStatements (data/statement_store.py).
 """
 
+import numpy as np
 import pandas as pd
-import streamlit as st
-from data.fetcher import get_value_by_label
+from utils.memo import memoize
+from data.line_items import extract_items
+from data.statement_store import CompactStatement
 from data.metric_data import MetricData
 from utils.formatter import format_delta
-from utils.constants import PM, ROE, DE, CR, QR
+from utils.constants import PM, ROE, DE, CR, QR, RATIO_LABELS
+
+# ratios displayed as percentages, with deltas shown as percent change
+PCT_RATIOS = [PM, ROE]
+
+
+# canonical line items the ratios read from each statement
+FINANCIALS_ITEMS = ["total_revenue", "net_income"]
+BALANCE_SHEET_ITEMS = ["stockholders_equity", "total_liabilities", "current_liabilities",
+                       "non_current_liabilities", "current_assets", "inventory"]
+
+
+def align_ratio_items(financials, balance_sheet) -> pd.DataFrame:
+    """
+    Look up each statement row the ratios need exactly once and align them by period.
+    Accepts statement DataFrames or CompactStatements.
+    Returns a DataFrame indexed by period end date with one column per line item.
+    """
+    if (isinstance(financials, CompactStatement) and isinstance(balance_sheet, CompactStatement)
+            and np.array_equal(financials.ends, balance_sheet.ends)):
+        # same periods in both statements: stack the rows without any index alignment
+        values = np.hstack([financials.extract(FINANCIALS_ITEMS), balance_sheet.extract(BALANCE_SHEET_ITEMS)])
+        index = pd.DatetimeIndex(financials.ends.astype("datetime64[ns]"))
+        items = pd.DataFrame(values, index=index, columns=FINANCIALS_ITEMS + BALANCE_SHEET_ITEMS)
+    else:
+        items = pd.concat([extract_items(financials, FINANCIALS_ITEMS),
+                           extract_items(balance_sheet, BALANCE_SHEET_ITEMS)], axis=1)
+        items.index = pd.to_datetime(items.index)
+
+    if not items.index.is_monotonic_decreasing:
+        items = items.sort_index(ascending=False)  # most recent period first, like the statements
+    return items
+
+
+def ratio_history(financials, balance_sheet) -> pd.DataFrame:
+    """
+    Calculate every ratio for every available period as whole-column array operations.
+    Returns a tidy ratio-by-period DataFrame (rows: periods, most recent first; columns: RATIO_LABELS).
+    Ratios missing an input are NaN.
+    """
+    items = align_ratio_items(financials, balance_sheet)
+    column = dict(zip(items.columns, items.to_numpy().T))
+
+    net_income = column["net_income"]
+    equity = column["stockholders_equity"]
+    current_assets = column["current_assets"]
+    current_liabilities = column["current_liabilities"]
+
+    # fall back to current + non-current liabilities when no total is reported
+    liabilities = column["total_liabilities"]
+    liabilities = np.where(np.isnan(liabilities), current_liabilities + column["non_current_liabilities"], liabilities)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = np.column_stack([
+            net_income / column["total_revenue"],                            # PM: Net Income / Revenue
+            net_income / equity,                                             # ROE: Net Income / Shareholder Equity
+            liabilities / equity,                                            # DE: Total Liabilities / Shareholder Equity
+            current_assets / current_liabilities,                            # CR: Current Assets / Current Liabilities
+            (current_assets - column["inventory"]) / current_liabilities,    # QR: (Current Assets - Inventory) / Current Liabilities
+        ]).reshape(len(items), len(RATIO_LABELS))
+
+    ratios[np.isinf(ratios)] = np.nan
+    keep = ~np.isnan(ratios).all(axis=1)
+    return pd.DataFrame(ratios[keep], index=items.index[keep].rename("Period"), columns=RATIO_LABELS)
+
+
+def ratio_metric(history: pd.DataFrame, label) -> MetricData:
+    """Build the current value and delta vs. the previous period for one ratio column."""
+    values = history[label].to_numpy() if label in history else np.array([])
+    fmt = "{:.2%}" if label in PCT_RATIOS else "{:.2f}"
+
+    if len(values) == 0 or np.isnan(values[0]):
+        return MetricData(label, None)
+
+    curr = float(values[0])
+    if len(values) < 2 or np.isnan(values[1]):
+        return MetricData(label, curr, fmt=fmt)
+
+    prev = float(values[1])
+    return MetricData(label, curr, format_delta(curr, prev, label in PCT_RATIOS), fmt)
+
+
+# store calculated ratio histories in cache for performance
+@memoize
+def calculate_ratio_history(financials, balance_sheet):
+    """Cached ratio_history for display."""
+    return ratio_history(financials, balance_sheet)
+
 
 # store calculated ratios in cache for performance
-@st.cache_data
+@memoize
 def calculate_ratios(financials, balance_sheet):
     """Calculate all financial ratios and return as a series."""
 
-    series = {
-        PM: (calculate_profit_margin(financials)),
-        ROE: calculate_ROE(financials, balance_sheet),
-        DE: calculate_DE_ratio(balance_sheet),
-        CR: calculate_current_ratio(balance_sheet),
-        QR: calculate_quick_ratio(balance_sheet)
-    }
-    return series
-
-
-def calculate_profit_margin(financials: pd.DataFrame):
-    """Net Income / Revenue"""
-
-    try:
-        revenue = get_value_by_label(financials, ['Total Revenue', 'Revenue'])
-        net_income = get_value_by_label(financials, ['Net Income'])
-
-        curr = net_income[0] / revenue[0]
-        prev = net_income[1] / revenue[1]
-
-        return MetricData(PM, curr, format_delta(curr, prev, True), "{:.2%}")
-
-    except (KeyError, IndexError, TypeError):
-        return None
-
-
-def calculate_ROE(financials: pd.DataFrame, balance_sheet: pd.DataFrame) -> float:
-    """Net Income / Shareholder Equity"""
-
-    try:
-        net_income = get_value_by_label(financials, ['Net Income'])
-        equity = get_value_by_label(balance_sheet, ['Stockholders Equity', 'Total Stockholders Equity'])
-
-        curr = net_income[0] / equity[0]
-        prev = net_income[1] / equity[1]
-
-        return MetricData(ROE, curr, format_delta(curr, prev, True), "{:.2%}")
-
-    except (KeyError, IndexError, TypeError):
-        return MetricData(ROE, None)
-
-
-def calculate_DE_ratio(balance_sheet: pd.DataFrame) -> float:
-    """Total Liabilities / Shareholder Equity"""
-
-    try:
-        liabilities = get_value_by_label(balance_sheet, ['Total Liabilities'])
-
-        if liabilities == None:
-            current_liabilities = get_value_by_label(balance_sheet, ['Current Liabilities'])
-            non_current_liabilities = get_value_by_label(balance_sheet, ['Total Non Current Liabilities Net Minority Interest'])
-            if current_liabilities is None and non_current_liabilities is None:
-                return None
-
-            calculated_liab = non_current_liabilities + current_liabilities
-
-        equity = get_value_by_label(balance_sheet, ['Stockholders Equity', 'Total Stockholders Equity'])
-
-        curr = calculated_liab[0] / equity[0]
-        prev = calculated_liab[1] / equity[1]
-
-        return MetricData(DE, curr, format_delta(curr, prev))
-    
-    except (KeyError, IndexError):
-        return MetricData(DE, None)
-
-
-def calculate_current_ratio(balance_sheet: pd.DataFrame) -> float:
-    """Current Assets / Current Liabilities"""
-
-    try:
-        current_assets = get_value_by_label(balance_sheet, ['Total Current Assets', 'Current Assets'])
-        current_liabilities = get_value_by_label(balance_sheet, ['Total Current Liabilities', 'Current Liabilities'])
-
-        curr = current_assets[0] / current_liabilities[0]
-        prev = current_assets[1] / current_liabilities[1]
-
-        return MetricData(CR, curr, format_delta(curr, prev))
-
-    except (KeyError, IndexError, TypeError):
-        return MetricData(CR, None)
-
-
-def calculate_quick_ratio(balance_sheet: pd.DataFrame) -> float:
-    """(Current Assets - Inventory) / Current Liabilities"""
-
-    try:
-        current_assets = get_value_by_label(balance_sheet, ['Total Current Assets', 'Current Assets'])
-        inventory = get_value_by_label(balance_sheet, ['Inventory'])
-        
-        current_liabilities = get_value_by_label(balance_sheet, ['Total Current Liabilites', 'Current Liabilities'])
-
-        curr = (current_assets[0] - inventory[0]) / current_liabilities[0]
-        prev = (current_assets[1] - inventory[1]) / current_liabilities[1]
-
-        return MetricData(QR, curr, format_delta(curr, prev))
-
-    except (KeyError, IndexError, TypeError):
-        return MetricData(QR, None)
-
-
-def calculate_interest_coverage(financials: pd.DataFrame) -> float:
-    """EBIT / Interest Expense"""
-    
-    try:
-        ebit = get_value_by_label(financials, ['EBIT'])
-        interest = get_value_by_label(financials, ['Interest Expense'])
-
-        curr = ebit[0] / interest[0]
-        prev = ebit[1] / interest[1]
-
-        return MetricData("Interest Coverage", curr, format_delta(curr, prev))
-
-    except (KeyError, IndexError, TypeError):
-        return None
+    history = ratio_history(financials, balance_sheet)
+    return {label: ratio_metric(history, label) for label in RATIO_LABELS}
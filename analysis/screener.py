@@ -0,0 +1,147 @@
+"""
+analysis/screener.py
+
+Fundamental screener over a whole ticker universe.
+Computes the ratio, efficiency, valuation and stock metrics for every ticker into
+one columnar table, then answers filter/sort/top-N queries from that table.
+"""
+
+import operator
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis.ratios import ratio_history
+from analysis.performance import calculate_efficiency_metrics, calculate_stock_metrics
+from analysis.valuation import get_valuation_metrics
+from data.fetcher import get_price_histories, select_ticker
+from data.scheduler import prefetch, STATEMENT_FIELDS
+from data.snapshot import TickerSnapshot
+from utils.constants import RATIO_LABELS, CF_LABELS
+
+INFO_COLUMNS = {"Name": "shortName", "Sector": "sector", "Industry": "industry"}
+
+OPERATORS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le, "==": operator.eq, "!=": operator.ne}
+SUFFIXES = {"%": 0.01, "K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+FILTER_PATTERN = re.compile(r"^\s*(.+?)\s*(>=|<=|==|!=|>|<)\s*(-?\d+(?:\.\d+)?(?:e-?\d+)?)\s*([%KMBT])?\s*$", re.IGNORECASE)
+
+
+def _latest(series):
+    """most recent non-missing value of a year-indexed series"""
+    if series is None:
+        return np.nan
+    series = series.dropna()
+    return float(series.iloc[-1]) if len(series) else np.nan
+
+
+def ticker_metrics(snapshot: TickerSnapshot, prices: pd.DataFrame = None) -> dict:
+    """Compute one screener row (latest value of every metric) for a loaded snapshot."""
+    info = snapshot.info
+    row = {column: info.get(key) for column, key in INFO_COLUMNS.items()}
+
+    ratios = ratio_history(snapshot.financials, snapshot.balance_sheet)
+    for label in RATIO_LABELS:
+        row[label] = ratios[label].iloc[0] if len(ratios) else np.nan
+
+    efficiency = calculate_efficiency_metrics(snapshot.cashflow, snapshot.financials, snapshot.balance_sheet)
+    for label in CF_LABELS:
+        row[label] = _latest(efficiency[label])
+
+    for label, metric in get_valuation_metrics(info).items():
+        row[label] = metric.value
+
+    if prices is not None and not prices.empty:
+        for label, metric in calculate_stock_metrics(prices).items():
+            row[label] = metric.value
+
+    return row
+
+
+def build_universe(tickers, include_prices=True):
+    """
+    Fetch and compute the full metric set for every ticker.
+    Data comes from the active provider (use FA_PROVIDER=local to time a pass without the network).
+
+    Returns a DataFrame indexed by ticker with one column per metric. Tickers that failed are
+    listed in table.attrs["failed"], and fetch/compute wall times in table.attrs["timings"].
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    snapshots = [TickerSnapshot(t, compact=True) for t in tickers]
+
+    # fan all I/O out first: info and statements on the thread pool, prices in one bulk request
+    start = time.perf_counter()
+    failed = prefetch(snapshots, ["info"] + STATEMENT_FIELDS)
+    histories = get_price_histories([t for t in tickers if t not in failed]) if include_prices else None
+    fetched = time.perf_counter()
+
+    rows = {}
+    for snapshot in snapshots:
+        if snapshot.ticker in failed:
+            continue
+        prices = None
+        if histories is not None and snapshot.ticker in histories.columns.get_level_values("Ticker"):
+            prices = select_ticker(histories, snapshot.ticker)
+        try:
+            rows[snapshot.ticker] = ticker_metrics(snapshot, prices)
+        except Exception as e:
+            failed[snapshot.ticker] = str(e)
+
+    table = pd.DataFrame.from_dict(rows, orient="index")
+    table.index.name = "Ticker"
+
+    # keep numeric metrics as float columns so queries run as array comparisons
+    numeric = table.columns.difference(list(INFO_COLUMNS))
+    table[numeric] = table[numeric].apply(pd.to_numeric, errors="coerce").astype(float)
+
+    table.attrs["failed"] = failed
+    table.attrs["timings"] = {"fetch": fetched - start, "compute": time.perf_counter() - fetched}
+    return table
+
+
+def save_universe(table: pd.DataFrame, path):
+    """Write a precomputed universe table to parquet so queries can be served without recomputing."""
+    table.to_parquet(path)
+
+
+def load_universe(path) -> pd.DataFrame:
+    """Load a universe table written by save_universe."""
+    return pd.read_parquet(path)
+
+
+def parse_filter(expression):
+    """
+    Parse a filter like "FCF Margin > 15%" or "Market Cap >= 2B" into (column, operator, value).
+    Supports >, >=, <, <=, ==, != and the suffixes %, K, M, B, T.
+    """
+    match = FILTER_PATTERN.match(expression)
+    if match is None:
+        raise ValueError(f"Invalid filter '{expression}', expected e.g. 'FCF Margin > 15%'")
+
+    column, op, number, suffix = match.groups()
+    value = float(number) * (SUFFIXES[suffix.upper()] if suffix else 1)
+    return column, OPERATORS[op], value
+
+
+def screen(table: pd.DataFrame, filters=(), sort_by=None, ascending=False, top_n=None) -> pd.DataFrame:
+    """
+    Query a universe table: keep rows matching every filter, sort, and take the top N.
+    Missing values never pass a filter and sort last.
+
+    Example:
+        screen(table, ["FCF Margin > 15%", "Debt-to-Equity < 0.5"], sort_by="FCF Margin", top_n=25)
+    """
+    mask = np.ones(len(table), dtype=bool)
+    for expression in filters:
+        column, op, value = parse_filter(expression) if isinstance(expression, str) else expression
+        if column not in table.columns:
+            raise KeyError(f"Unknown screener column '{column}'")
+        mask &= op(table[column].to_numpy(dtype=float), value)
+
+    result = table[mask]
+    if sort_by is not None:
+        result = result.sort_values(sort_by, ascending=ascending, na_position="last")
+    if top_n is not None:
+        result = result.head(top_n)
+    return result
@@ -4,11 +4,10 @@ analysis/valuation.py
 Calculates valuation metrics from company info.
 """
 
-from data.fetcher import get_company_info
 from utils.constants import TRAILING_PE, FORWARD_PE, PEG, PB, ENTERPRISE_VALUE, MARKET_CAP, EV_EBITDA, EV_REVENUE
 from utils.formatter import format_large_number
 from data.metric_data import MetricData
-import streamlit as st
+from utils.memo import memoize
 
 def calculate_forward_peg(info):
     """PE / Earnings Growth"""
@@ -21,11 +20,9 @@ def calculate_forward_peg(info):
     return None
 
 # store valuation metrics in cache for performance
-@st.cache_data
-def get_valuation_metrics(ticker):
-    """Calculate valuation metrics and return as a series."""
-
-    info = get_company_info(ticker)
+@memoize
+def get_valuation_metrics(info):
+    """Calculate valuation metrics from a company info dict (TickerSnapshot.info) and return as a series."""
 
     series =  {
         TRAILING_PE: MetricData(TRAILING_PE, info.get("trailingPE")),
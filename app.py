@@ -5,20 +5,20 @@ Main application file for the Financial Analyzer Streamlit app.
 """
 
 import streamlit as st
-import pandas as pd
 
-from data.fetcher import (ticker_exists, get_company_name, get_price_history, get_financial_statements)
-from utils.constants import GROWTH_LABELS, CF_LABELS, CF_BOUNDS
+# only lightweight modules are imported up front; pandas, plotly, yfinance and the
+# analysis modules are imported inside the view that first needs them so the
+# Overview page renders without loading them
+from data.snapshot import TickerSnapshot
+from data.scheduler import prefetch, STATEMENT_FIELDS
+from utils.constants import (GROWTH_LABELS, CF_LABELS, CF_BOUNDS, VOLATILITY, SHARPE_RATIO, MAX_DRAWDOWN,
+                             CUMULATIVE_RETURN, CHART_INTERVAL_PERIODS, STATEMENT_PERIODS)
 
-from analysis.ratios import calculate_ratios
-from analysis.growth import(get_growth_metrics, calculate_growth_series)
-from analysis.valuation import get_valuation_metrics
-from visuals.charts import (plot_stocks, growth_line_chart)
-from analysis.performance import (calculate_efficiency_metrics, calculate_stock_metrics)
-
-from visuals.layout import (get_page_header, col_display_metric, display_MetricData, col_display_insights)
+from visuals.layout import (get_page_header, col_display_metric, display_MetricData, col_display_insights,
+                            show_table, debug_panel)
 from analysis.insights import (ratio_insights, growth_insights, valuation_insights, efficiency_insights)
-from utils.formatter import (format_large_number, highlight_df_bounds)
+from utils.formatter import (style_large_numbers, highlight_df_bounds, parse_tickers, format_period)
+from utils import trace
 
 st.set_page_config(page_title="Financial Analyzer", page_icon="📊", layout="wide")
 
@@ -36,21 +36,27 @@ def main():
     # show analysis options in sidebar
     display = st.sidebar.radio("Display:", ['Core Financial Ratios', 'Growth Metrics',
                                'Valuation Metrics', 'Stock Performance Metrics', 'Cash Flow & Efficiency'])
+
+    # statements as reported each year, each quarter, or rolled up over the trailing twelve months
+    frequency = STATEMENT_PERIODS[st.sidebar.radio("Statement Period:", list(STATEMENT_PERIODS), horizontal=True)]
     st.sidebar.markdown("<hr style='margin-top: 5px; margin-bottom: 20px;'>", unsafe_allow_html=True)
 
 
-    if ticker_exists(ticker1):
+    # one snapshot per ticker per rerun, so each data type is requested at most once
+    snapshot1 = TickerSnapshot(ticker1, frequency=frequency)
+    snapshot2 = TickerSnapshot(ticker2, frequency=frequency)
+
+    # check both tickers concurrently rather than one after another
+    failed = prefetch([snapshot1, snapshot2], ["info"])
+
+    if ticker1 not in failed and snapshot1.exists():
 
-        # get info from ticker needed for calculations
-        ticker1_name = get_company_name(ticker1)
-        financials, balance_sheet, cash_flows = get_financial_statements(ticker1)
-        hist1 = get_price_history(ticker1)
+        # get info from ticker needed for calculations, statements and prices load when a view uses them
+        ticker1_name = snapshot1.name
 
         # if comparing with a valid ticker, get ticker2 info
-        if ticker2 and ticker_exists(ticker2):
-            ticker2_name = get_company_name(ticker2)
-            financials2, balance_sheet2, cash_flows2 = get_financial_statements(ticker2)
-            hist2 = get_price_history(ticker2)
+        if ticker2 and ticker2 not in failed and snapshot2.exists():
+            ticker2_name = snapshot2.name
             ticker_names = [ticker1_name, ticker2_name]
 
         elif ticker2:
@@ -63,57 +69,83 @@ def main():
         # -----------------------------------
         if display == "Core Financial Ratios":
             #Displays core financial ratios and insights or compares ratios between two companies.
+            from analysis.ratios import (calculate_ratios, calculate_ratio_history, PCT_RATIOS)
+            from analysis.peers import company_bounds
 
             get_page_header("Core Financial Ratios", "Key financial ratios to assess company performance.")
 
-            ratio_metrics1 = calculate_ratios(financials, balance_sheet)
+            ratio_metrics1 = calculate_ratios(snapshot1.financials, snapshot1.balance_sheet)
 
             if ticker2:
-                ratio_metrics2 = calculate_ratios(financials2, balance_sheet2)
+                ratio_metrics2 = calculate_ratios(snapshot2.financials, snapshot2.balance_sheet)
                 col_display_metric(ticker_names, ratio_metrics1, ratio_metrics2)
                 
             else:
-                insights = ratio_insights(ratio_metrics1)
+                insights = ratio_insights(ratio_metrics1, frequency)
                 col_display_insights(ticker1_name, ratio_metrics1, insights, False)
 
+            # full history of every ratio, computed in the same pass as the metrics above
+            with st.expander(f"{ticker1_name} Ratio History"):
+                history = calculate_ratio_history(snapshot1.financials, snapshot1.balance_sheet)
+                history.index = history.index.year if frequency == "annual" else history.index.date
+
+                # highlight ratios outside the normal range of the company's sector or industry peers
+                bounds = {label: company_bounds(label, snapshot1.info, frequency=frequency) for label in history.columns}
+                styled = highlight_df_bounds(history, lower={label: b[0] for label, b in bounds.items()},
+                                             upper={label: b[1] for label, b in bounds.items()})
+                show_table(styled.format("{:.2%}", subset=PCT_RATIOS, na_rep="-")
+                             .format("{:.2f}", subset=history.columns.difference(PCT_RATIOS), na_rep="-"))
+                groups = sorted({b[2] for b in bounds.values() if b[2]})
+                if groups:
+                    st.caption(f"Ratios outside the normal range of {', '.join(groups)} peers are highlighted.")
+
                 
         # -----------------------------------
         #  Growth Metrics
         # -----------------------------------
         elif display == "Growth Metrics":
             # Displays growth metrics with line charts and insights
+            from analysis.growth import growth_panel, latest_growth, aligned_values, CAGR_YEARS
+            from visuals.charts import growth_line_chart
 
             get_page_header("Growth Metrics", "Year-over-year growth rates for key financial metrics.")
 
             tabs = st.tabs(GROWTH_LABELS)
             insights = growth_insights(GROWTH_LABELS)
 
+            # every label for every compared ticker in one pass, shared by all tabs
+            snapshots = [snapshot1, snapshot2] if ticker2 else [snapshot1]
+            panel = growth_panel({s.ticker: (s.financials, s.cashflow) for s in snapshots})
+            reported = panel["value"].columns
+
             for tab, label in zip(tabs, GROWTH_LABELS):
                 with tab:
-                    series1 = get_growth_metrics(financials, cash_flows, label)
-
-                    if series1 is not None:
-                        # calculate growth (pct change) series based on retrieved metric series
-                        growth = calculate_growth_series(series1)
+                    if (label, ticker1) in reported:
+                        growth = panel["growth"][(label, ticker1)].dropna().rename(label)
                         growth_line_chart(ticker1, growth)
 
                         if label in insights:
                             st.caption(insights[label])
 
-                        # if comparing, get growth metrics for second ticker and display side by side
-                        if ticker2:
-                            series2 = get_growth_metrics(financials2, cash_flows2, label)
-                            df = pd.concat([series1, series2], axis=1).dropna()
+                        # latest YoY growth, CAGR and acceleration of each compared ticker
+                        latest = latest_growth(panel, label).rename(
+                            columns={"period": "Period", "growth": "YoY Growth", "cagr": f"{CAGR_YEARS}Y CAGR", "acceleration": "Acceleration"})
+                        show_table(latest.style.format("{:.2%}", subset=latest.columns.drop("Period"), na_rep="-")
+                                   .format(format_period, subset=["Period"]))
+
+                        # if comparing, display both tickers' values side by side, on ticker1's periods
+                        if ticker2 and (label, ticker2) in reported:
+                            df = aligned_values(panel, label, [ticker1, ticker2])
 
                             df.columns = [ticker1_name, ticker2_name]
 
                             # format diluted EPS for easier comparison of numbers
                             if not label == "Diluted EPS":
-                                df = df.style.format(format_large_number)
+                                df = style_large_numbers(df)
                             
                             st.markdown(f"<hr style='margin-top: 5px; margin-bottom: 20px; border: 2px solid #181C24;'>", unsafe_allow_html=True)
                             st.text(f"Comparing {label} Over Time")
-                            st.dataframe(df)
+                            show_table(df)
                         
                     else:
                         st.caption(f"⚠️ {label} data not available.")
@@ -124,14 +156,15 @@ def main():
         # -----------------------------------
         elif display == "Valuation Metrics":
             # Display valuation metrics and insights or compare between two companies
+            from analysis.valuation import get_valuation_metrics
 
             get_page_header("Valuation Metrics", "Key valuation metrics to assess stock price relative to earnings and growth.")
 
             # Get valuation calculations as series, good for scalability
-            valuation_series1 = get_valuation_metrics(ticker1)
+            valuation_series1 = get_valuation_metrics(snapshot1.info)
 
             if ticker2:
-                valuation_series2 = get_valuation_metrics(ticker2)
+                valuation_series2 = get_valuation_metrics(snapshot2.info)
                 col_display_metric(ticker_names, valuation_series1, valuation_series2)
             else:
                 insights = valuation_insights(valuation_series1)
@@ -143,18 +176,70 @@ def main():
         # -----------------------------------
         elif display == "Stock Performance Metrics":
             # Display the share price and metrics for one or two companies
+            from data.fetcher import (get_closes, get_price_histories, select_close, select_field, select_period)
+            from analysis.performance import (calculate_stock_metrics, calculate_horizon_metrics)
+            from analysis.correlation import correlation_stats, ROLLING_WINDOW
+            from visuals.charts import plot_stocks, correlation_heatmap, rolling_correlation_chart
+            from visuals.downsample import METHODS
 
-            get_page_header("Stock Performance Metrics", "Historical stock price performance and key stock metrics.")
+            # additional tickers only join the correlation section below
+            extra_tickers = parse_tickers(st.sidebar.text_input("Additional Tickers (comma separated)"))
 
-            stock_series1 = calculate_stock_metrics(hist1)
+            get_page_header("Stock Performance Metrics", "Historical stock price performance and key stock metrics.")
 
-            if ticker2:
-                plot_stocks(ticker1, ticker2)
-                stock_series2 = calculate_stock_metrics(hist2)
-                col_display_metric(ticker_names, stock_series1, stock_series2)
+            # all tickers' closes for five years, read from the price store when it is up to date and
+            # otherwise downloaded in one request: the horizon table uses all of it, the chart, headline
+            # metrics and correlations the last year
+            closes = get_closes([ticker1, ticker2] + extra_tickers, period="5y")
+            last_year = select_period(closes, "1y")
+
+            # chart interval and period; intraday intervals only offer the periods Yahoo serves
+            col_interval, col_period, col_method = st.columns(3)
+            interval = col_interval.selectbox("Interval", list(CHART_INTERVAL_PERIODS), index=list(CHART_INTERVAL_PERIODS).index("1d"))
+            periods = CHART_INTERVAL_PERIODS[interval]
+            chart_period = col_period.selectbox("Period", periods, index=periods.index("1y") if "1y" in periods else 0)
+            method = col_method.selectbox("Downsampling", METHODS)
+
+            # the default daily 1y chart reuses the closes above
+            if (interval, chart_period) == ("1d", "1y"):
+                chart_closes = last_year
             else:
-                plot_stocks(ticker1)
-                display_MetricData(ticker1_name, stock_series1)
+                chart_closes = select_field(get_price_histories([ticker1, ticker2], period=chart_period, interval=interval))
+            plot_stocks(chart_closes[[t for t in (ticker1, ticker2) if t in chart_closes]], chart_period, method=method)
+
+            # a ticker the download returned no bars for (delisted, mistyped, failed) is reported instead
+            priced = [t for t in (ticker1, ticker2) if t and t in last_year and last_year[t].notna().any()]
+            for ticker in (ticker1, ticker2):
+                if ticker and ticker not in priced:
+                    st.warning(f"⚠️ No price data available for {ticker}.")
+
+            stock_series = {t: calculate_stock_metrics(select_close(last_year, t)) for t in priced}
+            if ticker2 and len(priced) == 2:
+                col_display_metric(ticker_names, stock_series[ticker1], stock_series[ticker2])
+            elif priced:
+                display_MetricData(ticker1_name if priced[0] == ticker1 else ticker2_name, stock_series[priced[0]])
+
+            # every horizon for every ticker, computed in one pass over the price matrix
+            horizons = calculate_horizon_metrics(closes)
+            with st.expander("Metrics by Horizon", expanded=True):
+                shown = zip([ticker1, ticker2], ticker_names) if ticker2 else [(ticker1, ticker1_name)]
+                for ticker, name in shown:
+                    if ticker not in horizons.index.get_level_values("Ticker"):
+                        continue
+                    st.subheader(name)
+                    show_table(horizons.loc[ticker].style
+                                 .format("{:.2%}", subset=[VOLATILITY, MAX_DRAWDOWN, CUMULATIVE_RETURN], na_rep="-")
+                                 .format("{:.2f}", subset=[SHARPE_RATIO], na_rep="-"))
+
+            # correlation of daily returns across every compared ticker
+            correlated = last_year.dropna(axis=1, how="all")
+            if correlated.shape[1] > 1:
+                st.subheader("Correlation")
+                stats = correlation_stats(correlated)
+                correlation_heatmap(stats["correlation"])
+                rolling_correlation_chart(stats["rolling"], correlated.columns[0], ROLLING_WINDOW)
+            elif not extra_tickers and not ticker2:
+                st.info("Enter a compare ticker or additional tickers in the sidebar to see correlations.")
 
             # display cumilative return graph
 
@@ -163,34 +248,44 @@ def main():
         #   Cash Flow & Efficiency
         # -----------------------------------
         elif display == "Cash Flow & Efficiency":
-            # Display 1-4 company metrics side by side for comparison
-
+            # Display metrics for any number of companies side by side for comparison
+            import pandas as pd
+            from analysis.performance import calculate_efficiency_metrics
+            from analysis.peers import company_bounds
 
-            # Allow user to compare up to enter 2 additional companies in sidebar
-            ticker3 = st.sidebar.text_input("Enter Third Ticker").upper()
-            ticker4 = st.sidebar.text_input("Enter Fourth Ticker").upper()
+            # Allow user to enter any number of additional companies in sidebar
+            extra_tickers = parse_tickers(st.sidebar.text_input("Additional Tickers (comma separated)"))
             
             get_page_header("Cash Flow & Efficiency Metrics", "Key cash flow and efficiency metrics to assess company performance.")
 
-            if not ticker2 and (not ticker3 or not ticker4):
-                st.info("Enter 1-3 additional ticker symbols in the sidebar to compare efficiency metrics across multiple companies.")
-            
-            efficiency_metrics1 = calculate_efficiency_metrics(cash_flows, financials, balance_sheet)
-            insights = efficiency_insights(efficiency_metrics1)
-            
-            # Gather efficiency metrics for all companies to compare
-            companies = {ticker1: efficiency_metrics1}
+            if not ticker2 and not extra_tickers:
+                st.info("Enter additional ticker symbols in the sidebar to compare efficiency metrics across multiple companies.")
+
+            # fetch every company's info and statements concurrently, skipping any that fail or time out
+            snapshots = {ticker1: snapshot1}
             if ticker2:
-                efficiency_metrics2 = calculate_efficiency_metrics(cash_flows2, financials2, balance_sheet2)
-                companies[ticker2] = efficiency_metrics2
-            if ticker3:
-                financials3, balance_sheet3, cash_flows3 = get_financial_statements(ticker3)
-                efficiency_metrics3 = calculate_efficiency_metrics(cash_flows3, financials3, balance_sheet3)
-                companies[ticker3] = efficiency_metrics3
-            if ticker4:
-                financials4, balance_sheet4, cash_flows4 = get_financial_statements(ticker4)
-                efficiency_metrics4 = calculate_efficiency_metrics(cash_flows4, financials4, balance_sheet4)
-                companies[ticker4] = efficiency_metrics4
+                snapshots[ticker2] = snapshot2
+            for ticker in extra_tickers:
+                snapshots.setdefault(ticker, TickerSnapshot(ticker, frequency=frequency))
+
+            failed = prefetch(snapshots.values(), ["info"] + STATEMENT_FIELDS)
+            for ticker, reason in failed.items():
+                st.sidebar.warning(f"⚠️ Skipped {ticker}: {reason}")
+
+            # Gather efficiency metrics for all companies to compare
+            companies = {}
+            for ticker, snapshot in snapshots.items():
+                if ticker in failed:
+                    continue
+                if not snapshot.exists():
+                    st.sidebar.error(f"⚠️ Invalid ticker symbol: {ticker}")
+                    continue
+                companies[ticker] = calculate_efficiency_metrics(snapshot.cashflow, snapshot.financials, snapshot.balance_sheet)
+
+            if ticker1 not in companies:
+                st.error(f"⚠️ Could not load data for {ticker1}.")
+                return
+            insights = efficiency_insights(companies[ticker1])
 
             # display key for highlight colors
             st.markdown("""
@@ -213,17 +308,33 @@ def main():
                     st.caption(insights[label])
 
                 df = pd.DataFrame({comp: companies[comp][label] for comp in companies if companies[comp][label] is not None})
-                df.index.name = 'Year'
+                if df.empty:
+                    st.caption(f"⚠️ {label} data not available.")
+                    continue
+                if frequency == "annual":
+                    df.index.name = 'Year'
+                else:
+                    df.index = pd.Index(df.index.date, name='Period End')
+
+                # each company's normal range comes from its sector or industry peers when a peer
+                # index has been built, otherwise from the static CF_BOUNDS
+                bounds = {} if label == "Free Cash Flows" else {
+                    comp: company_bounds(label, snapshots[comp].info, CF_BOUNDS[label], frequency) for comp in df.columns}
+                lower = {comp: b[0] for comp, b in bounds.items()}
+                upper = {comp: b[1] for comp, b in bounds.items()}
 
                 # Ensure df is correctly styled based on format needeed for output
                 if label == "Free Cash Flows":
-                    styled_df = df.style.format(format_large_number)
+                    styled_df = style_large_numbers(df)
                 elif label == "FCF Margin" or label == "Operating Margin":
-                    styled_df = highlight_df_bounds(df, lower=CF_BOUNDS[label][0], upper=CF_BOUNDS[label][1]).format("{:.2%}")
+                    styled_df = highlight_df_bounds(df, lower=lower, upper=upper).format("{:.2%}")
                 else:
-                    styled_df = highlight_df_bounds(df, lower=CF_BOUNDS[label][0], upper=CF_BOUNDS[label][1])
+                    styled_df = highlight_df_bounds(df, lower=lower, upper=upper)
                 
-                st.dataframe(styled_df)
+                show_table(styled_df)
+                groups = [f"{comp}: {b[2]}" for comp, b in bounds.items() if b[2]]
+                if groups:
+                    st.caption(f"Normal ranges from peers ({', '.join(groups)}).")
 
 
     else:
@@ -250,7 +361,7 @@ def main():
                     </ul>
                 <h6 style='color: #5C6B9C'>Growth Metrics</h6>
                     <ul style='font-size:1rem; padding-left: 20px;'>
-                        <li> Displays graphs of year-over-year growth rates for key financial metrics.</li>
+                        <li> Displays graphs of year-over-year growth rates for key financial metrics, with multi-year CAGR and growth acceleration.</li>
                         <li> Total Revenue, Net Income, Diluted EPS, Free Cash Flows </li>
                     </ul>
                 <h6 style='color: #5C6B9C'>Valuation Metrics</h6>
@@ -265,17 +376,41 @@ def main():
                     </ul>
                 <h6 style='color: #5C6B9C'>Cash Flows & Efficiency</h6>
                     <ul style='font-size:1rem; padding-left: 20px;'>
-                        <li> Displays tables of 1-4 companies comparing efficiency metrics and highlighting outliers outside of standard range.</li>
+                        <li> Displays tables of any number of companies comparing efficiency metrics and highlighting outliers outside of standard range.</li>
                         <li> Free Cash Flows, FCF Margin, Operating Margin, Asset Turnover </li>
                     </ul>
             """, 
             unsafe_allow_html=True
         )
 
-        if ticker1 and not ticker_exists(ticker1):
+        # the prefetch above already loaded (or gave up on) the info, so this doesn't fetch again
+        if ticker1 in failed:
+            st.sidebar.warning(f"⚠️ Could not load {ticker1}: {failed[ticker1]}")
+        elif ticker1:
             st.sidebar.warning("Please enter a valid primary ticker symbol")
         else:
             st.sidebar.info("Enter a primary ticker symbol to begin analysis.")
 
 
-main()
+def run():
+    # the debug toggle sits at the bottom of the sidebar, so its value is read from the
+    # session state (set on the previous interaction) before the page starts fetching
+    debug = st.session_state.get("debug_panel", False)
+
+    # with the panel on, the run records into a recorder of its own, so other sessions' runs
+    # neither stop nor clear it; otherwise spans go to the process-wide recorder (FA_TRACE)
+    recorder = trace.Recorder(memory=st.session_state.get("debug_memory", False)) if debug else None
+    try:
+        with trace.recording(recorder):
+            with trace.span("page", "page"):
+                main()
+
+            st.sidebar.toggle("Debug panel", key="debug_panel", help="Time spent fetching, caching, computing and rendering this page")
+            if debug:
+                debug_panel()
+    finally:
+        if recorder is not None:
+            recorder.disable()
+
+
+run()
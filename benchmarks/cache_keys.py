@@ -0,0 +1,84 @@
+"""
+benchmarks/cache_keys.py
+
+Memoization cache-hit benchmark.
+Times a cache hit of calculate_stock_metrics on a long synthetic price history
+when the frame's cache key is found by hashing its contents (untagged, as for
+data that didn't come through the fetcher) and when it carries the fingerprint
+the fetcher registers at load time. Covers the in-process LRU backend and
+st.cache_data, where the old path let Streamlit hash every argument.
+
+Usage:
+    python -m benchmarks.cache_keys
+    python -m benchmarks.cache_keys --years 30 --tickers 500
+"""
+
+import argparse
+import sys
+import time
+import warnings
+
+import pandas as pd
+
+from analysis.performance import calculate_stock_metrics
+from benchmarks.synthetic import price_bars
+from utils.memo import make_key, memoize, set_fingerprint, content_fingerprint, streamlit_cached
+
+
+def per_call(func, repeat):
+    """mean seconds per call after one warm-up call (which fills the cache)"""
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def histories(n_tickers, years):
+    """one ticker's bars, and a wide multi-ticker frame"""
+    end = pd.Timestamp.now().normalize()
+    start = end - pd.DateOffset(years=years)
+    bars = price_bars("BENCH", end, start=start)
+    wide = pd.concat({f"T{i:04d}": bars for i in range(n_tickers)}, axis=1)
+    return bars, wide
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cache-hit cost: content hashing vs. fetch-time fingerprints.")
+    parser.add_argument("--years", type=int, default=20, help="years of daily bars")
+    parser.add_argument("--tickers", type=int, default=200, help="tickers in the wide frame")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    bars, wide = histories(args.tickers, args.years)
+    tagged_bars, tagged_wide = bars.copy(), wide.copy()
+    start = time.perf_counter()
+    set_fingerprint(tagged_bars, f"BENCH:history:{content_fingerprint(bars)}")
+    set_fingerprint(tagged_wide, f"histories:{content_fingerprint(wide)}")
+    tagging = time.perf_counter() - start
+
+    lru = memoize(calculate_stock_metrics.uncached)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        import streamlit as st
+        hashed_by_streamlit = st.cache_data(calculate_stock_metrics.uncached)
+        keyed = streamlit_cached(calculate_stock_metrics.uncached)
+
+        rows = [
+            ("make_key, single ticker", lambda: make_key(lru, (bars,), {}), lambda: make_key(lru, (tagged_bars,), {})),
+            ("make_key, wide frame", lambda: make_key(lru, (wide,), {}), lambda: make_key(lru, (tagged_wide,), {})),
+            ("LRU hit", lambda: lru(bars), lambda: lru(tagged_bars)),
+            ("st.cache_data hit", lambda: hashed_by_streamlit(bars), lambda: keyed(tagged_bars)),
+        ]
+        results = [(name, per_call(before, args.repeat), per_call(after, args.repeat)) for name, before, after in rows]
+
+    print(f"{len(bars):,} daily bars per ticker; wide frame {wide.shape[0]:,} x {wide.shape[1]:,}")
+    print(f"{'cache hit':<26} {'hashing':>10} {'fingerprint':>12}")
+    for name, before, after in results:
+        print(f"{name:<26} {before * 1e6:>8.0f}us {after * 1e6:>10.0f}us")
+    print(f"one-time fingerprint at fetch (both frames): {tagging * 1000:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+benchmarks/chart_payload.py
+
+Price chart payload benchmark.
+Builds the Stock Performance chart for synthetic minute bars (two tickers) with
+every bar, with LTTB and with min/max downsampling, and reports the points
+plotted, the JSON payload sent to the browser and the time to build and
+serialize the figure.
+
+Usage:
+    python -m benchmarks.chart_payload
+    python -m benchmarks.chart_payload --bars 1000000
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from visuals.charts import stock_figure
+from visuals.downsample import METHODS
+
+
+def minute_closes(n_bars, tickers=("AAA", "BBB"), seed=0):
+    """random-walk minute closes for a few tickers, one column each"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-02 14:30", periods=n_bars, freq="min", tz="UTC")
+    walks = 50 * np.exp(np.cumsum(rng.normal(0, 0.0005, (n_bars, len(tickers))), axis=0))
+    return pd.DataFrame(walks, index=index, columns=list(tickers))
+
+
+def measure(closes, max_points, method):
+    start = time.perf_counter()
+    fig, bars, points = stock_figure(closes, "max", max_points, method)
+    payload = len(fig.to_json())
+    return {"bars": bars, "points": points, "payload": payload, "seconds": time.perf_counter() - start}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chart payload with and without downsampling.")
+    parser.add_argument("--bars", type=int, default=200_000, help="bars per ticker")
+    parser.add_argument("--points", type=int, default=1200, help="points per series after downsampling")
+    args = parser.parse_args(argv)
+
+    closes = minute_closes(args.bars)
+    results = {"every bar": measure(closes, None, "lttb")}
+    for method in METHODS:
+        results[method] = measure(closes, args.points, method)
+
+    print(f"{closes.shape[1]} tickers x {args.bars:,} minute bars")
+    print(f"{'chart':<10} {'points':>10} {'payload':>12} {'build+json':>11}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['points']:>10,} {r['payload'] / 1024:>10,.0f}KB {r['seconds'] * 1000:>9.0f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
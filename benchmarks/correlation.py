@@ -0,0 +1,72 @@
+"""
+benchmarks/correlation.py
+
+Correlation engine benchmark.
+Times returns, correlation, covariance and rolling correlation for a synthetic
+universe with analysis/correlation.py against pandas (DataFrame.corr/cov and
+rolling().corr()), and a cached correlation_stats lookup.
+
+Usage:
+    python -m benchmarks.correlation
+    python -m benchmarks.correlation --tickers 500 --years 3
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from analysis.correlation import (returns_matrix, correlation_matrix, covariance_matrix, rolling_correlation,
+                                  correlation_stats, MIN_PERIODS, ROLLING_WINDOW)
+from benchmarks.horizon_metrics import synthetic_closes
+from utils.memo import set_fingerprint
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vectorized vs. pandas correlation and covariance.")
+    parser.add_argument("--tickers", type=int, default=300)
+    parser.add_argument("--years", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    closes = synthetic_closes(args.tickers, args.years)
+    returns = returns_matrix(closes)
+    base = returns.columns[0]
+
+    engine = {
+        "returns": timed(lambda: returns_matrix(closes)),
+        "correlation": timed(lambda: correlation_matrix(returns)),
+        "covariance": timed(lambda: covariance_matrix(returns)),
+        "rolling": timed(lambda: rolling_correlation(returns, base)),
+    }
+    pandas = {
+        "returns": timed(lambda: closes.apply(lambda s: s.dropna().pct_change()).reindex(closes.index)),
+        "correlation": timed(lambda: returns.corr(min_periods=MIN_PERIODS)),
+        "covariance": timed(lambda: returns.cov(min_periods=MIN_PERIODS)),
+        "rolling": timed(lambda: returns.drop(columns=base).rolling(ROLLING_WINDOW).corr(returns[base])),
+    }
+
+    pairs = args.tickers * (args.tickers - 1) // 2
+    print(f"{args.tickers} tickers ({pairs:,} pairs) x {len(closes)} days")
+    print(f"{'step':<14} {'engine':>10} {'pandas':>10}")
+    for step in engine:
+        print(f"{step:<14} {engine[step][0] * 1000:>8.1f}ms {pandas[step][0] * 1000:>8.1f}ms")
+    matches = np.allclose(engine["correlation"][1], pandas["correlation"][1], atol=1e-12, equal_nan=True)
+    print(f"correlation matches pandas: {matches}")
+
+    # tagged as the fetcher tags downloaded prices, so the memo key doesn't hash them
+    set_fingerprint(closes, f"synthetic:{args.tickers}:{args.years}")
+    first, _ = timed(lambda: correlation_stats(closes))
+    cached, _ = timed(lambda: correlation_stats(closes))
+    print(f"correlation_stats: {first * 1000:.1f}ms first call, {cached * 1000:.1f}ms cached")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+benchmarks/growth_panel.py
+
+Growth engine benchmark.
+Computes growth for every growth label over synthetic statements for many
+tickers, once with growth_panel (one aligned matrix, one vectorized step) and
+once with get_growth_metrics + calculate_growth_series per label and ticker,
+as the Growth Metrics view used to, and checks the YoY growth agrees. The panel
+is timed on normalized DataFrames and on CompactStatements.
+
+Usage:
+    python -m benchmarks.growth_panel
+    python -m benchmarks.growth_panel --tickers 1000 --years 20
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from analysis.growth import growth_panel, get_growth_metrics, calculate_growth_series
+from benchmarks.synthetic import statement
+from data.line_items import normalize_statement
+from data.statement_store import CompactStatement
+from utils.constants import GROWTH_LABELS
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def per_label(statements):
+    """YoY growth one label and ticker at a time"""
+    return {(label, ticker): calculate_growth_series(get_growth_metrics.uncached(financials, cash_flows, label))
+            for ticker, (financials, cash_flows) in statements.items() for label in GROWTH_LABELS}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="One-pass growth panel vs. per-label growth series.")
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    statements = {f"T{i:05d}": (normalize_statement(statement(n_periods=args.years, seed=2 * i)),
+                                normalize_statement(statement(n_periods=args.years, seed=2 * i + 1)))
+                  for i in range(args.tickers)}
+
+    compact = {ticker: tuple(CompactStatement.from_frame(s) for s in pair) for ticker, pair in statements.items()}
+
+    one_pass, panel = timed(lambda: growth_panel.uncached(statements))
+    compact_pass, _ = timed(lambda: growth_panel.uncached(compact))
+    looped, reference = timed(lambda: per_label(statements))
+
+    matches = all(np.allclose(panel["growth"][column].dropna().to_numpy(), series.to_numpy())
+                  for column, series in reference.items())
+    print(f"{args.tickers} tickers x {len(GROWTH_LABELS)} labels x {args.years} years")
+    print(f"growth panel  {one_pass * 1000:>10.1f}ms  (YoY growth, CAGR and acceleration)")
+    print(f"  compact     {compact_pass * 1000:>10.1f}ms")
+    print(f"per label     {looped * 1000:>10.1f}ms  (YoY growth only)")
+    print(f"speedup       {looped / one_pass:>10.1f}x   same growth: {matches}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
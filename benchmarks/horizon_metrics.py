@@ -0,0 +1,76 @@
+"""
+benchmarks/horizon_metrics.py
+
+Multi-horizon stock metrics benchmark.
+Computes volatility, Sharpe ratio, max drawdown and cumulative return for every
+horizon in STOCK_HORIZONS over a synthetic wide close-price matrix, once with
+calculate_horizon_metrics (one pass) and once by running calculate_stock_metrics
+on each ticker's window for each horizon, and checks that they agree.
+
+Usage:
+    python -m benchmarks.horizon_metrics
+    python -m benchmarks.horizon_metrics --tickers 5000 --years 5
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis.performance import calculate_horizon_metrics, calculate_stock_metrics, _horizon_start
+from utils.constants import STOCK_HORIZONS, STOCK_LABELS
+
+
+def synthetic_closes(n_tickers, years, seed=0):
+    """dates x tickers random-walk closes, with ~2% of bars missing (holidays, halts)"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=years * 261)
+    closes = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, (len(dates), n_tickers)), axis=0))
+    closes[rng.random(closes.shape) < 0.02] = np.nan
+    return pd.DataFrame(closes, index=dates, columns=[f"T{i:05d}" for i in range(n_tickers)])
+
+
+def per_window(closes):
+    """the same table from calculate_stock_metrics, one ticker and horizon at a time"""
+    last = closes.index[-1]
+    rows = {}
+    for ticker in closes.columns:
+        bars = closes[[ticker]].rename(columns={ticker: "Close"}).dropna()
+        for horizon in STOCK_HORIZONS:
+            metrics = calculate_stock_metrics.uncached(bars.loc[_horizon_start(last, horizon):])
+            rows[(ticker, horizon)] = [metrics[label].value for label in STOCK_LABELS]
+    return pd.DataFrame.from_dict(rows, orient="index", columns=STOCK_LABELS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="One-pass vs. per-window multi-horizon stock metrics.")
+    parser.add_argument("--tickers", type=int, default=1000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--sample", type=int, default=100, help="tickers to run the per-window loop on")
+    args = parser.parse_args(argv)
+
+    closes = synthetic_closes(args.tickers, args.years)
+
+    start = time.perf_counter()
+    table = calculate_horizon_metrics.uncached(closes)
+    one_pass = time.perf_counter() - start
+
+    # the per-window loop is slow, so it runs on a sample and is scaled up
+    sample = closes.iloc[:, :min(args.sample, args.tickers)]
+    start = time.perf_counter()
+    reference = per_window(sample)
+    looped = (time.perf_counter() - start) * args.tickers / sample.shape[1]
+
+    expected = table.loc[list(sample.columns)].to_numpy()
+    matches = np.allclose(expected, reference.to_numpy(dtype=float), rtol=1e-9, equal_nan=True)
+    print(f"{args.tickers} tickers x {len(closes)} days, {len(STOCK_HORIZONS)} horizons")
+    print(f"one pass      {one_pass * 1000:>10.0f}ms")
+    print(f"per window    {looped * 1000:>10.0f}ms  (estimated from {sample.shape[1]} tickers)")
+    print(f"speedup       {looped / one_pass:>10.0f}x   same values: {matches}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
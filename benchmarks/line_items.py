@@ -0,0 +1,109 @@
+"""
+benchmarks/line_items.py
+
+Line-item lookup benchmark.
+Compares reading the rows the analysis needs by probing alias lists with
+get_value_by_label against normalizing the statement once and reading rows by
+canonical key (one at a time, or all at once with extract_items), on synthetic
+statements with hundreds of rows. With --fixtures
+it also reports the provider labels the schema doesn't cover.
+
+Usage:
+    python -m benchmarks.line_items
+    python -m benchmarks.line_items --rows 100 500 2000 --fixtures fixtures
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+from benchmarks.synthetic import statement
+from data.fetcher import get_value_by_label
+from data.line_items import LINE_ITEMS, normalize_statement, unmapped_labels, extract_items
+from data.providers import LocalProvider, STATEMENT_KINDS
+
+# the line items read by analysis/ratios.py and analysis/performance.py
+ANALYSIS_ITEMS = ["total_revenue", "net_income", "operating_income", "ebit", "interest_expense",
+                  "stockholders_equity", "total_liabilities", "current_liabilities", "non_current_liabilities",
+                  "current_assets", "inventory", "total_assets", "operating_cash_flow", "capital_expenditure"]
+
+
+def best_of(func, repeat):
+    """fastest of `repeat` calls, in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def measure(n_rows, repeat=200):
+    """seconds per statement for each lookup strategy"""
+    df = statement(n_rows)
+    normalized = normalize_statement(df)
+
+    def probe():
+        return [get_value_by_label(df, LINE_ITEMS[key]) for key in ANALYSIS_ITEMS]
+
+    def normalize_and_read():
+        statement_ = normalize_statement(df)
+        return [statement_.loc[key] for key in ANALYSIS_ITEMS]
+
+    def read():
+        return [normalized.loc[key] for key in ANALYSIS_ITEMS]
+
+    def extract():
+        return extract_items(normalized, ANALYSIS_ITEMS)
+
+    return {
+        "rows": n_rows,
+        "probe": best_of(probe, repeat),
+        "normalize": best_of(lambda: normalize_statement(df), repeat),
+        "normalize_and_read": best_of(normalize_and_read, repeat),
+        "read": best_of(read, repeat),
+        "extract": best_of(extract, repeat),
+    }
+
+
+def coverage(root):
+    """count unmapped provider labels across every statement fixture under root"""
+    provider = LocalProvider(root)
+    counts, statements = Counter(), 0
+    for ticker in sorted(os.listdir(root)):
+        for kind in STATEMENT_KINDS:
+            try:
+                df = provider.statement(ticker, kind)
+            except (FileNotFoundError, ValueError):
+                continue
+            statements += 1
+            counts.update(unmapped_labels(df))
+    return statements, counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Line-item lookup benchmark.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--fixtures", help="fixture directory to report unmapped labels for")
+    args = parser.parse_args(argv)
+
+    print(f"{len(ANALYSIS_ITEMS)} lookups per statement, best of {args.repeat}")
+    print(f"{'rows':>6} {'probe':>10} {'normalize':>10} {'norm+read':>10} {'read':>10} {'extract':>10}")
+    for n_rows in args.rows:
+        r = measure(n_rows, args.repeat)
+        print(f"{r['rows']:>6} {r['probe'] * 1e6:>8.0f}us {r['normalize'] * 1e6:>8.0f}us "
+              f"{r['normalize_and_read'] * 1e6:>8.0f}us {r['read'] * 1e6:>8.0f}us {r['extract'] * 1e6:>8.0f}us")
+
+    if args.fixtures:
+        statements, counts = coverage(args.fixtures)
+        print(f"\n{len(counts)} unmapped labels across {statements} statements")
+        for label, count in counts.most_common(30):
+            print(f"  {count:>6}  {label}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
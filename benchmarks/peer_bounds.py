@@ -0,0 +1,97 @@
+"""
+benchmarks/peer_bounds.py
+
+Peer bounds benchmark.
+Builds a PeerIndex over a synthetic universe of tickers spread across sectors
+and industries and times the full build, an incremental refresh of a few
+tickers, and looking up every cell's bounds of a large multi-company table
+from the index against computing each company's peer quantiles on the fly.
+
+Usage:
+    python -m benchmarks.peer_bounds
+    python -m benchmarks.peer_bounds --tickers 20000 --refresh 200
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis.peers import PeerIndex, PEER_METRICS, MIN_PEERS
+from utils.constants import PEER_QUANTILES
+
+
+def synthetic_universe(tickers, seed=0, n_sectors=11, industries_per_sector=12):
+    """a build_universe-shaped table: Sector, Industry and one column per peer metric"""
+    rng = np.random.default_rng(seed)
+    sector = rng.integers(n_sectors, size=len(tickers))
+    industry = sector * industries_per_sector + rng.integers(industries_per_sector, size=len(tickers))
+    values = rng.normal(0.1, 0.2, (len(tickers), len(PEER_METRICS)))
+    values[rng.random(values.shape) < 0.05] = np.nan
+    table = pd.DataFrame(values, index=pd.Index(tickers, name="Ticker"), columns=PEER_METRICS)
+    table.insert(0, "Sector", [f"Sector {s}" for s in sector])
+    table.insert(1, "Industry", [f"Industry {i}" for i in industry])
+    return table
+
+
+def on_the_fly(universe, metric, sector, industry):
+    """the same bounds as PeerIndex.bounds, computed from the universe table for one lookup"""
+    for column, group in (("Industry", industry), ("Sector", sector)):
+        values = universe.loc[universe[column] == group, metric].dropna()
+        if len(values) >= MIN_PEERS:
+            return values.quantile(PEER_QUANTILES[0]), values.quantile(PEER_QUANTILES[1]), group
+    values = universe[metric].dropna()
+    return values.quantile(PEER_QUANTILES[0]), values.quantile(PEER_QUANTILES[1]), "all companies"
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precomputed peer quantile index vs. quantiles on the fly.")
+    parser.add_argument("--tickers", type=int, default=5000)
+    parser.add_argument("--refresh", type=int, default=50, help="tickers changed in the incremental refresh")
+    parser.add_argument("--companies", type=int, default=2000, help="companies (columns) in the looked-up table")
+    parser.add_argument("--sample", type=int, default=100, help="lookups to time on the fly")
+    args = parser.parse_args(argv)
+
+    tickers = [f"T{i:05d}" for i in range(args.tickers)]
+    universe = synthetic_universe(tickers)
+    changed = synthetic_universe(tickers[:args.refresh], seed=1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        build, index = timed(lambda: PeerIndex(directory).update(universe))
+        refresh, _ = timed(lambda: index.update(changed))
+        save, _ = timed(index.save)
+        load, index = timed(lambda: PeerIndex(directory))
+    current = index.universe
+
+    # one lookup per company and metric, as when highlighting a wide comparison table
+    companies = current.sample(args.companies, replace=True, random_state=0)
+    cells = [(metric, sector, industry) for sector, industry in zip(companies["Sector"], companies["Industry"])
+             for metric in PEER_METRICS]
+    lookup, found = timed(lambda: [index.bounds(*cell) for cell in cells])
+
+    sample = cells[:args.sample]
+    fly, reference = timed(lambda: [on_the_fly(current, *cell) for cell in sample])
+    fly *= len(cells) / len(sample)
+    matches = all(np.allclose(a[:2], b[:2]) and a[2] == b[2] for a, b in zip(found, reference))
+
+    print(f"{args.tickers} tickers, {current['Sector'].nunique()} sectors, {current['Industry'].nunique()} industries, "
+          f"{len(PEER_METRICS)} metrics")
+    print(f"full build         {build * 1000:>9.1f}ms")
+    print(f"refresh {args.refresh:>5} tickers {refresh * 1000:>7.1f}ms")
+    print(f"save / load        {save * 1000:>9.1f}ms / {load * 1000:.1f}ms")
+    print(f"{len(cells):,} cell lookups: index {lookup * 1000:.1f}ms ({lookup / len(cells) * 1e6:.2f}us each), "
+          f"on the fly {fly * 1000:.0f}ms (estimated from {len(sample)})   same bounds: {matches}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+benchmarks/price_refresh.py
+
+Nightly price refresh benchmark, fully offline.
+Seeds a scratch cache with a year of daily bars for a synthetic universe, advances
+the simulated provider by one trading day (with a fraction of tickers going
+ex-dividend, which back-adjusts their history) and compares re-downloading the
+whole period against the incremental refresh in data/fetcher.py. Network time is
+modeled from the simulated traffic (--latency, --concurrency, --bandwidth); the
+local column is measured (cache reads/writes and bookkeeping).
+
+Usage:
+    python -m benchmarks.price_refresh
+    python -m benchmarks.price_refresh --tickers 5000 --adjusted 0.02
+"""
+
+import argparse
+import math
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import SimulatedProvider
+from data import fetcher
+from data.cache import DataCache, set_cache
+from data.providers import set_provider
+
+
+def modeled_seconds(provider, latency, concurrency, bandwidth):
+    """network time the provider's traffic would take: per-call latency over concurrent calls plus bytes over bandwidth"""
+    return math.ceil(provider.calls / concurrency) * latency + provider.bytes / bandwidth
+
+
+def run(n_tickers, period, adjusted, latency, concurrency, bandwidth):
+    tickers = [f"T{i:05d}" for i in range(n_tickers)]
+    today = pd.Timestamp.now().normalize()
+    yesterday = today - pd.offsets.BDay(1)
+
+    # a fraction of the universe goes ex-dividend today
+    n_adjusted = int(n_tickers * adjusted)
+    dividends = {ticker: [(pd.offsets.BDay(0).rollback(today), 0.25)] for ticker in tickers[:n_adjusted]}
+
+    with tempfile.TemporaryDirectory() as directory:
+        # last night's run filled the cache; its entries have expired by tonight
+        set_cache(DataCache(directory, ttls={"history": 0}))
+        set_provider(SimulatedProvider(yesterday))
+        fetcher.get_price_histories(tickers, period)
+
+        results = {}
+
+        full = SimulatedProvider(today, dividends)
+        incremental = SimulatedProvider(today, dividends)
+        for provider in (full, incremental):  # generate the bars up front, outside the timings
+            provider.price_histories(tickers, "max")
+            provider.requests = provider.calls = provider.bytes = 0
+
+        # full refresh: download the whole period again and store it
+        start = time.perf_counter()
+        fetcher.get_cache().set_many([(t, "history", bars, f"{period}:1d")
+                                      for t, bars in full.price_histories(tickers, period).items()])
+        results["full"] = (time.perf_counter() - start, full)
+
+        set_provider(incremental)
+        start = time.perf_counter()
+        fetcher.get_price_histories(tickers, period)
+        results["incremental"] = (time.perf_counter() - start, incremental)
+
+        set_cache(None)
+        set_provider(None)
+
+    return {
+        name: {
+            "requests": provider.requests,
+            "calls": provider.calls,
+            "bytes": provider.bytes,
+            "local_seconds": seconds,
+            "modeled_seconds": seconds + modeled_seconds(provider, latency, concurrency, bandwidth),
+        }
+        for name, (seconds, provider) in results.items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full vs. incremental nightly price refresh.")
+    parser.add_argument("--tickers", type=int, default=1000)
+    parser.add_argument("--period", default="1y")
+    parser.add_argument("--adjusted", type=float, default=0.01, help="fraction of tickers going ex-dividend")
+    parser.add_argument("--latency", type=float, default=0.25, help="seconds per upstream call for the network model")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent upstream calls for the network model")
+    parser.add_argument("--bandwidth", type=float, default=2e6, help="bytes per second for the network model")
+    args = parser.parse_args(argv)
+
+    results = run(args.tickers, args.period, args.adjusted, args.latency, args.concurrency, args.bandwidth)
+    print(f"{args.tickers} tickers, period {args.period}, {args.adjusted:.0%} re-adjusted")
+    print(f"{'mode':<12} {'requests':>9} {'calls':>7} {'bytes':>14} {'local':>9} {'modeled':>9}")
+    for name, r in results.items():
+        print(f"{name:<12} {r['requests']:>9} {r['calls']:>7} {r['bytes']:>14,} "
+              f"{r['local_seconds']:>8.2f}s {r['modeled_seconds']:>8.2f}s")
+    full, incremental = results["full"], results["incremental"]
+    print(f"bytes: {full['bytes'] / max(incremental['bytes'], 1):.0f}x less, "
+          f"modeled time: {full['modeled_seconds'] / incremental['modeled_seconds']:.1f}x faster")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+benchmarks/price_store.py
+
+Columnar price store benchmark.
+Writes synthetic daily bars for a universe into a scratch PriceStore, then times
+opening it, slicing one ticker and one date range, and computing last-year
+volatility for every ticker from the memory-mapped arrays, against the same
+computation over one DataFrame per ticker held in memory.
+
+Usage:
+    python -m benchmarks.price_store
+    python -m benchmarks.price_store --tickers 3000 --years 25
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import price_bars
+from data.price_store import PriceStore
+
+
+def synthetic_histories(tickers, end, start):
+    """{ticker: bars} of synthetic daily bars"""
+    return {ticker: price_bars(ticker, end, start=start) for ticker in tickers}
+
+
+def wide(histories):
+    """a get_price_histories-shaped frame from {ticker: bars}"""
+    return pd.concat(histories, axis=1, names=["Ticker", "Price"]).swaplevel(axis=1)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def frame_volatility(histories, since):
+    """annualized volatility since `since` for each ticker, one DataFrame at a time"""
+    return {ticker: bars.loc[since:, "Close"].pct_change().std() * np.sqrt(252) for ticker, bars in histories.items()}
+
+
+def store_volatility(store, since):
+    """annualized volatility since `since` for every ticker at once, from the mapped Close array"""
+    close = store.field("Close", start=since)
+    returns = close[:, 1:] / close[:, :-1] - 1
+    return np.nanstd(returns, axis=1, ddof=1) * np.sqrt(252)
+
+
+def run(n_tickers, years, chunk_size=200):
+    tickers = [f"T{i:05d}" for i in range(n_tickers)]
+    end = pd.Timestamp.now().normalize()
+    start = end - pd.DateOffset(years=years)
+    since = end - pd.DateOffset(years=1)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = PriceStore(directory)
+        write_seconds, histories = 0.0, {}
+        for i in range(0, n_tickers, chunk_size):
+            chunk = synthetic_histories(tickers[i:i + chunk_size], end, start)
+            histories.update(chunk)
+            frame = wide(chunk)
+            seconds, _ = timed(lambda: store.write(frame))
+            write_seconds += seconds
+        results["write"] = write_seconds
+        results["disk_bytes"] = store.nbytes
+        results["frame_bytes"] = sum(int(bars.memory_usage(index=True).sum()) for bars in histories.values())
+
+        results["open"], store = timed(lambda: PriceStore(directory))
+        results["one_ticker"], _ = timed(lambda: store.series(tickers[n_tickers // 2]).copy())
+        results["date_range"], _ = timed(lambda: store.field("Close", start=since).copy())
+        results["volatility_store"], from_store = timed(lambda: store_volatility(store, since))
+        results["volatility_frames"], from_frames = timed(lambda: frame_volatility(histories, since))
+        results["matches"] = np.allclose(from_store, [from_frames[t] for t in store.tickers])
+        results["days"] = store.days
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory-mapped price store benchmark.")
+    parser.add_argument("--tickers", type=int, default=1000)
+    parser.add_argument("--years", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    r = run(args.tickers, args.years)
+    print(f"{args.tickers} tickers x {r['days']} days: {r['disk_bytes'] / 1e6:,.0f} MB on disk, "
+          f"{r['frame_bytes'] / 1e6:,.0f} MB as DataFrames, written in {r['write']:.2f}s")
+    print(f"open store               {r['open'] * 1000:>9.2f}ms")
+    print(f"one ticker, all days     {r['one_ticker'] * 1000:>9.2f}ms")
+    print(f"all tickers, last year   {r['date_range'] * 1000:>9.2f}ms")
+    print(f"1y volatility, store     {r['volatility_store'] * 1000:>9.2f}ms")
+    print(f"1y volatility, frames    {r['volatility_frames'] * 1000:>9.2f}ms  (same values: {r['matches']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
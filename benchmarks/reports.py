@@ -0,0 +1,80 @@
+"""
+benchmarks/reports.py
+
+Batch report benchmark.
+Builds report inputs for a synthetic coverage pack (statements, info and a
+year of prices per ticker, shaped like load_report_inputs' result) and renders
+one HTML report per ticker into a scratch directory with render_reports, on one
+process and on a process pool. Reports the time per report, the size of the
+shared inputs each worker receives once at startup, and the projected time for
+a 500-ticker pack.
+
+Usage:
+    python -m benchmarks.reports
+    python -m benchmarks.reports --tickers 200 --workers 8
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import statement, price_bars
+from data.line_items import normalize_statement
+from data.statement_store import CompactStatement
+from visuals.report import render_reports
+
+
+def synthetic_inputs(tickers, years=5):
+    """{ticker: {info, financials, balance_sheet, cashflow, prices}} as load_report_inputs returns"""
+    inputs = {}
+    for i, ticker in enumerate(tickers):
+        rng = np.random.default_rng(i)
+        info = {"shortName": f"{ticker} Corp", "sector": f"Sector {i % 11}", "industry": f"Industry {i % 60}",
+                "trailingPE": rng.uniform(5, 40), "forwardPE": rng.uniform(5, 35), "priceToBook": rng.uniform(0.5, 8),
+                "marketCap": 10 ** rng.uniform(8, 12.5), "enterpriseValue": 10 ** rng.uniform(8, 12.5),
+                "enterpriseToEbitda": rng.uniform(3, 30), "enterpriseToRevenue": rng.uniform(0.5, 12),
+                "earningsGrowth": rng.uniform(-0.2, 0.4)}
+        financials, balance_sheet, cashflow = (
+            CompactStatement.from_frame(normalize_statement(statement(n_periods=years, seed=3 * i + k))) for k in range(3))
+        bars = price_bars(ticker, "2024-12-31")
+        inputs[ticker] = {"info": info, "financials": financials, "balance_sheet": balance_sheet,
+                          "cashflow": cashflow, "prices": bars[bars.index > pd.Timestamp("2023-12-31")]}
+    return inputs
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render batch reports on one process vs. a process pool.")
+    parser.add_argument("--tickers", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    inputs = synthetic_inputs([f"T{i:04d}" for i in range(args.tickers)])
+    shared = len(pickle.dumps(inputs, protocol=pickle.HIGHEST_PROTOCOL))
+
+    with tempfile.TemporaryDirectory() as directory:
+        serial, (paths, failed) = timed(lambda: render_reports(inputs, directory, workers=1))
+        size = sum(os.path.getsize(path) for path in paths.values()) / len(paths)
+        pooled, (pool_paths, pool_failed) = timed(lambda: render_reports(inputs, directory, workers=args.workers))
+
+    print(f"{args.tickers} tickers, {len(paths)} reports ({size / 1024:.0f} KB each), {len(failed) + len(pool_failed)} failed")
+    print(f"shared inputs      {shared / 1e6:>8.1f} MB  (sent to each worker once)")
+    print(f"1 process          {serial:>8.1f}s   {serial / len(paths) * 1000:.0f}ms per report")
+    print(f"{args.workers:>2} workers         {pooled:>8.1f}s   {pooled / len(pool_paths) * 1000:.0f}ms per report")
+    print(f"500-ticker pack    {pooled / len(pool_paths) * 500:>8.0f}s   projected with {args.workers} workers")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
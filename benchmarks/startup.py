@@ -0,0 +1,99 @@
+"""
+benchmarks/startup.py
+
+Startup benchmark for the Overview page.
+Runs app.py in Streamlit's bare mode under `python -X importtime` (no ticker entered,
+so the Overview renders), and reports wall time to first render, import time per
+top-level module, and whether any heavy dependency was loaded.
+
+Usage:
+    python -m benchmarks.startup                       # print a report
+    python -m benchmarks.startup --save startup.json   # record a baseline
+    python -m benchmarks.startup --baseline startup.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# dependencies the Overview page should never need
+# (plotly is left out: Streamlit imports it for its own chart theme)
+HEAVY_MODULES = ["pandas", "numpy", "yfinance", "pyarrow"]
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def run_once():
+    """run the app once and return (wall seconds, {module: cumulative import seconds} for top-level imports, loaded modules)"""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "app.py"], cwd=ROOT,
+                          capture_output=True, text=True, env={**os.environ, "FA_CACHE": "0"})
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"app.py failed:\n{proc.stderr[-2000:]}")
+
+    top_level, loaded = {}, set()
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        _, cumulative, indent, name = match.groups()
+        loaded.add(name)
+        if len(indent) == 1:  # one space: imported directly by app.py or the interpreter
+            top_level[name] = int(cumulative) / 1e6
+    return wall, top_level, loaded
+
+
+def measure(runs=5):
+    """median wall and import times over several runs"""
+    results = [run_once() for _ in range(runs)]
+    walls = [wall for wall, _, _ in results]
+    modules = sorted({name for _, top_level, _ in results for name in top_level})
+    imports = {name: statistics.median(r[1].get(name, 0.0) for r in results) for name in modules}
+    return {
+        "runs": runs,
+        "wall_seconds": statistics.median(walls),
+        "import_seconds": sum(imports.values()),
+        "top_imports": dict(sorted(imports.items(), key=lambda item: -item[1])[:15]),
+        "heavy_modules_loaded": [m for m in HEAVY_MODULES if m in results[0][2]],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time-to-first-render benchmark for the Overview page.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a saved JSON result")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown vs. baseline (fraction)")
+    args = parser.parse_args(argv)
+
+    result = measure(args.runs)
+    print(f"time to first render: {result['wall_seconds'] * 1000:.0f} ms (median of {args.runs})")
+    print(f"import time:          {result['import_seconds'] * 1000:.0f} ms")
+    for name, seconds in result["top_imports"].items():
+        print(f"  {name:<40} {seconds * 1000:8.1f} ms")
+    print(f"heavy modules loaded: {', '.join(result['heavy_modules_loaded']) or 'none'}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    failed = bool(result["heavy_modules_loaded"])
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        change = result["wall_seconds"] / baseline["wall_seconds"] - 1
+        print(f"vs. baseline:         {change:+.1%}")
+        failed |= change > args.threshold
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+benchmarks/statement_memory.py
+
+Memory and compute benchmark for holding many tickers' statements.
+Measures the traced memory per ticker of provider DataFrames, normalized
+DataFrames and CompactStatements, and the time to run the ratio and
+efficiency calculations over every ticker from each representation.
+
+Usage:
+    python -m benchmarks.statement_memory                     # synthetic statements
+    python -m benchmarks.statement_memory --tickers 5000
+    python -m benchmarks.statement_memory --fixtures fixtures # recorded fixtures
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+from analysis.performance import calculate_efficiency_metrics
+from analysis.ratios import ratio_history
+from benchmarks.synthetic import statement
+from data.line_items import normalize_statement
+from data.providers import LocalProvider, STATEMENT_KINDS
+from data.statement_store import CompactStatement
+
+# rows per synthetic statement, roughly what yfinance returns for a large cap
+SYNTHETIC_ROWS = {"financials": 45, "balance_sheet": 70, "cashflow": 50}
+
+
+def synthetic_statements(n_tickers, n_periods=4):
+    """{ticker: (financials, balance_sheet, cashflow)} of synthetic provider frames"""
+    return {
+        f"T{i:05d}": tuple(statement(SYNTHETIC_ROWS[kind], n_periods, seed=i * 3 + k)
+                           for k, kind in enumerate(STATEMENT_KINDS))
+        for i in range(n_tickers)
+    }
+
+
+def fixture_statements(root):
+    """{ticker: (financials, balance_sheet, cashflow)} read from a LocalProvider fixture directory"""
+    provider = LocalProvider(root)
+    statements = {}
+    for ticker in sorted(os.listdir(root)):
+        try:
+            statements[ticker] = tuple(provider.statement(ticker, kind) for kind in STATEMENT_KINDS)
+        except (FileNotFoundError, ValueError):
+            continue
+    return statements
+
+
+def run_analysis(statements):
+    """ratio history and efficiency metrics for every ticker, uncached"""
+    for financials, balance_sheet, cashflow in statements.values():
+        ratio_history(financials, balance_sheet)
+        calculate_efficiency_metrics.uncached(cashflow, financials, balance_sheet)
+
+
+# how each representation is built from freshly loaded provider frames
+REPRESENTATIONS = {
+    "provider frames": lambda df: df,
+    "normalized frames": normalize_statement,
+    "compact": CompactStatement.from_frame,
+}
+
+
+def measure(load):
+    """
+    Memory per ticker and analysis time for each representation of the statements returned by load().
+    Memory is what is still allocated after the analysis has run once (so lazily built pandas
+    index hash tables are included) while the statements are held, as traced by tracemalloc.
+    """
+    results = {}
+    for name, convert in REPRESENTATIONS.items():
+        gc.collect()
+        tracemalloc.start()
+        statements = {t: tuple(convert(df) for df in s) for t, s in load().items()}
+        run_analysis(statements)
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # time a second pass outside tracemalloc
+        start = time.perf_counter()
+        run_analysis(statements)
+        results[name] = {"tickers": len(statements), "bytes_per_ticker": current / len(statements),
+                         "analysis_seconds": time.perf_counter() - start}
+        del statements
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Statement memory and compute benchmark.")
+    parser.add_argument("--tickers", type=int, default=1000, help="number of synthetic tickers")
+    parser.add_argument("--fixtures", help="use recorded fixtures from this directory instead of synthetic data")
+    args = parser.parse_args(argv)
+
+    if args.fixtures:
+        results = measure(lambda: fixture_statements(args.fixtures))
+    else:
+        results = measure(lambda: synthetic_statements(args.tickers))
+
+    print(f"{results['compact']['tickers']} tickers")
+    print(f"{'representation':<20} {'bytes/ticker':>14} {'analysis':>12}")
+    for name, r in results.items():
+        print(f"{name:<20} {r['bytes_per_ticker']:>14,.0f} {r['analysis_seconds'] * 1000:>10.0f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+"""
+benchmarks/suite.py
+
+Microbenchmark suite for the analysis hot paths.
+Times calculate_ratios, calculate_efficiency_metrics, get_growth_metrics,
+calculate_stock_metrics, get_value_by_label, highlight_df_bounds, K/M/B/T
+formatting of a free cash flow table (the strings, and the Styler rendering
+every cell as st.dataframe does) and the insight commentary (insight_table over
+a screener table, and per company as the app does) on synthetic data at several
+scales (1 ticker x 4 years up to 5,000 tickers x 40 quarters of statements, 1 up
+to 30 years of daily bars, 10 up to 50,000 screened companies), with the peak
+memory of each run, plus calculate_ratios through a traced() span with tracing
+off, on, and on with memory peaks (utils/trace.py) to show what the spans add.
+Compares a run against a saved JSON baseline. Cached functions are timed
+uncached. Everything is generated locally, so it runs offline.
+
+Usage:
+    python -m benchmarks.suite run                                  # every case, small to large
+    python -m benchmarks.suite run --scales xlarge
+    python -m benchmarks.suite run --scales small medium --save baseline.json
+    python -m benchmarks.suite run --cases calculate_ratios --baseline baseline.json
+    python -m benchmarks.suite compare baseline.json current.json --threshold 0.2
+"""
+
+import argparse
+import datetime
+import functools
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from analysis.growth import get_growth_metrics
+from analysis.insights import insight_table, ratio_insights, valuation_insights
+from analysis.performance import calculate_efficiency_metrics, calculate_stock_metrics
+from analysis.ratios import calculate_ratios
+from benchmarks.synthetic import statement, quarterly_statement, price_bars, screener_table, comparison_tables
+from data.fetcher import get_value_by_label
+from data.line_items import LINE_ITEMS, normalize_statement, set_frequency
+from data.metric_data import MetricData
+from utils.constants import GROWTH_LABELS
+from utils import trace
+from utils.formatter import highlight_df_bounds, format_large_numbers, style_large_numbers
+
+# rows per synthetic statement, roughly what yfinance returns for a large cap
+STATEMENT_ROWS = {"financials": 45, "balance_sheet": 70, "cashflow": 50}
+
+# scale name -> (statements: tickers, periods, frequency), (prices: tickers, years), (table: rows, columns),
+# (screener: companies)
+SCALES = {
+    "small": {"statements": (1, 4, "annual"), "prices": (1, 1), "table": (10, 2), "screener": 10},
+    "medium": {"statements": (100, 10, "annual"), "prices": (100, 5), "table": (200, 10), "screener": 1000},
+    "large": {"statements": (1000, 40, "quarterly"), "prices": (500, 10), "table": (2000, 10), "screener": 5000},
+    "xlarge": {"statements": (5000, 40, "quarterly"), "prices": (500, 30), "table": (10000, 20), "screener": 50000},
+}
+
+# xlarge takes several minutes (and a few GB) to generate and run, so it is opt-in
+DEFAULT_SCALES = ["small", "medium", "large"]
+
+
+def scale_label(scale):
+    """human-readable size of a scale, e.g. '1000 tickers x 40 quarters'"""
+    tickers, periods, frequency = SCALES[scale]["statements"]
+    price_tickers, years = SCALES[scale]["prices"]
+    rows, columns = SCALES[scale]["table"]
+    unit = "years" if frequency == "annual" else "quarters"
+    return (f"{tickers} tickers x {periods} {unit}; {price_tickers} x {years}y daily bars; "
+            f"{rows} x {columns} table; {SCALES[scale]['screener']} screened companies")
+
+
+def raw_statements(scale):
+    """[(financials, balance_sheet, cashflow)] provider-shaped frames for every ticker of a scale"""
+    tickers, periods, frequency = SCALES[scale]["statements"]
+    generate = statement if frequency == "annual" else quarterly_statement
+    return [tuple(generate(STATEMENT_ROWS[kind], periods, seed=3 * i + k) for k, kind in enumerate(STATEMENT_ROWS))
+            for i in range(tickers)]
+
+
+def normalized_statements(raw, scale):
+    """the raw statements normalized and marked with the scale's frequency, as TickerSnapshot holds them"""
+    frequency = SCALES[scale]["statements"][2]
+    return [tuple(set_frequency(normalize_statement(df), frequency) for df in statements) for statements in raw]
+
+
+def price_frames(scale):
+    """one daily bar frame per ticker, covering the scale's number of years up to 2024-12-31"""
+    tickers, years = SCALES[scale]["prices"]
+    start = pd.Timestamp("2024-12-31") - pd.DateOffset(years=years)
+    return [price_bars(f"T{i:05d}", "2024-12-31", start=start) for i in range(tickers)]
+
+
+def comparison_table(scale):
+    """a periods x companies table of margins with per-company bounds, as in the efficiency view"""
+    rows, columns = SCALES[scale]["table"]
+    rng = np.random.default_rng(0)
+    table = pd.DataFrame(rng.normal(0.1, 0.15, (rows, columns)), columns=[f"T{i:05d}" for i in range(columns)])
+    lower = dict(zip(table.columns, rng.uniform(-0.1, 0.05, columns)))
+    upper = dict(zip(table.columns, rng.uniform(0.2, 0.35, columns)))
+    return table, lower, upper
+
+
+def cash_flow_table(scale):
+    """a periods x companies free cash flow table with ~5% missing values, as in the efficiency view"""
+    rows, columns = SCALES[scale]["table"]
+    return comparison_tables(rows, columns)[1]
+
+
+def screened_companies(scale):
+    """a screener table with every insight rule metric, and each company's MetricData dict as the app builds it"""
+    table = screener_table(SCALES[scale]["screener"])
+    dicts = [{m: MetricData(m, None if np.isnan(v) else v) for m, v in row.items()} for row in table.to_dict("records")]
+    return table, dicts
+
+
+def ratios_case(statements):
+    for financials, balance_sheet, _ in statements:
+        calculate_ratios.uncached(financials, balance_sheet)
+
+
+traced_ratios = trace.traced("compute", "calculate_ratios")(calculate_ratios.uncached)
+
+
+def traced_ratios_case(statements, mode="off"):
+    # what every instrumented call pays: a flag check while tracing is off, a recorded span while it
+    # is on. Memory mode resets tracemalloc's peak at each span, so that case's peak is not comparable.
+    if mode != "off":
+        trace.enable(memory=mode == "memory")
+    try:
+        for financials, balance_sheet, _ in statements:
+            traced_ratios(financials, balance_sheet)
+    finally:
+        trace.disable()
+        trace.reset()
+
+
+def efficiency_case(statements):
+    for financials, balance_sheet, cashflow in statements:
+        calculate_efficiency_metrics.uncached(cashflow, financials, balance_sheet)
+
+
+def growth_case(statements):
+    for financials, _, cashflow in statements:
+        for label in GROWTH_LABELS:
+            get_growth_metrics.uncached(financials, cashflow, label)
+
+
+def value_by_label_case(statements):
+    # every canonical item's aliases probed against the provider labels
+    for statement_frames in statements:
+        for frame in statement_frames:
+            for aliases in LINE_ITEMS.values():
+                get_value_by_label(frame, aliases)
+
+
+def stock_case(prices):
+    for frame in prices:
+        calculate_stock_metrics.uncached(frame)
+
+
+def highlight_case(table):
+    # Styler.apply is lazy, so compute the styles as rendering would
+    highlight_df_bounds(*table)._compute()
+
+
+def format_large_numbers_case(cash_flows):
+    format_large_numbers(cash_flows)
+
+
+def style_large_numbers_case(cash_flows):
+    # st.dataframe renders every cell of the Styler, so the suffixed strings are looked up per cell
+    style_large_numbers(cash_flows).to_html()
+
+
+def insight_table_case(screened):
+    insight_table(screened[0])
+
+
+def insights_per_company_case(screened):
+    for d in screened[1]:
+        ratio_insights(d)
+        valuation_insights(d)
+
+
+# case name -> (input builder, benchmarked function); builders are shared through build_inputs
+CASES = {
+    "calculate_ratios": ("normalized", ratios_case),
+    "tracing_off": ("normalized", traced_ratios_case),
+    "tracing_on": ("normalized", functools.partial(traced_ratios_case, mode="on")),
+    "tracing_memory": ("normalized", functools.partial(traced_ratios_case, mode="memory")),
+    "calculate_efficiency_metrics": ("normalized", efficiency_case),
+    "get_growth_metrics": ("normalized", growth_case),
+    "get_value_by_label": ("raw", value_by_label_case),
+    "calculate_stock_metrics": ("prices", stock_case),
+    "highlight_df_bounds": ("table", highlight_case),
+    "format_large_numbers": ("cash_flows", format_large_numbers_case),
+    "style_large_numbers": ("cash_flows", style_large_numbers_case),
+    "insight_table": ("screener", insight_table_case),
+    "insights_per_company": ("screener", insights_per_company_case),
+}
+
+
+def build_inputs(kind, scale, built):
+    """inputs of one kind for a scale, built once and reused by every case that needs them"""
+    if kind not in built:
+        if kind == "raw":
+            built[kind] = raw_statements(scale)
+        elif kind == "normalized":
+            built[kind] = normalized_statements(build_inputs("raw", scale, built), scale)
+        elif kind == "prices":
+            built[kind] = price_frames(scale)
+        elif kind == "cash_flows":
+            built[kind] = cash_flow_table(scale)
+        elif kind == "screener":
+            built[kind] = screened_companies(scale)
+        else:
+            built[kind] = comparison_table(scale)
+    return built[kind]
+
+
+def measure(func, inputs, repeat):
+    """
+    median and best wall time over repeat runs, after one untimed run that warms up imports and
+    lazily built pandas indexes, then the peak traced memory of one more run
+    """
+    func(inputs)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(inputs)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    func(inputs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": statistics.median(times), "best_seconds": min(times), "peak_bytes": peak}
+
+
+def run(cases, scales, repeat):
+    """every case at every scale; returns a result document ready to be saved as JSON"""
+    results = []
+    for scale in scales:
+        built = {}
+        for case in cases:
+            kind, func = CASES[case]
+            inputs = build_inputs(kind, scale, built)
+            result = measure(func, inputs, repeat)
+            results.append({"case": case, "scale": scale, **result})
+            print(f"{case:<30} {scale:<8} {result['seconds'] * 1000:>11.2f}ms "
+                  f"{result['peak_bytes'] / 1e6:>9.2f}MB peak", flush=True)
+        del built
+        gc.collect()
+    return {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "repeat": repeat,
+        "scales": {scale: scale_label(scale) for scale in scales},
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    Print the change of every case and scale present in both documents, flagging time or peak
+    memory growth beyond threshold (a fraction). Times are compared by the best run, which is
+    the least affected by noise from other processes. Returns the number of regressions.
+    """
+    before = {(r["case"], r["scale"]): r for r in baseline["results"]}
+    print(f"baseline: {baseline['created']} (pandas {baseline['pandas']}, numpy {baseline['numpy']}); "
+          f"current: {current['created']} (pandas {current['pandas']}, numpy {current['numpy']})")
+    print(f"{'case':<30} {'scale':<8} {'time':>10} {'change':>8} {'peak':>10} {'change':>8}")
+
+    regressions = 0
+    for result in current["results"]:
+        old = before.get((result["case"], result["scale"]))
+        if old is None:
+            continue
+        time_change = result["best_seconds"] / old["best_seconds"] - 1
+        memory_change = result["peak_bytes"] / old["peak_bytes"] - 1 if old["peak_bytes"] else 0.0
+        flags = [name for name, change in (("time", time_change), ("memory", memory_change)) if change > threshold]
+        regressions += bool(flags)
+        print(f"{result['case']:<30} {result['scale']:<8} {result['best_seconds'] * 1000:>8.2f}ms {time_change:>+8.1%} "
+              f"{result['peak_bytes'] / 1e6:>8.2f}MB {memory_change:>+8.1%}"
+              + (f"  REGRESSION ({', '.join(flags)})" if flags else ""))
+    print(f"{regressions} regression(s) beyond {threshold:.0%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the analysis hot paths.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    run_parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=DEFAULT_SCALES)
+    run_parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (the median is kept)")
+    run_parser.add_argument("--save", help="write results to this JSON file")
+    run_parser.add_argument("--baseline", help="compare against a saved JSON result")
+    run_parser.add_argument("--threshold", type=float, default=0.2, help="allowed growth vs. baseline (fraction)")
+
+    compare_parser = commands.add_parser("compare", help="compare two saved results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="allowed growth vs. baseline (fraction)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+        return 1 if compare(baseline, current, args.threshold) else 0
+
+    for scale in args.scales:
+        print(f"{scale}: {scale_label(scale)}")
+    result = run(args.cases, args.scales, args.repeat)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        return 1 if compare(baseline, result, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
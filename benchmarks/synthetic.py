@@ -0,0 +1,143 @@
+"""
+benchmarks/synthetic.py
+
+Deterministic synthetic data for the offline benchmarks.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from analysis.insights import RATIO_RULES, VALUATION_RULES
+from data.line_items import LINE_ITEMS
+from utils.constants import MARKET_CAP, ENTERPRISE_VALUE
+
+
+def statement_labels(n_rows, seed=0):
+    """
+    Row labels for a synthetic statement: one provider label for every canonical
+    line item (a random alias, so lookups exercise the fallbacks), padded with
+    unmapped filler labels up to n_rows and shuffled.
+    """
+    rng = np.random.default_rng(seed)
+    labels = [aliases[rng.integers(len(aliases))] for aliases in LINE_ITEMS.values()]
+    labels += [f"Other Line Item {i:04d}" for i in range(max(n_rows - len(labels), 0))]
+    return [labels[i] for i in rng.permutation(len(labels))][:n_rows]
+
+
+def statement(n_rows=300, n_periods=4, seed=0):
+    """a statement-shaped DataFrame (rows: labels, columns: fiscal year ends, most recent first)"""
+    rng = np.random.default_rng(seed)
+    labels = statement_labels(n_rows, seed)
+    periods = pd.to_datetime([f"{2024 - i}-12-31" for i in range(n_periods)])
+    values = rng.normal(1e9, 3e8, size=(len(labels), n_periods))
+    return pd.DataFrame(values, index=labels, columns=periods)
+
+
+def quarterly_statement(n_rows=300, n_quarters=8, seed=0):
+    """a statement-shaped DataFrame with consecutive quarter-end columns ending 2024-12-31, most recent first"""
+    frame = statement(n_rows, n_quarters, seed)
+    frame.columns = pd.date_range(end="2024-12-31", periods=n_quarters, freq="QE")[::-1]
+    return frame
+
+
+def screener_table(n_companies, seed=0):
+    """screener-shaped table with every insight rule metric, ~5% missing"""
+    rng = np.random.default_rng(seed)
+    metrics = RATIO_RULES + VALUATION_RULES
+    values = rng.lognormal(0, 1, (n_companies, len(metrics))) - 0.3
+    table = pd.DataFrame(values, index=[f"T{i:05d}" for i in range(n_companies)], columns=metrics)
+    for size in (MARKET_CAP, ENTERPRISE_VALUE):
+        table[size] = 10 ** rng.uniform(8, 12.5, n_companies)
+    return table.mask(rng.random(table.shape) < 0.05)
+
+
+def comparison_tables(rows, companies, seed=0):
+    """
+    (margins, free cash flows, lower, upper) periods x companies tables as in the Cash Flow &
+    Efficiency view, with ~5% missing values and per-company margin bounds
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.Index(pd.date_range(end="2024-12-31", periods=rows, freq="D").date, name="Period End")
+    columns = [f"T{i:03d}" for i in range(companies)]
+    margins = pd.DataFrame(rng.normal(0.1, 0.15, (rows, companies)), index=index, columns=columns)
+    cash_flows = pd.DataFrame(rng.choice([-1, 1], (rows, companies)) * 10 ** rng.uniform(2, 13, (rows, companies)),
+                              index=index, columns=columns)
+    missing = rng.random((rows, companies)) < 0.05
+    lower = dict(zip(columns, rng.uniform(-0.1, 0.05, companies)))
+    upper = dict(zip(columns, rng.uniform(0.2, 0.35, companies)))
+    return margins.mask(missing), cash_flows.mask(missing), lower, upper
+
+
+def _ticker_seed(ticker):
+    return sum(ord(c) * 31 ** i for i, c in enumerate(ticker)) % (2 ** 32)
+
+
+def price_bars(ticker, end, start="2012-01-02", dividends=()):
+    """
+    Daily OHLCV bars for one ticker from `start` to `end`, shaped like yfinance's auto-adjusted
+    history. A bar's values don't depend on `end`, so histories taken on different days agree.
+    Bars before each (date, amount) dividend are back-adjusted, as Yahoo does on the ex-date.
+    """
+    dates = pd.bdate_range(start=start, end=pd.Timestamp(end).normalize())
+    rng = np.random.default_rng(_ticker_seed(ticker))
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(dates))))
+    bars = pd.DataFrame({
+        "Open": close * 0.995, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Volume": rng.integers(1_000_000, 10_000_000, len(dates)), "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=pd.DatetimeIndex(dates, name="Date"))
+
+    for date, amount in dividends:
+        date = pd.Timestamp(date)
+        if date > end or date not in bars.index:
+            continue
+        before = bars.index < date
+        factor = 1 - amount / bars.loc[before, "Close"].iloc[-1]
+        bars.loc[before, ["Open", "High", "Low", "Close"]] *= factor
+        bars.loc[date, "Dividends"] = amount
+    return bars
+
+
+class SimulatedProvider:
+    """
+    Remote-looking price provider serving price_bars() as of `today`, counting requests and
+    the bytes it "transfers" so refresh strategies can be compared offline. `calls` counts one
+    upstream call per ticker, as yfinance's bulk download fans out to one HTTP request per ticker.
+    """
+
+    name = "simulated"
+    remote = True
+
+    def __init__(self, today, dividends=None):
+        self.today = pd.Timestamp(today)
+        self.dividends = dividends or {}  # {ticker: [(date, amount), ...]}
+        self.requests = 0
+        self.calls = 0
+        self.bytes = 0
+        self._generated = {}
+
+    def _bars(self, ticker, period, start):
+        # generate each ticker once, so timings measure the caller rather than the simulation
+        if ticker not in self._generated:
+            self._generated[ticker] = price_bars(ticker, self.today, dividends=self.dividends.get(ticker, ()))
+        bars = self._generated[ticker]
+        bars = bars[bars.index <= self.today]
+        if start is not None:
+            bars = bars[bars.index >= pd.Timestamp(start)]
+        elif period != "max":
+            count, unit = re.match(r"(\d+)(d|mo|y)$", period).groups()
+            offset = {"d": pd.DateOffset(days=int(count)), "mo": pd.DateOffset(months=int(count)),
+                      "y": pd.DateOffset(years=int(count))}[unit]
+            bars = bars[bars.index >= self.today - offset]
+        self.calls += 1
+        self.bytes += int(bars.memory_usage(index=True).sum())
+        return bars
+
+    def price_history(self, ticker, period="1y", interval="1d", start=None):
+        self.requests += 1
+        return self._bars(ticker, period, start)
+
+    def price_histories(self, tickers, period="1y", interval="1d", start=None):
+        self.requests += 1
+        return {ticker: self._bars(ticker, period, start) for ticker in tickers}
@@ -0,0 +1,82 @@
+"""
+benchmarks/ttm.py
+
+Trailing-twelve-month rollup benchmark.
+Builds synthetic quarterly statements (every canonical line item plus filler
+rows, several years of quarters) and times trailing_twelve_months, which sums
+four-quarter windows for every line item at once, against summing each line
+item's windows one quarter end at a time and against pandas' rolling().sum(),
+and a cached call.
+
+Usage:
+    python -m benchmarks.ttm
+    python -m benchmarks.ttm --tickers 500 --quarters 60
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import quarterly_statement
+from data.line_items import normalize_statement
+from data.periods import trailing_twelve_months, ROLLUPS
+from utils.memo import set_fingerprint
+
+
+def per_item(quarterly):
+    """TTM by summing each line item's four-quarter windows one quarter end at a time"""
+    ordered = quarterly.iloc[:, ::-1]
+    columns = {}
+    for i in range(3, ordered.shape[1]):
+        window = ordered.iloc[:, i - 3:i + 1]
+        columns[ordered.columns[i]] = {key: window.loc[key].sum(skipna=False) for key in ordered.index}
+    return pd.DataFrame(columns).iloc[:, ::-1]
+
+
+def timed(func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vectorized vs. per-item trailing-twelve-month rollups.")
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--quarters", type=int, default=40)
+    parser.add_argument("--sample", type=int, default=5, help="tickers to run the per-item loop on")
+    args = parser.parse_args(argv)
+
+    statements = [normalize_statement(quarterly_statement(300, args.quarters, seed)) for seed in range(args.tickers)]
+
+    vectorized, results = timed(lambda: [trailing_twelve_months.uncached(s) for s in statements])
+    rolling, _ = timed(lambda: [s.T.iloc[::-1].rolling(4).sum().T for s in statements])
+
+    # the per-item loop is slow, so it runs on a sample and is scaled up
+    sample = statements[:min(args.sample, args.tickers)]
+    looped, reference = timed(lambda: [per_item(s) for s in sample])
+    looped *= args.tickers / len(sample)
+
+    summed = [key for key in results[0].index if key not in ROLLUPS]
+    matches = all(np.allclose(result.loc[summed].to_numpy(), expected.loc[summed].to_numpy(), equal_nan=True)
+                  for result, expected in zip(results, reference))
+
+    # statements loaded through the fetcher carry a fingerprint, so a cache hit doesn't hash them
+    set_fingerprint(statements[0], "BENCH:quarterly_financials")
+    trailing_twelve_months(statements[0])
+    cached, _ = timed(lambda: trailing_twelve_months(statements[0]), repeat=100)
+
+    print(f"{args.tickers} tickers x {len(statements[0])} line items x {args.quarters} quarters")
+    print(f"vectorized      {vectorized * 1000:>10.1f}ms")
+    print(f"pandas rolling  {rolling * 1000:>10.1f}ms  (no gap checks or rollup rules)")
+    print(f"per item        {looped * 1000:>10.1f}ms  (estimated from {len(sample)} tickers)")
+    print(f"speedup vs per item {looped / vectorized:>6.0f}x   same sums: {matches}")
+    print(f"cached call     {cached * 1e6:>10.0f}us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
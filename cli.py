@@ -0,0 +1,122 @@
+"""
+cli.py
+
+Command line entry point for batch runs without Streamlit.
+
+Examples:
+    python cli.py AAPL MSFT GOOG --output results.csv
+    python cli.py --tickers-file universe.txt --sections ratios efficiency --output results.parquet
+    python cli.py AAPL MSFT --frequency ttm --output results.csv
+    python cli.py --tickers-file universe.txt --update-price-store max
+    python cli.py --tickers-file universe.txt --update-peer-index
+    python cli.py --tickers-file universe.txt --report reports/ --report-format html
+    python cli.py --tickers-file universe.txt --output results.csv --trace trace.json
+"""
+
+import argparse
+import sys
+
+from analysis.batch import analyze, SECTIONS
+from analysis.peers import update_peer_index
+from data.periods import FREQUENCIES
+from data.fetcher import update_price_store
+from utils import trace
+
+FORMATS = ["json", "csv", "parquet"]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run financial analysis for a list of tickers.")
+    parser.add_argument("tickers", nargs="*", help="ticker symbols to analyze")
+    parser.add_argument("--tickers-file", help="file with one ticker per line")
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=SECTIONS, help="analysis sections to run")
+    parser.add_argument("--output", "-o", help="output file (format taken from the extension unless --format is given)")
+    parser.add_argument("--format", "-f", choices=FORMATS, help="output format (default: json, or the --output extension)")
+    parser.add_argument("--frequency", choices=FREQUENCIES, default="annual",
+                        help="statement periods: annual, quarterly, or trailing twelve months (default: annual)")
+    parser.add_argument("--update-price-store", metavar="PERIOD",
+                        help="write the tickers' daily price history for PERIOD (e.g. max, 20y) into the price store and exit")
+    parser.add_argument("--update-peer-index", action="store_true",
+                        help="add the tickers to the sector/industry peer quantile index and exit")
+    parser.add_argument("--report", metavar="DIR",
+                        help="render one report per ticker into DIR (uses FA_REPORT_WORKERS processes) and exit")
+    parser.add_argument("--report-format", choices=["html", "pdf"], default="html",
+                        help="report format; pdf needs weasyprint and kaleido (default: html)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record fetch/cache/compute timing spans and write them to FILE: Chrome-trace JSON "
+                             "for a .json file, Prometheus text otherwise (report workers are not traced)")
+    return parser.parse_args(argv)
+
+
+def write_results(result, output=None, fmt=None):
+    """write the tidy result table as JSON, CSV or Parquet, to a file or stdout"""
+    if fmt is None:
+        extension = output.rsplit(".", 1)[-1].lower() if output and "." in output else "json"
+        fmt = extension if extension in FORMATS else "json"
+
+    if fmt == "parquet":
+        if not output:
+            raise SystemExit("--output is required for parquet")
+        result.to_parquet(output, index=False)
+    elif fmt == "csv":
+        result.to_csv(output or sys.stdout, index=False)
+    else:
+        # pandas keeps 10 decimals by default, which cuts small ratios to a few significant digits
+        result.to_json(output or sys.stdout, orient="records", indent=2, double_precision=15)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.trace:
+        return run(args)
+
+    trace.enable()
+    try:
+        with trace.span("cli", "page"):
+            return run(args)
+    finally:
+        trace.write(args.trace)
+        print(f"trace written to {args.trace}", file=sys.stderr)
+
+
+def run(args):
+    """the batch run itself"""
+    tickers = list(args.tickers)
+    if args.tickers_file:
+        with open(args.tickers_file, encoding="utf-8") as f:
+            tickers += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not tickers:
+        raise SystemExit("No tickers given")
+
+    if args.update_price_store:
+        store = update_price_store(tickers, args.update_price_store)
+        print(f"price store {store.directory}: {len(store)} tickers x {store.days} days", file=sys.stderr)
+        return 0
+
+    if args.update_peer_index:
+        index = update_peer_index(tickers)
+        print(f"peer index {index.directory}: {len(index)} tickers", file=sys.stderr)
+        return 0
+
+    if args.report:
+        # imported here so plain batch runs don't load plotly and the report templates
+        from visuals.report import export_reports
+        try:
+            paths, failed = export_reports(tickers, args.report, args.report_format, args.frequency)
+        except RuntimeError as e:
+            raise SystemExit(str(e))
+        for ticker, reason in failed.items():
+            print(f"skipped {ticker}: {reason}", file=sys.stderr)
+        print(f"{len(paths)} reports written to {args.report}", file=sys.stderr)
+        return 0
+
+    result = analyze(tickers, args.sections, args.frequency)
+    write_results(result, args.output, args.format)
+
+    for ticker, reason in result.attrs["failed"].items():
+        print(f"skipped {ticker}: {reason}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+data/cache.py
+
+Persistent on-disk cache for fetched market data.
+Stores statements, .info snapshots and price history per ticker in a SQLite
+database with per-data-type TTLs, zlib-compressed payloads and an offline mode.
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+
+from utils.config import CACHE_DIR, CACHE_ENABLED, OFFLINE
+from utils.constants import CACHE_TTLS
+from utils.memo import set_fingerprint
+
+DEFAULT_TTL = 60 * 60
+
+
+def _fingerprint(ticker, kind, key, payload):
+    """identity of a stored value: where it is stored plus a digest of its payload"""
+    return f"{ticker}:{kind}:{key}:{hashlib.blake2b(payload, digest_size=12).hexdigest()}"
+
+
+class OfflineCacheMiss(LookupError):
+    """Raised in offline mode when the requested data is not in the cache."""
+
+
+class DataCache:
+    """SQLite-backed cache keyed by (ticker, data type, key)."""
+
+    def __init__(self, directory=CACHE_DIR, offline=OFFLINE, ttls=None):
+        """
+        Initialize a DataCache.
+
+        Args:
+            directory (str): Directory holding the cache database. Created if missing.
+            offline (bool, optional): Serve only from the cache, ignoring TTLs. Defaults to FA_OFFLINE.
+            ttls (dict, optional): Per-data-type TTLs in seconds. Defaults to CACHE_TTLS.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "cache.sqlite3")
+        self.offline = offline
+        self.ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "errors": 0, "bytes_read": 0, "bytes_written": 0}
+
+        # one shared connection guarded by a lock; WAL lets several app workers share the file
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    ticker TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    payload BLOB NOT NULL,
+                    PRIMARY KEY (ticker, kind, key)
+                )
+            """)
+            self._conn.commit()
+
+    def ttl(self, kind):
+        """return the time-to-live in seconds for a data type"""
+        return self.ttls.get(kind, DEFAULT_TTL)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def get(self, ticker, kind, key=""):
+        """
+        Look up a cached value.
+        Returns (value, age in seconds), or None if nothing is stored.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, payload FROM entries WHERE ticker = ? AND kind = ? AND key = ?",
+                (ticker, kind, key),
+            ).fetchone()
+        if row is None:
+            return None
+
+        fetched_at, payload = row
+        self._count("bytes_read", len(payload))
+
+        # tag the value so memoized analysis keys it by this digest instead of hashing it
+        value = set_fingerprint(pickle.loads(zlib.decompress(payload)), _fingerprint(ticker, kind, key, payload))
+        return value, time.time() - fetched_at
+
+    def set(self, ticker, kind, value, key=""):
+        """Compress and store a value, replacing any previous entry."""
+        self.set_many([(ticker, kind, value, key)])
+
+    def set_many(self, entries):
+        """Store several (ticker, kind, value, key) entries in one transaction."""
+        now = time.time()
+        rows = []
+        for ticker, kind, value, key in entries:
+            payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            rows.append((ticker, kind, key, now, len(payload), payload))
+            set_fingerprint(value, _fingerprint(ticker, kind, key, payload))
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+            self._stats["bytes_written"] += sum(row[4] for row in rows)
+
+    def entry(self, ticker, kind, key="", usable=None):
+        """
+        Return (value, fresh) for a cached value, or (None, False) on a miss.
+        Values rejected by usable(value) count as misses; in offline mode every cached value is fresh.
+        Unlike lookup, stale values are returned too, so callers can extend them instead of re-fetching.
+        """
+        cached = self.get(ticker, kind, key)
+        if cached is None or (usable is not None and not usable(cached[0])):
+            self._count("misses")
+            return None, False
+
+        fresh = self.offline or cached[1] < self.ttl(kind)
+        self._count("hits" if fresh else "stale")
+        return cached[0], fresh
+
+    def lookup(self, ticker, kind, key=""):
+        """
+        Return a fresh cached value (any cached value in offline mode), or None on a miss.
+        Used by bulk fetches that download all misses together.
+        """
+        value, fresh = self.entry(ticker, kind, key)
+        return value if fresh else None
+
+    def update(self, ticker, kind, update_func, key="", usable=None):
+        """
+        Return a cached value if it is still fresh, otherwise store and return update_func(stale value),
+        where the stale value is None if nothing usable is cached. This lets a refresh extend what is
+        already stored (e.g. append new price bars) rather than fetch everything again.
+        In offline mode a miss raises OfflineCacheMiss. If the update fails, a stale value is served.
+        """
+        value, fresh = self.entry(ticker, kind, key, usable)
+        if fresh:
+            return value
+
+        if self.offline:
+            raise OfflineCacheMiss(f"{ticker} {kind} {key}".strip() + " is not cached (offline mode)")
+
+        try:
+            updated = update_func(value)
+        except Exception:
+            if value is None:
+                raise
+            self._count("errors")
+            return value
+
+        self.set(ticker, kind, updated, key)
+        return updated
+
+    def fetch(self, ticker, kind, fetch_func, key=""):
+        """
+        Return a cached value if it is still fresh, otherwise call fetch_func and store the result.
+        In offline mode any cached value is served regardless of age. If the upstream call fails,
+        a stale cached value is served rather than failing the page.
+        """
+        return self.update(ticker, kind, lambda stale: fetch_func(), key)
+
+    def invalidate(self, ticker=None, kind=None):
+        """Remove cached entries, optionally limited to one ticker and/or data type."""
+        query, params = "DELETE FROM entries WHERE 1 = 1", []
+        if ticker is not None:
+            query += " AND ticker = ?"
+            params.append(ticker)
+        if kind is not None:
+            query += " AND kind = ?"
+            params.append(kind)
+        with self._lock:
+            self._conn.execute(query, params)
+            self._conn.commit()
+
+    def stats(self):
+        """
+        Return hit/miss counters for this process plus stored entry counts and
+        compressed bytes per data type, for sizing the cache.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, COUNT(*), SUM(size) FROM entries GROUP BY kind"
+            ).fetchall()
+            stats = dict(self._stats)
+
+        lookups = stats["hits"] + stats["misses"] + stats["stale"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else None
+        stats["entries"] = {kind: count for kind, count, _ in rows}
+        stats["stored_bytes"] = {kind: size for kind, _, size in rows}
+        stats["total_stored_bytes"] = sum(size for _, _, size in rows)
+        stats["path"] = self.path
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the shared DataCache, or None if caching is disabled (FA_CACHE=0)."""
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = DataCache()
+    return _cache
+
+
+def set_cache(cache):
+    """Replace the shared DataCache (e.g. a DataCache in a scratch directory for benchmarks)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def cache_stats():
+    """return stats for the shared cache (empty dict if caching is disabled)"""
+    cache = get_cache()
+    return cache.stats() if cache is not None else {}
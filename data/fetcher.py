@@ -1,66 +1,478 @@
 """
 data/fetcher.py
 
-Handles data fetching from yfinance.
+Handles data fetching through the configured data provider (data/providers.py,
+yfinance by default). Responses from remote providers are stored in the
+persistent cache (data/cache.py) so restarts and new workers don't have to go
+back to the network.
 """
 
-import yfinance as yf
+import datetime
+import functools
+import re
+import threading
+from collections import Counter, defaultdict
+
+from data.cache import get_cache, OfflineCacheMiss
+from data.price_store import get_price_store
+from data.providers import get_provider
+from utils.config import PRICE_REFRESH
+from utils.lazy import lazy_import
+from utils.memo import set_fingerprint, get_fingerprint, derive_fingerprint, content_fingerprint
+from utils.trace import span, traced
+
+# loaded on first use so importing the fetcher stays cheap
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+yf = lazy_import("yfinance")
+
+# number of upstream (network) requests made per data type, for verifying de-duplication
+_request_counts = Counter()
+_request_lock = threading.Lock()
+
+
+def get_request_counts():
+    """return a copy of the upstream request counter, keyed by data type"""
+    with _request_lock:
+        return dict(_request_counts)
+
+
+def reset_request_counts():
+    """reset the upstream request counter"""
+    with _request_lock:
+        _request_counts.clear()
+
+
+def _count_request(kind):
+    with _request_lock:
+        _request_counts[kind] += 1
+
+
+def _cached(ticker, kind, fetch_func, key=""):
+    """fetch through the persistent cache when it is enabled, counting upstream requests"""
+
+    def upstream():
+        _count_request(kind)
+        with span(f"{kind} upstream", "fetch"):
+            return fetch_func()
+
+    # local providers are already on disk, so only remote responses are cached
+    with span(kind, "cache"):
+        cache = get_cache() if get_provider().remote else None
+        if cache is None:
+            return _tagged(upstream(), ticker, kind, key)
+        return cache.fetch(ticker.upper(), kind, upstream, key)
+
+
+def _tagged(value, ticker, kind, key=""):
+    """
+    fingerprint a value that didn't come through the cache (which tags what it stores and loads),
+    hashing it once here rather than on every memoized call that receives it
+    """
+    return set_fingerprint(value, f"{ticker.upper()}:{kind}:{key}:{content_fingerprint(value)}")
+
 
 def ticker_exists(ticker):
-    """check if ticker exists in yfinance."""
+    """check if ticker exists in the data provider."""
 
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        return info is not None and info.get("regularMarketPrice") is not None
+        return has_market_price(get_company_info(ticker))
     except Exception:
         return False
 
+def has_market_price(info):
+    """check that an info dict describes a traded ticker"""
+    return info is not None and info.get("regularMarketPrice") is not None
+
 def get_stock_object(ticker: str):
     """return yfinance ticker"""
     return yf.Ticker(ticker)
 
 def get_company_name(ticker: str):
     """fetch company name from ticker"""
-    stock = get_stock_object(ticker)
-    return stock.info.get("shortName", ticker)
+    return get_company_info(ticker).get("shortName", ticker)
+
+
+# bar sizes whose history is refreshed incrementally (intraday history is short and re-fetched whole)
+INCREMENTAL_INTERVALS = ("1d", "5d", "1wk", "1mo", "3mo")
+
+PERIOD_PATTERN = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+
+def _incremental(interval, cache):
+    """whether price history for this interval is kept as an incrementally refreshed bar store"""
+    return PRICE_REFRESH == "incremental" and cache is not None and interval in INCREMENTAL_INTERVALS
+
+
+def _period_start(period):
+    """
+    first calendar date a yfinance period ('1mo', '1y', 'ytd', ...) covers, as of today.
+    None for 'max' and for day periods, which count bars rather than calendar days.
+    """
+    return _period_start_on(period, datetime.date.today())
+
+
+@functools.lru_cache(maxsize=64)
+def _period_start_on(period, day):
+    """_period_start for a given day (cached: it is checked once per ticker in bulk refreshes)"""
+    today = pd.Timestamp(day)
+    if period == "max":
+        return None
+    if period == "ytd":
+        return today.replace(month=1, day=1)
+    match = PERIOD_PATTERN.match(period)
+    if match is None:
+        raise ValueError(f"Unknown period '{period}'")
+    count, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        return None
+    offset = {"wk": pd.DateOffset(weeks=count), "mo": pd.DateOffset(months=count), "y": pd.DateOffset(years=count)}[unit]
+    return today - offset
+
+
+def _naive_dates(index):
+    """a bar index as naive local timestamps, for comparing against calendar dates"""
+    return index.tz_localize(None) if getattr(index, "tz", None) is not None else index
+
+
+def _covers(stored, period):
+    """whether a stored bar history reaches back far enough for the period"""
+    if stored["period"] == "max":
+        return True
+    if period == "max":
+        return False
+    if period.endswith("d") and PERIOD_PATTERN.match(period):
+        return len(stored["bars"]) >= int(period[:-1])
+    start = _period_start(period)
+    return stored["since"] is not None and stored["since"] <= start
+
+
+def _longer_period(first, second):
+    """whichever of two periods reaches further back"""
+    for period in (first, second):
+        if period == "max":
+            return period
+    starts = {p: _period_start(p) for p in (first, second)}
+    if None in starts.values():  # day periods are the shortest
+        return first if starts[first] is not None else second
+    return first if starts[first] <= starts[second] else second
+
+
+def _select_period(bars, period):
+    """the bars of a stored history that fall inside the period"""
+    if period == "max":
+        return bars
+    if period.endswith("d") and PERIOD_PATTERN.match(period):
+        return bars.iloc[-int(period[:-1]):]
+    return bars[_naive_dates(bars.index) >= _period_start(period)]
+
+
+def _select_tagged(bars, period):
+    """_select_period, with the selection's fingerprint derived from the stored bars' (and the day it starts on)"""
+    return derive_fingerprint(_select_period(bars, period), bars, period, _period_start(period))
+
+
+def _stored_bars(bars, period):
+    """cache entry for a full history download"""
+    return {"bars": bars, "period": period, "since": _period_start(period)}
+
+
+def _anchor(bars):
+    """
+    the bar a refresh starts from: the second to last, because the last one may still have
+    been forming (today's or this week's bar) when it was stored
+    """
+    return bars.index[-2] if len(bars) > 1 else bars.index[-1]
+
+
+def _append_bars(bars, new):
+    """
+    Append newly fetched bars (starting at the anchor bar) to a stored history.
+    Returns None when the stored history no longer matches upstream, i.e. the anchor bar's close
+    changed or a new bar carries a split or dividend: prices are back-adjusted for those, so every
+    stored bar may have changed and the whole window has to be pulled again.
+    """
+    anchor = _anchor(bars)
+    if new is None or new.empty or anchor not in new.index:
+        return None
+    if not np.isclose(new.at[anchor, "Close"], bars.at[anchor, "Close"], rtol=1e-6, equal_nan=True):
+        return None
+
+    later = new[new.index > anchor]
+    actions = [column for column in ("Dividends", "Stock Splits") if column in later]
+    if actions and later[actions].fillna(0).to_numpy().any():
+        return None
+    return pd.concat([bars[bars.index <= anchor], later])
 
 
 def get_price_history(ticker: str, period="1y", interval="1d"):
-    """fetch historical price data"""
-    stock = get_stock_object(ticker)
-    return stock.history(period=period, interval=interval)
+    """
+    fetch historical price data.
+    With FA_PRICE_REFRESH=incremental (the default) the cache keeps one growing history per
+    (ticker, interval); a refresh only downloads the bars since the last stored one.
+    Incrementally stored daily+ bars are indexed by tz-naive dates (see _align_index).
+    """
+    provider = get_provider()
+    cache = get_cache() if provider.remote else None
+    if not _incremental(interval, cache):
+        return _cached(ticker, "history", lambda: provider.price_history(ticker, period, interval),
+                       key=f"{period}:{interval}")
+
+    def refresh(stored):
+        if stored is not None:
+            _count_request("history")
+            with span("history upstream", "fetch"):
+                new = provider.price_history(ticker, interval=interval, start=_anchor(stored["bars"]))
+            bars = _append_bars(stored["bars"], _align_index(new, interval))
+            if bars is not None:
+                return {**stored, "bars": bars}
+
+        # nothing usable stored, or history was re-adjusted: pull the whole window again
+        full_period = _longer_period(period, stored["period"]) if stored is not None else period
+        _count_request("history")
+        with span("history upstream", "fetch"):
+            bars = _align_index(provider.price_history(ticker, full_period, interval), interval)
+        return _stored_bars(bars, full_period)
+
+    with span("history", "cache"):
+        stored = cache.update(ticker.upper(), "history", refresh, key=f"bars:{interval}",
+                              usable=lambda stored: _covers(stored, period))
+    return _select_tagged(stored["bars"], period)
+
+
+@traced("cache", "price_histories")
+def get_price_histories(tickers, period="1y", interval="1d"):
+    """
+    Fetch price history for many tickers at once.
+    Cached tickers are served from the cache and all misses are downloaded in one bulk request
+    (with incremental refresh, stale cached histories are extended with only their new bars).
+    Returns a wide DataFrame with (Price, Ticker) columns on a shared date index,
+    e.g. histories["Close"] has one column per ticker.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    provider = get_provider()
+    cache = get_cache() if provider.remote else None
+
+    if _incremental(interval, cache):
+        frames = _refresh_histories(tickers, period, interval, provider, cache)
+    else:
+        frames = _download_histories(tickers, period, interval, provider, cache)
+
+    if not frames:
+        return pd.DataFrame(columns=pd.MultiIndex.from_arrays([[], []], names=["Price", "Ticker"]))
+
+    # align on a shared index: calendar dates for daily+ bars, UTC timestamps for intraday bars
+    aligned = {ticker: _align_index(frames[ticker], interval) for ticker in tickers if ticker in frames}
+    histories = pd.concat(aligned, axis=1, names=["Ticker", "Price"]).swaplevel(axis=1)
+    histories = histories.sort_index(axis=1, level="Price", sort_remaining=False)
+
+    # the combined frame's identity follows from its parts'
+    tokens = [get_fingerprint(frames[ticker]) for ticker in aligned]
+    if None not in tokens:
+        set_fingerprint(histories, f"histories:{period}:{interval}:{content_fingerprint(tokens)}")
+    return histories
+
+
+def _download_histories(tickers, period, interval, provider, cache):
+    """{ticker: history} with cached tickers served from the cache and all misses downloaded together"""
+    key = f"{period}:{interval}"
+    frames = {}
+
+    if cache is not None:
+        for ticker in tickers:
+            cached = cache.lookup(ticker, "history", key)
+            if cached is not None:
+                frames[ticker] = cached
+
+    missing = [t for t in tickers if t not in frames]
+    if missing:
+        if cache is not None and cache.offline:
+            raise OfflineCacheMiss(f"{', '.join(missing)} history {key} is not cached (offline mode)")
+
+        _count_request("history")
+        with span("histories upstream", "fetch"):
+            downloaded = provider.price_histories(missing, period, interval)
+        frames.update(downloaded)
+        if cache is not None:
+            cache.set_many([(ticker, "history", hist, key) for ticker, hist in downloaded.items()])
+        else:
+            for ticker, hist in downloaded.items():
+                _tagged(hist, ticker, "history", key)
+    return frames
+
+
+def _refresh_histories(tickers, period, interval, provider, cache):
+    """
+    {ticker: history} from the incremental bar store (see get_price_history).
+    Stale histories are extended with one bulk request per anchor date (after a nightly run they
+    all share one), and only tickers with nothing usable stored, or whose history was re-adjusted,
+    are downloaded in full.
+    """
+    key = f"bars:{interval}"
+    frames, stale, updates, sources = {}, {}, [], {}
+
+    for ticker in tickers:
+        stored, fresh = cache.entry(ticker, "history", key, usable=lambda stored: _covers(stored, period))
+        if fresh:
+            frames[ticker] = _select_tagged(stored["bars"], period)
+        elif stored is not None:
+            stale[ticker] = stored
+
+    missing = [t for t in tickers if t not in frames]
+    if missing and cache.offline:
+        raise OfflineCacheMiss(f"{', '.join(missing)} history {key} is not cached (offline mode)")
+
+    by_anchor = defaultdict(list)
+    for ticker, stored in stale.items():
+        by_anchor[_anchor(stored["bars"])].append(ticker)
+
+    for anchor, group in by_anchor.items():
+        _count_request("history")
+        with span("histories upstream", "fetch"):
+            new = provider.price_histories(group, interval=interval, start=anchor)
+        for ticker in group:
+            bars = _append_bars(stale[ticker]["bars"], _align_index(new[ticker], interval) if ticker in new else None)
+            if bars is not None:
+                updates.append((ticker, "history", {**stale[ticker], "bars": bars}, key))
+                frames[ticker] = _select_period(bars, period)
+                sources[ticker] = bars
+
+    # nothing usable stored, or history was re-adjusted: pull whole windows, one request per window
+    by_period = defaultdict(list)
+    for ticker in tickers:
+        if ticker not in frames:
+            full_period = _longer_period(period, stale[ticker]["period"]) if ticker in stale else period
+            by_period[full_period].append(ticker)
+
+    for full_period, group in by_period.items():
+        _count_request("history")
+        with span("histories upstream", "fetch"):
+            downloaded = provider.price_histories(group, full_period, interval)
+        for ticker, hist in downloaded.items():
+            bars = _align_index(hist, interval)
+            updates.append((ticker, "history", _stored_bars(bars, full_period), key))
+            frames[ticker] = _select_period(bars, period)
+            sources[ticker] = bars
+
+    # set_many tags the stored bars, so the selections can take their identity from them
+    cache.set_many(updates)
+    for ticker, bars in sources.items():
+        derive_fingerprint(frames[ticker], bars, period, _period_start(period))
+    return frames
+
+
+def update_price_store(tickers, period="max", store=None, chunk_size=200):
+    """
+    Write the tickers' daily price history into the columnar price store (data/price_store.py),
+    fetching `chunk_size` tickers at a time so memory stays bounded for large universes.
+    Returns the store.
+    """
+    store = store if store is not None else get_price_store()
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    for i in range(0, len(tickers), chunk_size):
+        store.write(get_price_histories(tickers[i:i + chunk_size], period, "1d"))
+    return store
+
+
+def _store_is_current(store, tickers, today=None):
+    """whether the price store holds a bar for every ticker through the last completed business day"""
+    if not tickers or not all(ticker in store for ticker in tickers):
+        return False
+    today = np.datetime64(today or datetime.date.today(), "D")
+    last_session = np.busday_offset(today, -1, roll="forward")
+    return bool((store.last_bars(tickers) >= last_session).all())
+
+
+def get_closes(tickers, period="5y", store=None, today=None):
+    """
+    Daily closes (dates x tickers) over the period, for the stock chart, horizon and correlation
+    analysis. Served from the price store as views of its memory-mapped arrays when it holds every
+    ticker through the last completed business day (see update_price_store), otherwise downloaded
+    with get_price_histories. Tickers without data are left out of a download.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    store = store if store is not None else get_price_store()
+    if _store_is_current(store, tickers, today):
+        with span("price store", "cache"):
+            closes = store.frame(tickers, "Close", start=_period_start(period))
+            # the store's axis has every business day; exchange holidays (no ticker has a bar) are
+            # dropped as a download doesn't have them, so rolling windows count trading days
+            sessions = closes.notna().any(axis=1).to_numpy()
+            if sessions.all():
+                return closes
+            return derive_fingerprint(closes[sessions], closes, "sessions")
+
+    histories = get_price_histories(tickers, period=period)
+    if histories.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="Date"), columns=pd.Index([], name="Ticker"), dtype=float)
+    return select_field(histories)
+
+
+def _align_index(hist, interval):
+    """convert a history index so bars from different exchanges line up"""
+    index = hist.index
+    if getattr(index, "tz", None) is None:
+        return hist
+    hist = hist.copy()
+    if interval.endswith(("d", "wk", "mo")):
+        hist.index = index.tz_localize(None).normalize()
+    else:
+        hist.index = index.tz_convert("UTC")
+    return hist
+
+
+def select_ticker(histories, ticker):
+    """return one ticker's price history (Open, Close, ...) from a get_price_histories frame"""
+    selected = histories.xs(ticker.upper(), axis=1, level="Ticker").dropna(how="all")
+    return derive_fingerprint(selected, histories, "ticker", ticker.upper())
+
+
+def select_close(closes, ticker):
+    """one ticker's closes as a price history frame (a Close column) from a dates x tickers frame, e.g. get_closes'"""
+    selected = closes[ticker.upper()].dropna().to_frame("Close")
+    return derive_fingerprint(selected, closes, "close", ticker.upper())
+
+
+def select_field(histories, field="Close"):
+    """return one field for every ticker (dates x tickers) from a get_price_histories frame"""
+    return derive_fingerprint(histories[field], histories, "field", field)
+
+
+def select_period(histories, period):
+    """return the bars of a price history (single or get_price_histories frame) that fall inside the period"""
+    return _select_tagged(histories, period)
 
 
 def get_company_info(ticker: str):
     """fetch general company info (e.g., market cap, PE ratio)."""
-    stock = get_stock_object(ticker)
-    return stock.info
+    return _cached(ticker, "info", lambda: get_provider().info(ticker))
+
+
+def get_statement(ticker: str, kind: str):
+    """fetch one financial statement ('financials', 'balance_sheet' or 'cashflow', or its 'quarterly_' variant)."""
+    return _cached(ticker, kind, lambda: get_provider().statement(ticker, kind))
 
 
 def get_financial_statements(ticker: str):
     """returns financials, balance sheet, and cashflow as DataFrames."""
-    stock = get_stock_object(ticker)
-    return stock.financials, stock.balance_sheet, stock.cashflow
+    return (get_statement(ticker, "financials"), get_statement(ticker, "balance_sheet"),
+            get_statement(ticker, "cashflow"))
 
 
 def get_earnings(ticker: str):
     """Fetch quarterly earnings data."""
-    stock = get_stock_object(ticker)
-    return stock.earnings, stock.quarterly_earnings
+    return _cached(ticker, "earnings", lambda: get_provider().earnings(ticker))
 
 
 def get_dividends(ticker: str):
     """Fetch dividend history."""
-    stock = get_stock_object(ticker)
-    return stock.dividends
+    return _cached(ticker, "dividends", lambda: get_provider().dividends(ticker))
 
 
 def get_peers(ticker: str):
     """Returns a list of peer companies if available."""
-    stock = get_stock_object(ticker)
     # Placeholder—yfinance doesn't always expose peers
-    return stock.info.get("companyOfficers", [])
+    return get_company_info(ticker).get("companyOfficers", [])
 
 
 def get_value_by_label(df, possible_labels):
@@ -0,0 +1,241 @@
+"""
+data/line_items.py
+
+Canonical line-item schema for financial statements.
+Providers label the same line item differently (and the labels change between
+yfinance versions), so every statement is normalized once into a frame indexed
+by canonical keys. Downstream code then reads rows with plain keyed access
+instead of probing lists of candidate labels.
+"""
+
+from utils.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# index name marking a normalized statement (an index name survives slicing and
+# arithmetic for free, unlike DataFrame.attrs which pandas deep-copies on every operation)
+INDEX_NAME = "line_item"
+
+# canonical key -> provider labels, in order of preference (the first one present wins)
+LINE_ITEMS = {
+    # income statement
+    "total_revenue": ["Total Revenue", "Revenue", "Operating Revenue", "Total Revenues"],
+    "cost_of_revenue": ["Cost Of Revenue", "Reconciled Cost Of Revenue"],
+    "gross_profit": ["Gross Profit"],
+    "research_and_development": ["Research And Development", "Research Development"],
+    "selling_general_and_administration": ["Selling General And Administration", "Selling General Administrative"],
+    "operating_expense": ["Operating Expense", "Total Operating Expenses"],
+    "total_expenses": ["Total Expenses"],
+    "operating_income": ["Operating Income", "Total Operating Income As Reported"],
+    "ebit": ["EBIT"],
+    "ebitda": ["EBITDA", "Normalized EBITDA"],
+    "interest_expense": ["Interest Expense", "Interest Expense Non Operating"],
+    "interest_income": ["Interest Income", "Interest Income Non Operating"],
+    "net_interest_income": ["Net Interest Income", "Net Non Operating Interest Income Expense"],
+    "other_income_expense": ["Other Income Expense", "Other Non Operating Income Expenses", "Total Other Income Expense Net"],
+    "pretax_income": ["Pretax Income", "Income Before Tax"],
+    "tax_provision": ["Tax Provision", "Income Tax Expense"],
+    "net_income": ["Net Income", "Net Income Common Stockholders", "Net Income Applicable To Common Shares"],
+    "net_income_continuing_operations": ["Net Income Continuous Operations",
+                                         "Net Income From Continuing Operation Net Minority Interest",
+                                         "Net Income From Continuing Ops"],
+    "normalized_income": ["Normalized Income"],
+    "diluted_eps": ["Diluted EPS"],
+    "basic_eps": ["Basic EPS"],
+    "diluted_average_shares": ["Diluted Average Shares"],
+    "basic_average_shares": ["Basic Average Shares"],
+    "reconciled_depreciation": ["Reconciled Depreciation"],
+
+    # balance sheet
+    "total_assets": ["Total Assets"],
+    "current_assets": ["Total Current Assets", "Current Assets"],
+    "cash_and_equivalents": ["Cash And Cash Equivalents", "Cash"],
+    "cash_and_short_term_investments": ["Cash Cash Equivalents And Short Term Investments"],
+    "short_term_investments": ["Other Short Term Investments", "Short Term Investments"],
+    "receivables": ["Receivables", "Net Receivables"],
+    "accounts_receivable": ["Accounts Receivable"],
+    "inventory": ["Inventory"],
+    "other_current_assets": ["Other Current Assets"],
+    "non_current_assets": ["Total Non Current Assets"],
+    "net_ppe": ["Net PPE", "Property Plant Equipment"],
+    "gross_ppe": ["Gross PPE"],
+    "accumulated_depreciation": ["Accumulated Depreciation"],
+    "goodwill": ["Goodwill"],
+    "goodwill_and_intangibles": ["Goodwill And Other Intangible Assets"],
+    "intangible_assets": ["Other Intangible Assets", "Intangible Assets"],
+    "long_term_investments": ["Investments And Advances", "Long Term Investments"],
+    "total_liabilities": ["Total Liabilities", "Total Liabilities Net Minority Interest", "Total Liab"],
+    "current_liabilities": ["Total Current Liabilities", "Current Liabilities"],
+    "non_current_liabilities": ["Total Non Current Liabilities Net Minority Interest", "Total Non Current Liabilities"],
+    "accounts_payable": ["Accounts Payable"],
+    "payables_and_accrued_expenses": ["Payables And Accrued Expenses"],
+    "current_debt": ["Current Debt", "Current Debt And Capital Lease Obligation", "Short Long Term Debt"],
+    "long_term_debt": ["Long Term Debt", "Long Term Debt And Capital Lease Obligation"],
+    "total_debt": ["Total Debt"],
+    "net_debt": ["Net Debt"],
+    "stockholders_equity": ["Stockholders Equity", "Total Stockholders Equity", "Total Stockholder Equity"],
+    "common_stock_equity": ["Common Stock Equity"],
+    "total_equity": ["Total Equity Gross Minority Interest"],
+    "retained_earnings": ["Retained Earnings"],
+    "working_capital": ["Working Capital"],
+    "invested_capital": ["Invested Capital"],
+    "tangible_book_value": ["Tangible Book Value", "Net Tangible Assets"],
+    "shares_outstanding": ["Ordinary Shares Number", "Share Issued"],
+
+    # cash flow statement
+    "operating_cash_flow": ["Operating Cash Flow", "Total Cash From Operating Activities",
+                            "Cash Flow From Continuing Operating Activities"],
+    "capital_expenditure": ["Capital Expenditures", "Purchase Of PPE", "Capital Expenditure"],
+    "free_cash_flow": ["Free Cash Flow"],
+    "depreciation_and_amortization": ["Depreciation And Amortization", "Depreciation Amortization Depletion", "Depreciation"],
+    "stock_based_compensation": ["Stock Based Compensation"],
+    "change_in_working_capital": ["Change In Working Capital"],
+    "investing_cash_flow": ["Investing Cash Flow", "Total Cashflows From Investing Activities",
+                            "Cash Flow From Continuing Investing Activities"],
+    "financing_cash_flow": ["Financing Cash Flow", "Total Cash From Financing Activities",
+                            "Cash Flow From Continuing Financing Activities"],
+    "dividends_paid": ["Cash Dividends Paid", "Common Stock Dividend Paid", "Dividends Paid"],
+    "repurchase_of_capital_stock": ["Repurchase Of Capital Stock", "Common Stock Payments", "Repurchase Of Stock"],
+    "issuance_of_capital_stock": ["Issuance Of Capital Stock", "Common Stock Issuance", "Issuance Of Stock"],
+    "issuance_of_debt": ["Issuance Of Debt", "Long Term Debt Issuance"],
+    "repayment_of_debt": ["Repayment Of Debt", "Long Term Debt Payments"],
+    "changes_in_cash": ["Changes In Cash", "Change In Cash"],
+    "beginning_cash_position": ["Beginning Cash Position"],
+    "end_cash_position": ["End Cash Position"],
+}
+
+# provider label (or canonical key) -> (canonical key, preference rank)
+_LABEL_INDEX = {}
+for _key, _labels in LINE_ITEMS.items():
+    _LABEL_INDEX[_key] = (_key, -1)  # canonical keys map to themselves, ahead of any alias
+    for _rank, _label in enumerate(_labels):
+        _LABEL_INDEX.setdefault(_label, (_key, _rank))
+
+
+def line_item_key(label):
+    """canonical key for a provider label or canonical key, None if it isn't in the schema"""
+    entry = _LABEL_INDEX.get(label)
+    return entry[0] if entry else None
+
+
+def is_normalized(statement):
+    """True if the statement is already indexed by canonical keys"""
+    return statement is not None and statement.index.name == INDEX_NAME
+
+
+def normalize_statement(statement):
+    """
+    Re-index a provider statement by canonical line-item keys.
+    When several aliases of one item are present the most preferred is kept;
+    labels outside the schema are dropped (see unmapped_labels).
+    Already normalized statements are returned unchanged.
+    """
+    if statement is None or is_normalized(statement):
+        return statement
+
+    best = {}  # canonical key -> (rank, row position)
+    for position, label in enumerate(statement.index):
+        entry = _LABEL_INDEX.get(label)
+        if entry is None:
+            continue
+        key, rank = entry
+        if key not in best or rank < best[key][0]:
+            best[key] = (rank, position)
+
+    normalized = statement.iloc[[position for _, position in best.values()]]
+    normalized.index = pd.Index(list(best), name=INDEX_NAME)
+    return normalized
+
+
+def unmapped_labels(statement):
+    """provider labels of a raw statement that the schema doesn't cover"""
+    if statement is None or is_normalized(statement):
+        return []
+    return [label for label in statement.index if label not in _LABEL_INDEX]
+
+
+def get_line_item(statement, key):
+    """
+    One statement row by canonical key (normalizing the statement first if needed).
+    Returns None if the item isn't reported.
+    """
+    statement = normalize_statement(statement)
+    if statement is None or key not in statement.index:
+        return None
+    return statement.loc[key]
+
+
+def to_float(frame):
+    """statement values as floats, coercing non-numeric entries to NaN"""
+    try:
+        return frame.astype(float)
+    except (TypeError, ValueError):
+        # object columns with non-numeric entries
+        return frame.apply(pd.to_numeric, errors="coerce").astype(float)
+
+
+def extract_items(statement, keys):
+    """
+    Several line items in one keyed lookup, as a float DataFrame with one row per
+    period and one column per key (NaN for items that aren't reported).
+    Accepts statement DataFrames and CompactStatements.
+    """
+    from data.statement_store import CompactStatement
+
+    if isinstance(statement, CompactStatement):
+        index = pd.DatetimeIndex(statement.ends.astype("datetime64[ns]"))
+        return pd.DataFrame(statement.extract(keys), index=index, columns=keys)
+
+    statement = normalize_statement(statement)
+    if statement is None:
+        return pd.DataFrame(columns=keys, dtype=float)
+    return to_float(statement.reindex(keys).T)
+
+
+def statement_frequency(statement):
+    """'annual', 'quarterly' or 'ttm' (the column index name marks non-annual statements)"""
+    from data.statement_store import CompactStatement
+
+    if isinstance(statement, CompactStatement):
+        return statement.frequency
+    return statement.columns.name or "annual"
+
+
+def set_frequency(statement, frequency):
+    """a shallow copy of a statement DataFrame with its columns marked as the given frequency"""
+    if statement is None:
+        return None
+    marked = statement.copy(deep=False)
+    marked.columns = marked.columns.rename(None if frequency == "annual" else frequency)
+    return marked
+
+
+def period_values(statement, key):
+    """
+    One line item as (periods, float values) arrays, for statement DataFrames and
+    CompactStatements. Periods are fiscal years for annual statements and period end
+    dates (datetime64[D]) for quarterly and TTM ones. Raises KeyError if the item isn't reported.
+    """
+    from data.statement_store import CompactStatement
+
+    annual = statement_frequency(statement) == "annual"
+    if isinstance(statement, CompactStatement):
+        row = statement.row(key)
+        if row is None:
+            raise KeyError(key)
+        return (statement.years.astype("int64") if annual else statement.ends), row
+
+    row = to_float(normalize_statement(statement).loc[key])
+    ends = pd.to_datetime(row.index)
+    periods = ends.year.to_numpy(dtype="int64") if annual else ends.to_numpy(dtype="datetime64[D]")
+    return periods, row.to_numpy()
+
+
+def period_item(statement, key):
+    """
+    One line item as a float Series indexed by period (fiscal year, or period end date for
+    quarterly and TTM statements), for statement DataFrames and CompactStatements.
+    Raises KeyError if the item isn't reported.
+    """
+    periods, values = period_values(statement, key)
+    return pd.Series(values, index=periods, name=key)
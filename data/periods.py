@@ -0,0 +1,91 @@
+"""
+data/periods.py
+
+Statement frequencies: annual, quarterly and trailing twelve months (TTM).
+Quarterly statements come from the provider's quarterly_* statements. TTM
+flow statements (income statement, cash flow) are rolled up from them as
+4-quarter sums computed for every line item at once. TTM balance sheets are
+the quarterly point-in-time values, since a stock item is a balance at a
+date and summing it over four quarters means nothing.
+"""
+
+from data.line_items import INDEX_NAME, to_float, set_frequency
+from utils.lazy import lazy_import
+from utils.memo import memoize
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+FREQUENCIES = ["annual", "quarterly", "ttm"]
+
+# statement periods per year at each frequency (a TTM statement covers a whole year)
+PERIODS_PER_YEAR = {"annual": 1, "quarterly": 4, "ttm": 1}
+
+# statements that record flows over a period (the balance sheet records stocks at a date)
+FLOW_STATEMENTS = ("financials", "cashflow")
+
+# flow-statement items that don't add up over quarters, and how four quarters combine instead
+# (every other item is summed)
+ROLLUPS = {
+    "diluted_average_shares": "mean",
+    "basic_average_shares": "mean",
+    "beginning_cash_position": "first",
+    "end_cash_position": "last",
+}
+
+# days between consecutive quarter ends (fiscal quarters run 13 weeks or roughly 3 months)
+QUARTER_DAYS = (80, 100)
+
+
+def statement_kind(kind, frequency):
+    """provider statement kind to fetch for a statement ('financials', ...) at the given frequency"""
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown statement frequency '{frequency}', expected one of {', '.join(FREQUENCIES)}")
+    return kind if frequency == "annual" else f"quarterly_{kind}"
+
+
+@memoize
+def trailing_twelve_months(quarterly):
+    """
+    TTM statement from a normalized quarterly statement: for each quarter end, the sum of the
+    four quarters ending there (or the ROLLUPS combination), for every line item in one pass
+    over the values matrix. A TTM value needs all four quarters reported and consecutive, so
+    gaps in the quarterly history leave no TTM column rather than a short sum.
+    """
+    ends = pd.to_datetime(quarterly.columns).to_numpy(dtype="datetime64[D]")
+    order = np.argsort(ends, kind="stable")
+    ends = ends[order]
+    values = to_float(quarterly).to_numpy()[:, order]
+
+    if len(ends) < 4:
+        return set_frequency(pd.DataFrame(index=quarterly.index, columns=pd.DatetimeIndex([]), dtype=float), "ttm")
+
+    # a window is contiguous if none of its three quarter-to-quarter gaps is off
+    gaps = np.diff(ends).astype(np.int64)
+    breaks = np.concatenate([[0], np.cumsum((gaps < QUARTER_DAYS[0]) | (gaps > QUARTER_DAYS[1]))])
+    contiguous = breaks[3:] == breaks[:-3]
+
+    # items x windows x 4 quarters, as a view; a NaN quarter makes the window's sum NaN
+    windows = np.lib.stride_tricks.sliding_window_view(values, 4, axis=1)
+    rolled = windows.sum(axis=2)
+    for key, how in ROLLUPS.items():
+        if key in quarterly.index:
+            row = quarterly.index.get_loc(key)
+            rolled[row] = {"mean": rolled[row] / 4, "first": windows[row, :, 0], "last": windows[row, :, 3]}[how]
+
+    # most recent first, like the provider statements
+    rolled = rolled[:, contiguous][:, ::-1]
+    columns = pd.DatetimeIndex(ends[3:][contiguous][::-1].astype("datetime64[ns]"), name="ttm")
+    return pd.DataFrame(rolled, index=pd.Index(quarterly.index, name=INDEX_NAME), columns=columns)
+
+
+def at_frequency(quarterly, kind, frequency):
+    """
+    A normalized quarterly statement as the given frequency: TTM rollups for flow statements
+    when frequency is 'ttm', otherwise the quarterly values marked with the frequency.
+    """
+    if quarterly is None:
+        return None
+    if frequency == "ttm" and kind in FLOW_STATEMENTS:
+        return trailing_twelve_months(quarterly)
+    return set_frequency(quarterly, frequency)
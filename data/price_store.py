@@ -0,0 +1,324 @@
+"""
+data/price_store.py
+
+On-disk columnar store for long daily price histories of many tickers.
+Each field (Close, Volume, ...) is one memory-mapped .npy array of shape
+(tickers x trading days) on a shared business-day axis, described by a small
+meta.json (first day, number of days, ticker -> row, field -> file). Opening the
+store only reads meta.json; slicing a ticker or a date range returns zero-copy
+NumPy views and only touches the pages that are read.
+Arrays that have to grow are copied into new files, and meta.json is replaced
+last, so a reader sees either the old files and meta or the new ones.
+"""
+
+import json
+import os
+import threading
+
+from utils.config import PRICE_STORE_DIR
+from utils.constants import PRICE_STORE_FIELDS
+from utils.lazy import lazy_import
+from utils.memo import set_fingerprint
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+META_FILE = "meta.json"
+
+# spare trading days allocated past the last written day (about a year), so nightly
+# appends write in place instead of growing the files
+DAY_HEADROOM = 260
+
+
+def _field_name(field):
+    return field.lower().replace(" ", "_")
+
+
+def _field_file(field, generation=0):
+    """file of a field's array; arrays grown for a later meta.json carry its version in the name"""
+    return f"{_field_name(field)}.{generation}.npy" if generation else f"{_field_name(field)}.npy"
+
+
+def _day(value):
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+def _modified(path):
+    """modification time of a file in ns, or None if it doesn't exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+class PriceStore:
+    """
+    Memory-mapped price arrays on a shared trading-day axis.
+
+    Day i of the axis is the i-th business day (Mon-Fri) from `start`, so a date's
+    position is computed rather than looked up. Exchange holidays and days before a
+    ticker listed are NaN. Weekend bars are not stored.
+    """
+
+    def __init__(self, directory=PRICE_STORE_DIR, fields=PRICE_STORE_FIELDS):
+        """
+        Open (or prepare) the store in `directory`. Only meta.json is read here;
+        the field arrays are mapped on first access.
+
+        Args:
+            directory (str): Directory holding meta.json and one .npy file per field.
+            fields (tuple, optional): Fields of a new store. An existing store keeps its own.
+        """
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._arrays = {}
+
+        path = os.path.join(directory, META_FILE)
+        self.opened_meta = _modified(path)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                meta = json.load(f)
+            self.fields = tuple(meta["fields"])
+            self.start = np.datetime64(meta["start"], "D") if meta["start"] else None
+            self.days = meta["days"]
+            self.tickers = meta["tickers"]
+            self.version = meta.get("version", 0)
+            # stores written before arrays were versioned have one file per field
+            self.files = meta.get("files") or {field: _field_file(field) for field in self.fields}
+        else:
+            self.fields, self.start, self.days, self.tickers = tuple(fields), None, 0, []
+            self.version = 0
+            self.files = {field: _field_file(field) for field in self.fields}
+        self._meta_files = dict(self.files)  # files named by the meta.json on disk
+        self._rows = {ticker: row for row, ticker in enumerate(self.tickers)}
+
+    def __contains__(self, ticker):
+        return ticker.upper() in self._rows
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def __repr__(self):
+        return f"<PriceStore {self.directory}: {len(self.tickers)} tickers x {self.days} days>"
+
+    @property
+    def dates(self):
+        """datetime64[D] date of every day on the axis"""
+        if self.start is None:
+            return np.array([], dtype="datetime64[D]")
+        return np.busday_offset(self.start, np.arange(self.days))
+
+    @property
+    def nbytes(self):
+        """bytes of the field arrays on disk"""
+        paths = [self._path(field) for field in self.fields]
+        return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+    def _path(self, field):
+        return os.path.join(self.directory, self.files[field])
+
+    def _array(self, field):
+        """read-only memory map of one field (tickers x allocated days)"""
+        if field not in self.fields:
+            raise KeyError(f"{field!r} is not stored (fields: {', '.join(self.fields)})")
+        array = self._arrays.get(field)
+        if array is None:
+            array = np.load(self._path(field), mmap_mode="r")
+            self._arrays[field] = array
+        return array
+
+    def span(self, start=None, end=None):
+        """(first, stop) positions on the axis of the days from `start` to `end`, inclusive"""
+        if self.start is None:
+            return 0, 0
+        first = 0 if start is None else int(np.busday_count(self.start, _day(start)))
+        stop = self.days if end is None else int(np.busday_count(self.start, _day(end) + 1))
+        return min(max(first, 0), self.days), min(max(stop, 0), self.days)
+
+    def field(self, field="Close", start=None, end=None, tickers=None):
+        """
+        (tickers x days) view of one field, rows in self.tickers order, or in the order of `tickers`
+        when given. Selected rows are a zero-copy view when they are stored next to each other
+        (e.g. a universe written in one update) and a copy of just those rows otherwise.
+        """
+        if not self.tickers:
+            return np.empty((0 if tickers is None else len(tickers), 0))
+        first, stop = self.span(start, end)
+        array = self._array(field)
+        if tickers is None:
+            return array[:len(self.tickers), first:stop]
+
+        rows = [self._rows[t.upper()] for t in tickers]
+        if rows and rows == list(range(rows[0], rows[0] + len(rows))):
+            return array[rows[0]:rows[0] + len(rows), first:stop]
+        return array[rows, first:stop]
+
+    def frame(self, tickers, field="Close", start=None, end=None):
+        """
+        One field for the given tickers as a (dates x tickers) DataFrame over a view of the
+        store, shaped like get_price_histories(...)[field] (days a ticker has no bar are NaN).
+        Tagged with the store's version, so memoized analysis keys it without hashing the prices.
+        """
+        tickers = [t.upper() for t in tickers]
+        first, stop = self.span(start, end)
+        frame = pd.DataFrame(self.field(field, start, end, tickers).T, copy=False,
+                             index=pd.DatetimeIndex(self.dates[first:stop].astype("datetime64[ns]"), name="Date"),
+                             columns=pd.Index(tickers, name="Ticker"))
+        return set_fingerprint(frame, f"store:{self.directory}:{self.version}:{field}:{','.join(tickers)}:{first}:{stop}")
+
+    def last_bars(self, tickers, field="Close"):
+        """date of each ticker's last bar (NaT for tickers without one), from the end of the axis"""
+        dates = self.dates
+        last = []
+        for ticker in tickers:
+            values = self.series(ticker, field)
+            valid = np.flatnonzero(~np.isnan(values[::-1]))
+            last.append(dates[len(values) - 1 - valid[0]] if len(valid) else np.datetime64("NaT", "D"))
+        return np.array(last, dtype="datetime64[D]")
+
+    def series(self, ticker, field="Close", start=None, end=None):
+        """zero-copy view of one ticker's field across the days from `start` to `end`"""
+        row = self._rows.get(ticker.upper())
+        if row is None:
+            raise KeyError(f"{ticker} is not in the price store")
+        first, stop = self.span(start, end)
+        return self._array(field)[row, first:stop]
+
+    def history(self, ticker, start=None, end=None):
+        """
+        One ticker's bars as a DataFrame shaped like get_price_history's (fields as columns,
+        a DatetimeIndex), without the days it has no bars for. Unlike series(), this copies.
+        """
+        first, stop = self.span(start, end)
+        bars = pd.DataFrame({field: self.series(ticker, field, start, end) for field in self.fields},
+                            index=pd.DatetimeIndex(self.dates[first:stop], name="Date"))
+        return bars.dropna(how="all")
+
+    def write(self, histories):
+        """
+        Write a get_price_histories frame ((Price, Ticker) columns on a daily date index) into
+        the store, adding tickers and days as needed. Within the frame's date range the frame
+        replaces what is stored for its tickers; days outside it are left alone.
+        """
+        if histories.empty:
+            return
+        with self._lock:
+            names = list(histories.columns.get_level_values("Ticker").unique())
+            tickers = [t.upper() for t in names]
+            dates = pd.DatetimeIndex(histories.index).tz_localize(None).to_numpy(dtype="datetime64[D]")
+            weekdays = np.is_busday(dates)
+            dates = dates[weekdays]
+            if not len(dates):
+                return
+
+            self._allocate(tickers, dates.min(), dates.max())
+            rows = np.array([self._rows[t] for t in tickers])
+            positions = np.busday_count(self.start, dates)
+
+            for field in self.fields:
+                if field not in histories.columns.get_level_values("Price"):
+                    continue
+                values = histories[field].reindex(columns=names).to_numpy(dtype=np.float64, na_value=np.nan)
+                block = values[weekdays].T
+                array = np.load(self._path(field), mmap_mode="r+")
+                array[rows[:, None], positions[None, :]] = block
+                array.flush()
+                del array
+
+            self.days = max(self.days, int(positions.max()) + 1)
+            self._write_meta()
+
+    def _allocate(self, tickers, first, last):
+        """
+        register new tickers and make sure the arrays cover first..last, growing the files if needed.
+        A grown array is written to a new file that only the next meta.json names, so readers of the
+        current meta.json keep a consistent set of arrays until write() replaces it.
+        """
+        for ticker in tickers:
+            if ticker not in self._rows:
+                self._rows[ticker] = len(self.tickers)
+                self.tickers.append(ticker)
+
+        # first and last are business days; an earlier first day moves the whole axis
+        start = first if self.start is None else min(self.start, first)
+        shift = 0 if self.start is None else int(np.busday_count(start, self.start))
+        needed_days = max(int(np.busday_count(start, last)) + 1, self.days + shift)
+
+        os.makedirs(self.directory, exist_ok=True)
+        generation = self.version + 1
+        for field in self.fields:
+            path = self._path(field)
+            current = np.load(path, mmap_mode="r") if os.path.exists(path) else None
+            shape = current.shape if current is not None else (0, 0)
+            if shift == 0 and shape[0] >= len(self.tickers) and shape[1] >= needed_days:
+                continue
+
+            # grow geometrically so repeated additions don't rewrite the file every time
+            n_rows = max(len(self.tickers), shape[0] + shape[0] // 2)
+            n_days = max(needed_days, shape[1] + shift) + DAY_HEADROOM
+            name = _field_file(field, generation)
+            grown = np.lib.format.open_memmap(os.path.join(self.directory, name), mode="w+", dtype=np.float64,
+                                              shape=(n_rows, n_days))
+            grown[:] = np.nan
+            if current is not None:
+                grown[:shape[0], shift:shift + shape[1]] = current
+            grown.flush()
+            del grown, current
+            self.files[field] = name
+
+        self.start = start
+        self.days += shift
+        self._arrays.clear()
+
+    def _write_meta(self):
+        # every write bumps the version, which identifies the stored values in fingerprints
+        self.version += 1
+        meta = {"fields": list(self.fields), "start": str(self.start), "days": self.days, "tickers": self.tickers,
+                "version": self.version, "files": self.files}
+        path = os.path.join(self.directory, META_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path)
+        self.opened_meta = _modified(path)
+        self._arrays.clear()
+        self._remove_stale_files()
+        self._meta_files = dict(self.files)
+
+    def _remove_stale_files(self):
+        """
+        delete field arrays named by neither the new meta.json nor the one it replaced (readers that
+        opened the previous one can still map its arrays), e.g. left by a write that failed part way
+        """
+        keep = set(self.files.values()) | set(self._meta_files.values())
+        prefixes = tuple(_field_name(field) + "." for field in self.fields)
+        for name in os.listdir(self.directory):
+            if name.endswith(".npy") and name.startswith(prefixes) and name not in keep:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass  # still mapped on platforms that don't allow removing open files
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_price_store():
+    """
+    Return the shared PriceStore in FA_PRICE_STORE_DIR, reopened when another process
+    (e.g. a nightly cli.py --update-price-store) has written to it since it was opened.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PriceStore()
+        elif _modified(os.path.join(_store.directory, META_FILE)) != _store.opened_meta:
+            _store = PriceStore(_store.directory, _store.fields)
+    return _store
+
+
+def set_price_store(store):
+    """Replace the shared PriceStore (e.g. a store in a scratch directory for benchmarks)."""
+    global _store
+    with _store_lock:
+        _store = store
@@ -0,0 +1,84 @@
+"""
+data/scheduler.py
+
+Fans out per-ticker fetches onto a bounded thread pool so comparing many
+companies takes roughly as long as the slowest one rather than the sum of all.
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils.config import FETCH_WORKERS, FETCH_TIMEOUT
+
+STATEMENT_FIELDS = ["financials", "balance_sheet", "cashflow"]
+
+
+def _load(snapshot, field):
+    """load one snapshot field ('history' loads the default 1 year of prices)"""
+    if field == "history":
+        return snapshot.history()
+    return getattr(snapshot, field)
+
+
+def prefetch(snapshots, fields, max_workers=FETCH_WORKERS, timeout=FETCH_TIMEOUT):
+    """
+    Load the given fields ('info', 'financials', 'balance_sheet', 'cashflow', 'history')
+    for every TickerSnapshot concurrently and wait for them to finish.
+
+    timeout is a per-request deadline measured from when the request starts running,
+    so requests queued behind a slow ticker keep their full budget. A ticker with a
+    request past its deadline is reported and left behind (its queued requests are
+    dropped) instead of stalling the page.
+    Returns {ticker: reason} for tickers that failed or timed out.
+    """
+    snapshots = [s for s in snapshots if s is not None and s.ticker]
+    if not snapshots:
+        return {}
+
+    tasks = [(s, field) for s in snapshots for field in fields]
+    started = {}  # task index -> monotonic time its request started
+    lock = threading.Lock()
+
+    def load(i):
+        with lock:
+            started[i] = time.monotonic()
+        return _load(*tasks[i])
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+    # workers run in a copy of the caller's context so their spans go to the caller's trace recorder
+    futures = {executor.submit(contextvars.copy_context().run, load, i): i for i in range(len(tasks))}
+
+    # requests left running past their deadline still hold a worker, which can delay the ones
+    # queued behind them; past one deadline per wave of workers (plus one) the rest are given up
+    waves = -(-len(tasks) // max_workers)
+    backstop = time.monotonic() + timeout * (waves + 1)
+
+    failed = {}
+    pending = set(futures)
+    while pending:
+        with lock:
+            deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+        wait(pending, timeout=max(min(deadlines, default=backstop) - time.monotonic(), 0),
+             return_when=FIRST_COMPLETED)
+
+        now = time.monotonic()
+        with lock:
+            expired = {futures[f] for f in pending
+                       if not f.done() and (now >= backstop or started.get(futures[f], now) + timeout <= now)}
+        for i in expired:
+            snapshot, field = tasks[i]
+            failed.setdefault(snapshot.ticker, f"timed out after {timeout:g}s fetching {field}")
+
+        # a timed-out ticker's other requests are not waited for either
+        pending = {f for f in pending if not f.done() and tasks[futures[f]][0].ticker not in failed}
+
+    # don't block on stragglers; their results are simply not used
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    for future, i in futures.items():
+        snapshot, field = tasks[i]
+        if future.done() and not future.cancelled() and future.exception() is not None:
+            failed.setdefault(snapshot.ticker, f"{field}: {future.exception()}")
+    return failed
@@ -0,0 +1,113 @@
+"""
+data/snapshot.py
+
+Defines TickerSnapshot, a per-ticker view over the fetcher that requests each
+data type at most once. Statements are normalized to canonical line-item keys
+(see data/line_items.py) as they are loaded, and can be held annually,
+quarterly or as trailing-twelve-month rollups (see data/periods.py).
+"""
+
+import threading
+
+from data.fetcher import get_company_info, get_statement, get_price_history, has_market_price
+from data.line_items import normalize_statement, unmapped_labels
+from data.periods import statement_kind, at_frequency, FREQUENCIES
+from data.statement_store import CompactStatement
+from utils.memo import derive_fingerprint
+
+
+class TickerSnapshot:
+    """Lazily fetched info, statements and price history for one ticker."""
+
+    def __init__(self, ticker, compact=False, frequency="annual"):
+        """
+        Initialize a TickerSnapshot. Nothing is fetched until a field is first accessed.
+
+        Args:
+            ticker (str): Ticker symbol.
+            compact (bool, optional): Hold statements as CompactStatements instead of DataFrames,
+                for batch jobs that keep thousands of tickers in memory. Defaults to False.
+            frequency (str, optional): Statement periods, one of FREQUENCIES: 'annual', 'quarterly',
+                or 'ttm' (trailing-twelve-month income and cash flow, quarterly balance sheet).
+                Defaults to "annual".
+        """
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Unknown statement frequency '{frequency}', expected one of {', '.join(FREQUENCIES)}")
+        self.ticker = ticker.upper() if ticker else ""
+        self.compact = compact
+        self.frequency = frequency
+        self._data = {}
+        # one lock per field, so a caller reaching a field a prefetch worker is still loading
+        # waits for that fetch instead of starting a second one
+        self._lock = threading.Lock()
+        self._field_locks = {}
+
+    def _get(self, key, fetch_func):
+        """return a memoized field, fetching it on first access"""
+        if key in self._data:
+            return self._data[key]
+        with self._lock:
+            field_lock = self._field_locks.setdefault(key, threading.Lock())
+        with field_lock:
+            if key not in self._data:
+                self._data[key] = fetch_func()
+        return self._data[key]
+
+    def exists(self):
+        """check if the ticker exists (uses the same .info request as every other field)."""
+        if not self.ticker:
+            return False
+        try:
+            return has_market_price(self.info)
+        except Exception:
+            return False
+
+    @property
+    def info(self):
+        """general company info (market cap, PE ratio, etc.)"""
+        return self._get("info", lambda: get_company_info(self.ticker))
+
+    @property
+    def name(self):
+        """company short name, falling back to the ticker"""
+        return self.info.get("shortName", self.ticker)
+
+    def _statement(self, kind):
+        """fetch a statement, noting labels outside the line-item schema before normalizing it"""
+        def fetch():
+            statement = get_statement(self.ticker, statement_kind(kind, self.frequency))
+            self._data[("unmapped", kind)] = unmapped_labels(statement)
+            normalized = derive_fingerprint(normalize_statement(statement), statement, "normalized")
+            if self.frequency != "annual":
+                normalized = derive_fingerprint(at_frequency(normalized, kind, self.frequency), normalized,
+                                                self.frequency)
+            if self.compact:
+                return derive_fingerprint(CompactStatement.from_frame(normalized), normalized, "compact")
+            return normalized
+        return self._get(kind, fetch)
+
+    def unmapped_labels(self):
+        """provider labels dropped from the statements loaded so far, by statement kind"""
+        return {key[1]: labels for key, labels in list(self._data.items())
+                if isinstance(key, tuple) and key[0] == "unmapped" and labels}
+
+    @property
+    def financials(self):
+        return self._statement("financials")
+
+    @property
+    def balance_sheet(self):
+        return self._statement("balance_sheet")
+
+    @property
+    def cashflow(self):
+        return self._statement("cashflow")
+
+    @property
+    def statements(self):
+        """financials, balance sheet, and cashflow at the snapshot's frequency, indexed by canonical line-item keys (CompactStatements if compact)."""
+        return self.financials, self.balance_sheet, self.cashflow
+
+    def history(self, period="1y", interval="1d"):
+        """historical price data for the given period and interval"""
+        return self._get(("history", period, interval), lambda: get_price_history(self.ticker, period, interval))
@@ -0,0 +1,106 @@
+"""
+data/statement_store.py
+
+Compact, array-backed financial statements.
+A CompactStatement keeps a statement as one float64 matrix (line item x period)
+with integer-coded canonical line items and integer fiscal years, instead of a
+pandas DataFrame with a string index. It holds the same numbers in a fraction of
+the memory, and the analysis functions accept it wherever they take a statement.
+"""
+
+from data.line_items import LINE_ITEMS, normalize_statement, to_float, statement_frequency, INDEX_NAME
+from utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# integer code of every canonical line item (its position in the schema)
+ITEM_KEYS = list(LINE_ITEMS)
+ITEM_CODES = {key: code for code, key in enumerate(ITEM_KEYS)}
+
+
+class CompactStatement:
+    """
+    One statement as NumPy arrays:
+
+        values  float64 (items x periods), periods most recent first like the provider frames
+        codes   int16 canonical line-item code of each row
+        ends    datetime64[D] period end dates
+        years   int16 fiscal year of each period
+        frequency  'annual', 'quarterly' or 'ttm' (see data/periods.py)
+
+    Rows are found through a small code -> row table, so lookups never touch strings.
+    """
+
+    __slots__ = ("values", "codes", "ends", "years", "frequency", "_rows", "__weakref__")
+
+    def __init__(self, values, codes, ends, frequency="annual"):
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.codes = np.asarray(codes, dtype=np.int16)
+        self.ends = np.asarray(ends, dtype="datetime64[D]")
+        self.years = (self.ends.astype("datetime64[Y]").astype(np.int64) + 1970).astype(np.int16)
+        self.frequency = frequency
+
+        # row of each line-item code, -1 if the item isn't reported
+        self._rows = np.full(len(ITEM_KEYS), -1, dtype=np.int16)
+        self._rows[self.codes] = np.arange(len(self.codes), dtype=np.int16)
+
+    @classmethod
+    def from_frame(cls, statement):
+        """Build from a provider or normalized statement DataFrame (columns are period end dates)."""
+        if statement is None:
+            return None
+        statement = normalize_statement(statement)
+        codes = [ITEM_CODES[key] for key in statement.index]
+        values = to_float(statement).to_numpy()
+        ends = pd.to_datetime(statement.columns).to_numpy(dtype="datetime64[D]")
+        return cls(values.reshape(len(codes), len(ends)), codes, ends, statement_frequency(statement))
+
+    def __contains__(self, key):
+        code = ITEM_CODES.get(key)
+        return code is not None and self._rows[code] >= 0
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def keys(self):
+        """canonical keys of the reported line items, in row order"""
+        return [ITEM_KEYS[code] for code in self.codes]
+
+    @property
+    def empty(self):
+        return self.values.size == 0
+
+    @property
+    def nbytes(self):
+        """bytes held by the arrays"""
+        return self.values.nbytes + self.codes.nbytes + self.ends.nbytes + self.years.nbytes + self._rows.nbytes
+
+    def row(self, key):
+        """values of one line item across periods, or None if it isn't reported"""
+        code = ITEM_CODES.get(key)
+        if code is None or self._rows[code] < 0:
+            return None
+        return self.values[self._rows[code]]
+
+    def extract(self, keys):
+        """periods x keys float matrix, NaN for items that aren't reported"""
+        out = np.full((len(self.ends), len(keys)), np.nan)
+        for column, key in enumerate(keys):
+            row = self.row(key)
+            if row is not None:
+                out[:, column] = row
+        return out
+
+    def to_frame(self):
+        """the normalized DataFrame this statement was built from"""
+        columns = pd.DatetimeIndex(self.ends.astype("datetime64[ns]"),
+                                   name=None if self.frequency == "annual" else self.frequency)
+        return pd.DataFrame(self.values, index=pd.Index(self.keys, name=INDEX_NAME), columns=columns)
+
+    def __reduce__(self):
+        return self.__class__, (self.values, self.codes, self.ends, self.frequency)
+
+    def __repr__(self):
+        return f"<CompactStatement {len(self.codes)} items x {len(self.ends)} periods, {self.nbytes} bytes>"
@@ -0,0 +1,28 @@
+"""
+tests/baseline_formatter.py
+
+The per-column highlight_df_bounds utils/formatter.py used before it was vectorized, kept
+verbatim as the reference its styles are checked against. (format_large_number, the per-cell
+formatter format_large_numbers replaces in tables, is still in utils/formatter.py.)
+"""
+
+
+def highlight_df_bounds(df, lower=None, upper=None, low_color='lightcoral', high_color='yellow'):
+    """
+    Highlight DataFrame values outside specified bounds.
+    Bounds are numbers applied to every column, or dicts of per-column bounds (e.g. from a PeerIndex).
+    """
+
+    numeric_cols = df.select_dtypes(include='number').columns
+
+    def style_func(s):
+        low = lower.get(s.name) if isinstance(lower, dict) else lower
+        high = upper.get(s.name) if isinstance(upper, dict) else upper
+        return [
+            f'color: {low_color}' if (low is not None and v < low)
+            else f'color: {high_color}' if (high is not None and v > high)
+            else ''
+            for v in s
+        ]
+
+    return df.style.apply(style_func, subset=numeric_cols)
\ No newline at end of file
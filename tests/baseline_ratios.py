@@ -0,0 +1,128 @@
+"""
+tests/baseline_ratios.py
+
+The per-label ratio functions analysis/ratios.py used before ratio_history, kept as the
+reference it is checked against. Two fixes the vectorized version made on purpose are
+applied here too: D/E uses 'Total Liabilities' when it is reported (the old code only
+worked through the current + non-current fallback) and the quick ratio looks up
+'Total Current Liabilities' (the old label had a typo). Positional lookups use .iloc.
+"""
+
+from data.metric_data import MetricData
+from utils.formatter import format_delta
+from utils.constants import PM, ROE, DE, CR, QR
+
+
+def get_value_by_label(df, possible_labels):
+    """
+    Searches for the first matching label in a DataFrame index.
+    Returns the value from the most recent column.
+    """
+    for label in possible_labels:
+        if label in df.index:
+            return df.loc[label]  # Most recent year
+    return None  # Graceful fallback
+
+
+def calculate_ratios(financials, balance_sheet):
+    """Calculate all financial ratios and return as a series."""
+
+    series = {
+        PM: (calculate_profit_margin(financials)),
+        ROE: calculate_ROE(financials, balance_sheet),
+        DE: calculate_DE_ratio(balance_sheet),
+        CR: calculate_current_ratio(balance_sheet),
+        QR: calculate_quick_ratio(balance_sheet)
+    }
+    return series
+
+
+def calculate_profit_margin(financials):
+    """Net Income / Revenue"""
+
+    try:
+        revenue = get_value_by_label(financials, ['Total Revenue', 'Revenue'])
+        net_income = get_value_by_label(financials, ['Net Income'])
+
+        curr = net_income.iloc[0] / revenue.iloc[0]
+        prev = net_income.iloc[1] / revenue.iloc[1]
+
+        return MetricData(PM, curr, format_delta(curr, prev, True), "{:.2%}")
+
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return None
+
+
+def calculate_ROE(financials, balance_sheet):
+    """Net Income / Shareholder Equity"""
+
+    try:
+        net_income = get_value_by_label(financials, ['Net Income'])
+        equity = get_value_by_label(balance_sheet, ['Stockholders Equity', 'Total Stockholders Equity'])
+
+        curr = net_income.iloc[0] / equity.iloc[0]
+        prev = net_income.iloc[1] / equity.iloc[1]
+
+        return MetricData(ROE, curr, format_delta(curr, prev, True), "{:.2%}")
+
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return MetricData(ROE, None)
+
+
+def calculate_DE_ratio(balance_sheet):
+    """Total Liabilities / Shareholder Equity"""
+
+    try:
+        calculated_liab = get_value_by_label(balance_sheet, ['Total Liabilities'])
+
+        if calculated_liab is None:
+            current_liabilities = get_value_by_label(balance_sheet, ['Current Liabilities'])
+            non_current_liabilities = get_value_by_label(balance_sheet, ['Total Non Current Liabilities Net Minority Interest'])
+            if current_liabilities is None and non_current_liabilities is None:
+                return None
+
+            calculated_liab = non_current_liabilities + current_liabilities
+
+        equity = get_value_by_label(balance_sheet, ['Stockholders Equity', 'Total Stockholders Equity'])
+
+        curr = calculated_liab.iloc[0] / equity.iloc[0]
+        prev = calculated_liab.iloc[1] / equity.iloc[1]
+
+        return MetricData(DE, curr, format_delta(curr, prev))
+
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return MetricData(DE, None)
+
+
+def calculate_current_ratio(balance_sheet):
+    """Current Assets / Current Liabilities"""
+
+    try:
+        current_assets = get_value_by_label(balance_sheet, ['Total Current Assets', 'Current Assets'])
+        current_liabilities = get_value_by_label(balance_sheet, ['Total Current Liabilities', 'Current Liabilities'])
+
+        curr = current_assets.iloc[0] / current_liabilities.iloc[0]
+        prev = current_assets.iloc[1] / current_liabilities.iloc[1]
+
+        return MetricData(CR, curr, format_delta(curr, prev))
+
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return MetricData(CR, None)
+
+
+def calculate_quick_ratio(balance_sheet):
+    """(Current Assets - Inventory) / Current Liabilities"""
+
+    try:
+        current_assets = get_value_by_label(balance_sheet, ['Total Current Assets', 'Current Assets'])
+        inventory = get_value_by_label(balance_sheet, ['Inventory'])
+
+        current_liabilities = get_value_by_label(balance_sheet, ['Total Current Liabilities', 'Current Liabilities'])
+
+        curr = (current_assets.iloc[0] - inventory.iloc[0]) / current_liabilities.iloc[0]
+        prev = (current_assets.iloc[1] - inventory.iloc[1]) / current_liabilities.iloc[1]
+
+        return MetricData(QR, curr, format_delta(curr, prev))
+
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return MetricData(QR, None)
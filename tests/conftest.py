@@ -0,0 +1,22 @@
+"""
+tests/conftest.py
+
+Shared test setup. Settings are read from the environment when utils/config.py is
+imported, so the cache, memo and store directories are pointed at a scratch
+directory here, before any module under test is imported.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCRATCH = tempfile.mkdtemp(prefix="financial-analyzer-tests-")
+os.environ["FA_CACHE_DIR"] = SCRATCH
+os.environ["FA_PROVIDER"] = "local"
+os.environ["FA_FIXTURE_DIR"] = os.path.join(SCRATCH, "fixtures")
+os.environ["FA_MEMO_BACKEND"] = "lru"
+for name in ("FA_CACHE", "FA_OFFLINE", "FA_TRACE", "FA_TRACE_MEMORY", "FA_PRICE_STORE_DIR", "FA_PEER_INDEX_DIR",
+             "FA_MEMO_DIR", "FA_PRICE_REFRESH"):
+    os.environ.pop(name, None)
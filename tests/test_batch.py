@@ -0,0 +1,142 @@
+"""
+tests/test_batch.py
+
+analyze() returns, as tidy (ticker, section, metric, period, value) rows, the metrics the
+per-ticker functions compute, and the CLI writes that table as JSON, CSV or Parquet
+without losing rows or turning missing periods into dates.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import cli
+from analysis.batch import analyze, section_rows
+from analysis.growth import get_growth_metrics
+from analysis.performance import calculate_efficiency_metrics, calculate_stock_metrics
+from analysis.ratios import ratio_history
+from analysis.valuation import get_valuation_metrics
+from benchmarks.synthetic import SimulatedProvider, statement
+from data.cache import DataCache, set_cache
+from data.fetcher import get_company_info, get_price_history, get_statement
+from data.providers import set_provider
+from data.snapshot import TickerSnapshot
+from utils.constants import GROWTH_LABELS
+
+TICKERS = ["AAA", "BBB"]
+
+
+class LiveProvider(SimulatedProvider):
+    """a remote provider serving synthetic info and statements as well as prices; MISSING isn't listed"""
+
+    def info(self, ticker):
+        if ticker == "MISSING":
+            raise LookupError("ticker not found")
+        return {"shortName": f"{ticker} Corp", "regularMarketPrice": 10.0 + len(ticker), "trailingPE": 18.0,
+                "priceToBook": 2.5, "marketCap": 1e9 * sum(map(ord, ticker)), "enterpriseToEbitda": 12.0}
+
+    def statement(self, ticker, kind):
+        return statement(n_rows=40, seed=sum(map(ord, ticker + kind)))
+
+
+@pytest.fixture
+def provider(tmp_path):
+    set_cache(DataCache(directory=str(tmp_path / "cache")))
+    # prices run up to today, as periods like "1y" are counted back from it
+    set_provider(LiveProvider(pd.Timestamp.today().normalize()))
+    yield
+    set_cache(None)
+    set_provider(None)
+
+
+@pytest.fixture
+def result(provider):
+    return analyze(TICKERS + ["MISSING"])
+
+
+def rows(result, ticker, section, metric):
+    selected = result[(result["ticker"] == ticker) & (result["section"] == section) & (result["metric"] == metric)]
+    return dict(zip(selected["period"], selected["value"]))
+
+
+def assert_rows(actual, series, label=str):
+    if series is None:
+        assert actual == {}
+        return
+    expected = {label(period): value for period, value in series.dropna().items()}
+    assert actual.keys() == expected.keys()
+    np.testing.assert_allclose([actual[k] for k in expected], list(expected.values()), rtol=1e-12)
+
+
+def test_rows_match_per_ticker_metrics(result):
+    assert set(result["ticker"]) == set(TICKERS) and list(result.attrs["failed"]) == ["MISSING"]
+
+    for ticker in TICKERS:
+        financials, balance_sheet, cashflow = (get_statement(ticker, kind)
+                                               for kind in ("financials", "balance_sheet", "cashflow"))
+        history = ratio_history(financials, balance_sheet)
+        for metric in history.columns:
+            assert_rows(rows(result, ticker, "ratios", metric), history[metric],
+                        label=lambda period: period.strftime("%Y-%m-%d"))
+        for label in GROWTH_LABELS:
+            series = get_growth_metrics.uncached(financials, cashflow, label)
+            assert_rows(rows(result, ticker, "growth", label), series)
+            assert_rows(rows(result, ticker, "growth", f"{label} Growth"), None if series is None else series.pct_change())
+        for metric, series in calculate_efficiency_metrics.uncached(cashflow, financials, balance_sheet).items():
+            if series is not None:
+                assert_rows(rows(result, ticker, "efficiency", metric), series)
+
+        # point-in-time sections have no period
+        for section, metrics in (("valuation", get_valuation_metrics(get_company_info(ticker))),
+                                 ("stock", calculate_stock_metrics.uncached(get_price_history(ticker)))):
+            for metric, data in metrics.items():
+                assert rows(result, ticker, section, metric).keys() == {None}
+                value = rows(result, ticker, section, metric)[None]
+                assert np.isnan(value) if data.value is None else value == pytest.approx(data.value, rel=1e-12)
+
+
+def test_unknown_section(provider):
+    with pytest.raises(ValueError, match="Unknown section 'charts'"):
+        section_rows(TickerSnapshot("AAA"), "charts")
+
+
+@pytest.mark.parametrize("fmt", cli.FORMATS)
+def test_write_results_round_trip(result, tmp_path, fmt):
+    path = str(tmp_path / f"results.{fmt}")
+    cli.write_results(result, path)
+    if fmt == "parquet":
+        written = pd.read_parquet(path)
+    elif fmt == "csv":
+        written = pd.read_csv(path, dtype={"period": object})
+    else:
+        written = pd.DataFrame(json.loads(open(path, encoding="utf-8").read()))
+
+    assert list(written.columns) == list(result.columns) and len(written) == len(result)
+    # periods are text, and missing ones stay missing rather than becoming dates
+    assert written["period"].isna().tolist() == result["period"].isna().tolist()
+    assert written["period"].dropna().tolist() == result["period"].dropna().tolist()
+    np.testing.assert_allclose(written["value"].to_numpy(dtype=float), result["value"].to_numpy(dtype=float),
+                               rtol=1e-12)
+
+
+def test_write_results_format(result, tmp_path, capsys):
+    # an unknown extension is written as JSON
+    path = tmp_path / "results.txt"
+    cli.write_results(result, str(path))
+    assert len(json.loads(path.read_text(encoding="utf-8"))) == len(result)
+
+    cli.write_results(result.head(3), fmt="csv")
+    assert capsys.readouterr().out.splitlines()[0] == "ticker,section,metric,period,value"
+
+    with pytest.raises(SystemExit, match="--output is required for parquet"):
+        cli.write_results(result, fmt="parquet")
+
+
+def test_cli_run(provider, tmp_path, capsys):
+    path = tmp_path / "results.csv"
+    assert cli.main(["AAA", "MISSING", "--sections", "ratios", "valuation", "-o", str(path)]) == 0
+    written = pd.read_csv(path)
+    assert set(written["ticker"]) == {"AAA"} and set(written["section"]) == {"ratios", "valuation"}
+    assert "skipped MISSING: info: ticker not found" in capsys.readouterr().err
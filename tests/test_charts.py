@@ -0,0 +1,44 @@
+"""
+tests/test_charts.py
+
+The price chart serializes its figure once (in st.plotly_chart) unless tracing asks for the payload size.
+"""
+
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from benchmarks.synthetic import price_bars
+from utils import trace
+from visuals import charts
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """(to_json calls, captions) of plot_stocks with Streamlit's output stubbed"""
+    serialized, captions = [], []
+    monkeypatch.setattr(go.Figure, "to_json", lambda self, *args, **kwargs: serialized.append(self) or "{}")
+    monkeypatch.setattr(charts.st, "plotly_chart", lambda *args, **kwargs: None)
+    monkeypatch.setattr(charts.st, "caption", captions.append)
+    yield serialized, captions
+    trace.disable()
+    trace.reset()
+
+
+def closes():
+    return pd.DataFrame({t: price_bars(t, "2024-12-31", start="2020-01-01")["Close"] for t in ("AAA", "BBB")})
+
+
+def test_payload_not_measured_by_default(rendered):
+    serialized, captions = rendered
+    charts.plot_stocks(closes(), "5y")
+    assert serialized == []
+    assert "downsampled" in captions[-1] and "KB" not in captions[-1]
+
+
+def test_payload_measured_while_tracing(rendered):
+    serialized, captions = rendered
+    trace.enable()
+    charts.plot_stocks(closes(), "5y")
+    assert len(serialized) == 1
+    assert "KB sent" in captions[-1]
@@ -0,0 +1,46 @@
+"""
+tests/test_correlation.py
+
+The correlation engine matches pandas, and memoized correlation_stats follows the prices
+rather than the ticker set and dates.
+"""
+
+import numpy as np
+import pandas as pd
+
+from analysis.correlation import correlation_matrix, covariance_matrix, correlation_stats, returns_matrix
+from benchmarks.horizon_metrics import synthetic_closes
+from utils.memo import set_fingerprint
+
+
+def test_matrices_match_pandas():
+    returns = returns_matrix(synthetic_closes(12, 1))
+    pd.testing.assert_frame_equal(correlation_matrix(returns), returns.corr(min_periods=20), atol=1e-12)
+    pd.testing.assert_frame_equal(covariance_matrix(returns), returns.cov(min_periods=20), atol=1e-12)
+
+
+def test_adjusted_prices_are_a_new_key():
+    closes = synthetic_closes(4, 1)
+    set_fingerprint(closes, "test:closes:v1")
+    before = correlation_stats(closes)
+
+    # same tickers and dates, one ticker back-adjusted for a dividend and refetched
+    adjusted = closes.copy()
+    adjusted.iloc[:100, 1] *= 0.5
+    set_fingerprint(adjusted, "test:closes:v2")
+    after = correlation_stats(adjusted)
+
+    pd.testing.assert_frame_equal(after["correlation"], correlation_matrix(returns_matrix(adjusted)))
+    assert not np.allclose(before["correlation"], after["correlation"])
+
+
+def test_callers_get_their_own_copy():
+    closes = synthetic_closes(4, 1)
+    set_fingerprint(closes, "test:closes:copy")
+    first = correlation_stats(closes)
+    first["returns"].iloc[:, :] = 0.0
+    first["correlation"].iloc[0, 1] = 5.0
+
+    second = correlation_stats(closes)
+    assert second["correlation"].iloc[0, 1] != 5.0
+    assert second["returns"].abs().sum().sum() > 0
@@ -0,0 +1,67 @@
+"""
+tests/test_formatter.py
+
+The vectorized table helpers style and format tables as the per-column and per-cell
+versions they replaced: highlight_df_bounds against tests/baseline_formatter.py, and
+format_large_numbers / style_large_numbers against format_large_number.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline_formatter
+from benchmarks.synthetic import comparison_tables
+from utils.formatter import format_large_number, format_large_numbers, highlight_df_bounds, style_large_numbers
+
+
+@pytest.fixture(scope="module")
+def tables():
+    margins, cash_flows, lower, upper = comparison_tables(300, 6, seed=3)
+    # values on a bound are within the range
+    margins.iloc[0], margins.iloc[1] = pd.Series(lower), pd.Series(upper)
+    return margins, cash_flows, lower, upper
+
+
+def rendered(styler):
+    return styler.set_uuid("test").to_html()
+
+
+@pytest.mark.parametrize("bounds", ["per column", "scalar", "partial", "lower only"])
+def test_highlight_matches_per_column_apply(tables, bounds):
+    margins, _, lower, upper = tables
+    if bounds == "scalar":
+        lower, upper = 0.0, 0.25
+        margins = margins.copy()
+        margins.iloc[0] = 0.0
+    elif bounds == "partial":
+        # columns without a bound, or with None, are not highlighted on that side
+        lower = {column: value for column, value in list(lower.items())[:3]}
+        upper = {**upper, margins.columns[0]: None}
+    elif bounds == "lower only":
+        upper = None
+
+    new = highlight_df_bounds(margins, lower, upper)
+    old = baseline_formatter.highlight_df_bounds(margins, lower, upper)
+    assert new._compute().ctx == old._compute().ctx
+    assert rendered(new.format("{:.2%}")) == rendered(old.format("{:.2%}"))
+
+
+def test_highlight_skips_non_numeric_columns(tables):
+    margins, _, lower, upper = tables
+    labeled = margins.assign(Note="x")
+    new = highlight_df_bounds(labeled, lower, upper, low_color="red", high_color="green")
+    old = baseline_formatter.highlight_df_bounds(labeled, lower, upper, low_color="red", high_color="green")
+    assert rendered(new) == rendered(old)
+
+
+def test_format_large_numbers_matches_format_large_number(tables):
+    _, cash_flows, _, _ = tables
+    edges = pd.DataFrame({"edge": [0.0, -1.0, 999.99, 999.999, 1_000.0, -1_000.0, 999_999.0, 1e6, 1e9, 1e12, -5e15]})
+    for frame in (cash_flows, edges, cash_flows.fillna(0).astype(np.int64)):
+        pd.testing.assert_frame_equal(format_large_numbers(frame), frame.map(format_large_number), check_dtype=False)
+
+
+def test_style_large_numbers_matches_per_cell_format(tables):
+    _, cash_flows, _, _ = tables
+    assert rendered(style_large_numbers(cash_flows)) == rendered(cash_flows.style.format(format_large_number))
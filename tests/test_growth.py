@@ -0,0 +1,99 @@
+"""
+tests/test_growth.py
+
+growth_panel gives the growth that get_growth_metrics + pct_change gave one label and ticker
+at a time, also for companies whose quarters end on different days, and the latest-growth
+and side-by-side tables keep each ticker's own periods.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.growth import (aligned_values, calculate_growth_series, get_growth_metrics, growth_panel,
+                             latest_growth)
+from benchmarks.synthetic import statement, quarterly_statement
+from data.line_items import normalize_statement, set_frequency
+from utils.constants import GROWTH_LABELS, REVENUE
+
+CAGR_YEARS = 3
+
+
+def annual(seed, years=6):
+    return tuple(normalize_statement(statement(n_rows=60, n_periods=years, seed=seed + k)) for k in range(2))
+
+
+def quarterly(seed, quarters=16, offsets=None):
+    frames = []
+    for k in range(2):
+        frame = quarterly_statement(n_rows=60, n_quarters=quarters, seed=seed + k)
+        if offsets is not None:
+            frame.columns = frame.columns + pd.to_timedelta(offsets, unit="D")
+        frames.append(set_frequency(normalize_statement(frame), "quarterly"))
+    return tuple(frames)
+
+
+def baseline(financials, cash_flows, label, lag):
+    """the per-label path: the item's series, growth against `lag` periods back, CAGR and acceleration"""
+    series = get_growth_metrics.uncached(financials, cash_flows, label)
+    growth = series.pct_change(lag)
+    base = series.shift(lag * CAGR_YEARS)
+    cagr = ((series / base) ** (1 / CAGR_YEARS) - 1).where((series > 0) & (base > 0))
+    return {"value": series, "growth": growth, "cagr": cagr, "acceleration": growth - growth.shift(lag)}
+
+
+def assert_matches_baseline(panel, ticker, statements, lag):
+    for label in GROWTH_LABELS:
+        expected = baseline(*statements, label, lag)
+        for measure, series in expected.items():
+            actual = panel[measure][(label, ticker)].dropna()
+            pd.testing.assert_series_equal(actual, series.dropna(), check_names=False, check_index_type=False,
+                                           check_freq=False, rtol=1e-12)
+
+
+def test_annual_panel_matches_per_label_growth():
+    statements = {"AAA": annual(0), "BBB": annual(10, years=4)}
+    panel = growth_panel.uncached(statements)
+    for ticker, frames in statements.items():
+        assert_matches_baseline(panel, ticker, frames, lag=1)
+    # the YoY series is the one the growth charts used
+    pd.testing.assert_series_equal(panel["growth"][(REVENUE, "AAA")].dropna(),
+                                   calculate_growth_series(get_growth_metrics.uncached(*statements["AAA"], REVENUE)),
+                                   check_names=False, check_index_type=False)
+
+
+def test_quarterly_panel_matches_per_label_growth():
+    statements = {"AAA": quarterly(0)}
+    assert_matches_baseline(growth_panel.uncached(statements), "AAA", statements["AAA"], lag=4)
+
+
+def test_staggered_quarter_ends():
+    # B's quarters end a day before or after A's (52/53-week fiscal calendars)
+    offsets = np.where(np.arange(16) % 2 == 0, 1, -1)
+    statements = {"A": quarterly(0), "B": quarterly(10, offsets=offsets)}
+    together = growth_panel.uncached(statements)
+    for ticker, frames in statements.items():
+        alone = growth_panel.uncached({ticker: frames})
+        assert_matches_baseline(together, ticker, frames, lag=4)
+        for measure in ("growth", "cagr", "acceleration"):
+            column = together[measure][(REVENUE, ticker)].dropna()
+            assert len(column) and column.equals(alone[measure][(REVENUE, ticker)].dropna())
+
+    # side by side on A's quarter ends, B's matched to the nearest
+    side_by_side = aligned_values(together, REVENUE, ["A", "B"])
+    assert len(side_by_side) == 16
+    np.testing.assert_array_equal(side_by_side["B"].to_numpy(), together["value"][(REVENUE, "B")].dropna().to_numpy())
+
+
+def test_latest_growth_shows_each_tickers_period():
+    offsets = np.zeros(16, dtype=int)
+    a, b = quarterly(0), quarterly(10, quarters=16, offsets=offsets)
+    # B hasn't reported the last quarter yet
+    b = tuple(frame.iloc[:, 1:] for frame in b)
+    panel = growth_panel.uncached({"A": a, "B": b})
+    latest = latest_growth(panel, REVENUE)
+
+    assert latest.at["A", "period"] == pd.Timestamp("2024-12-31")
+    assert latest.at["B", "period"] == pd.Timestamp("2024-09-30")
+    assert latest.at["B", "growth"] == panel["growth"].at[pd.Timestamp("2024-09-30"), (REVENUE, "B")]
+    assert latest.at["A", "growth"] == pytest.approx(panel["growth"][(REVENUE, "A")].iloc[-1])
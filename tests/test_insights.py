@@ -0,0 +1,49 @@
+"""
+tests/test_insights.py
+
+The insight rule table gives the messages of the if/elif ladders it replaced
+(tests/baseline_insights.py), one company at a time and for a whole screener table.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline_insights
+from analysis.insights import RULES, RATIO_RULES, VALUATION_RULES, insight_table, ratio_insights, valuation_insights
+from benchmarks.synthetic import screener_table
+from data.metric_data import MetricData
+
+
+def metric_dicts(table):
+    """one MetricData dict per company; missing values reach the functions as None, as from a provider"""
+    return [{m: MetricData(m, None if np.isnan(v) else v) for m, v in row.items()} for row in table.to_dict("records")]
+
+
+def boundary_values(metric):
+    """every breakpoint of a metric's rule, just either side of it, and values far outside"""
+    breakpoints = np.asarray(RULES[metric][1], dtype=float)
+    steps = np.maximum(np.abs(breakpoints) * 1e-9, 1e-12)
+    return np.concatenate([breakpoints, breakpoints - steps, breakpoints + steps,
+                           [breakpoints[0] - 1e12, -1.0, 0.0, breakpoints[-1] * 10 + 1]])
+
+
+@pytest.mark.parametrize("metric", RATIO_RULES + VALUATION_RULES)
+def test_rule_table_matches_ladder_at_breakpoints(metric):
+    for value in boundary_values(metric):
+        d = {metric: MetricData(metric, float(value))}
+        assert {**ratio_insights(d), **valuation_insights(d)} == \
+            {**baseline_insights.ratio_insights(d), **baseline_insights.valuation_insights(d)}, value
+
+
+def test_rule_table_matches_ladder_per_company():
+    for d in metric_dicts(screener_table(500, seed=1)):
+        assert ratio_insights(d) == baseline_insights.ratio_insights(d)
+        assert valuation_insights(d) == baseline_insights.valuation_insights(d)
+
+
+def test_insight_table_matches_ladder():
+    table = screener_table(500, seed=2)
+    expected = pd.DataFrame([{**baseline_insights.ratio_insights(d), **baseline_insights.valuation_insights(d)}
+                             for d in metric_dicts(table)], index=table.index).reindex(columns=table.columns)
+    pd.testing.assert_frame_equal(insight_table(table).fillna(""), expected.fillna(""))
@@ -0,0 +1,87 @@
+"""
+tests/test_line_items.py
+
+A normalized statement holds, under each canonical key, the row the old label-list lookup
+(get_value_by_label with the key's aliases) found, whatever order the aliases appear in,
+and labels outside the schema are reported rather than silently used.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import statement
+from data.fetcher import get_value_by_label
+from data.line_items import (LINE_ITEMS, extract_items, get_line_item, is_normalized, line_item_key,
+                             normalize_statement, period_item, period_values, set_frequency, unmapped_labels)
+
+
+def every_alias(seed=0, reverse=False):
+    """a statement reporting every alias of every item (plus filler rows), in shuffled or reversed order"""
+    rng = np.random.default_rng(seed)
+    labels = [label for aliases in LINE_ITEMS.values() for label in aliases]
+    labels += ["Other Line Item 1", "Other Line Item 2"]
+    labels = labels[::-1] if reverse else [labels[i] for i in rng.permutation(len(labels))]
+    columns = pd.to_datetime(["2024-12-31", "2023-12-31", "2022-12-31"])
+    return pd.DataFrame(rng.normal(size=(len(labels), 3)), index=labels, columns=columns)
+
+
+@pytest.mark.parametrize("frame", [every_alias(), every_alias(reverse=True), statement(n_rows=150, seed=3)],
+                         ids=["shuffled", "reversed", "one alias each"])
+def test_normalized_rows_match_label_lookup(frame):
+    normalized = normalize_statement(frame)
+    assert is_normalized(normalized) and not is_normalized(frame)
+    for key, aliases in LINE_ITEMS.items():
+        expected = get_value_by_label(frame, aliases)
+        actual = get_line_item(normalized, key)
+        if expected is None:
+            assert actual is None, key
+        else:
+            np.testing.assert_array_equal(actual.to_numpy(), expected.to_numpy(), err_msg=key)
+        # a raw statement is normalized on the way
+        assert (get_line_item(frame, key) is None) == (expected is None)
+
+
+def test_alias_preference():
+    frame = pd.DataFrame({"2024": [1.0, 2.0, 3.0, 4.0]},
+                         index=["Total Liabilities Net Minority Interest", "Total Liab", "Total Liabilities", "Cash"])
+    normalized = normalize_statement(frame)
+    assert normalized.loc["total_liabilities", "2024"] == 3.0
+    assert normalized.loc["cash_and_equivalents", "2024"] == 4.0
+    # a row already labelled with a canonical key wins over every alias
+    frame.loc["total_liabilities"] = 5.0
+    assert normalize_statement(frame).loc["total_liabilities", "2024"] == 5.0
+    assert line_item_key("Total Liab") == line_item_key("total_liabilities") == "total_liabilities"
+    assert line_item_key("Other Line Item 1") is None
+
+
+def test_unmapped_labels():
+    frame = every_alias()
+    assert sorted(unmapped_labels(frame)) == ["Other Line Item 1", "Other Line Item 2"]
+    assert "Other Line Item 1" not in normalize_statement(frame).index
+    assert unmapped_labels(normalize_statement(frame)) == [] and unmapped_labels(None) == []
+    # normalizing twice changes nothing
+    normalized = normalize_statement(frame)
+    assert normalize_statement(normalized) is normalized
+
+
+def test_extract_items():
+    frame = statement(n_rows=80, seed=5).astype(object)
+    frame.loc[get_value_by_label(frame, LINE_ITEMS["net_income"]).name, frame.columns[1]] = "n/a"
+    items = extract_items(frame, ["net_income", "total_revenue", "not_a_key"])
+    assert list(items.index) == list(frame.columns) and items.dtypes.eq(float).all()
+    assert np.isnan(items["net_income"].iloc[1]) and items["not_a_key"].isna().all()
+    np.testing.assert_array_equal(items["total_revenue"].to_numpy(),
+                                  get_value_by_label(frame, LINE_ITEMS["total_revenue"]).to_numpy(dtype=float))
+
+
+def test_period_values():
+    frame = normalize_statement(statement(n_rows=80, n_periods=3, seed=6))
+    periods, values = period_values(frame, "total_revenue")
+    assert periods.tolist() == [2024, 2023, 2022]
+    np.testing.assert_array_equal(values, frame.loc["total_revenue"].to_numpy(dtype=float))
+
+    quarterly = set_frequency(frame, "quarterly")
+    assert period_item(quarterly, "total_revenue").index[0] == np.datetime64("2024-12-31")
+    with pytest.raises(KeyError):
+        period_values(frame, "not_a_key")
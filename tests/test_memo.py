@@ -0,0 +1,100 @@
+"""
+tests/test_memo.py
+
+Memoized calls are keyed by a fetched frame's fingerprint when it has one and by its
+contents otherwise, so a cache hit never hands back a result for different data.
+"""
+
+import gc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.memo import (clear_memo, content_fingerprint, derive_fingerprint, get_fingerprint, make_key, memoize,
+                        set_fingerprint)
+
+calls = []
+
+
+@memoize
+def total(frame, scale=1):
+    calls.append(1)
+    return {"total": frame.to_numpy().sum() * scale, "rows": list(frame.index)}
+
+
+@pytest.fixture(autouse=True)
+def fresh():
+    clear_memo()
+    calls.clear()
+    yield
+    clear_memo()
+
+
+def frame(values=(1.0, 2.0, 3.0)):
+    return pd.DataFrame({"Close": list(values)}, index=pd.date_range("2024-01-01", periods=len(values)))
+
+
+def test_untagged_frames_are_keyed_by_contents():
+    assert make_key(total, (frame(),), {}) == make_key(total, (frame(),), {})
+    assert make_key(total, (frame(),), {}) != make_key(total, (frame((1.0, 2.0, 4.0)),), {})
+    # the index and column labels are part of the contents
+    assert make_key(total, (frame(),), {}) != make_key(total, (frame().rename(columns={"Close": "Open"}),), {})
+    assert make_key(total, (frame(),), {}) != make_key(total, (frame().shift(1, freq="D"),), {})
+
+
+def test_tagged_frames_are_keyed_by_fingerprint():
+    first, same_token, other_token = frame(), frame((9.0, 9.0, 9.0)), frame()
+    set_fingerprint(first, "AAA:history:abc")
+    set_fingerprint(same_token, "AAA:history:abc")
+    set_fingerprint(other_token, "AAA:history:def")
+    assert make_key(total, (first,), {}) == make_key(total, (same_token,), {})
+    assert make_key(total, (first,), {}) != make_key(total, (other_token,), {})
+    # a tagged frame doesn't collide with an untagged one of the same contents
+    assert make_key(total, (first,), {}) != make_key(total, (frame(),), {})
+
+
+def test_keys_include_function_and_arguments():
+    data = set_fingerprint(frame(), "AAA:history:abc")
+    assert make_key(total, (data,), {}) != make_key(total, (data,), {"scale": 2})
+    assert make_key(total, (data,), {}) != make_key(total.uncached, (data, 1), {})
+    assert make_key(total, (data,), {}) != make_key(content_fingerprint, (data,), {})
+
+
+def test_derived_fingerprints():
+    parent = set_fingerprint(frame(), "AAA:history:abc")
+    column = derive_fingerprint(parent["Close"], parent, "Close")
+    assert get_fingerprint(column) == "AAA:history:abc:Close"
+    # nothing is derived from an untagged parent
+    assert get_fingerprint(derive_fingerprint(frame()["Close"], frame(), "Close")) is None
+
+
+def test_fingerprint_is_forgotten_with_its_object():
+    data = set_fingerprint(frame(), "AAA:history:abc")
+    address = id(data)
+    del data
+    gc.collect()
+    # a new object at the same address isn't mistaken for the collected one
+    reused = [frame() for _ in range(100)]
+    assert all(get_fingerprint(obj) is None for obj in reused if id(obj) == address)
+    assert get_fingerprint(frame()) is None
+
+
+def test_memoize_hits_and_misses():
+    data = set_fingerprint(frame(), "AAA:history:abc")
+    assert total(data) == total(data) == {"total": 6.0, "rows": list(data.index)}
+    assert len(calls) == 1
+
+    refetched = set_fingerprint(frame((1.0, 2.0, 4.0)), "AAA:history:def")
+    assert total(refetched)["total"] == 7.0
+    assert total(data, scale=2)["total"] == 12.0
+    assert len(calls) == 3
+
+
+def test_memoize_returns_copies():
+    data = set_fingerprint(frame(), "AAA:history:abc")
+    result = total(data)
+    result["rows"].clear()
+    result["total"] = np.nan
+    assert total(data) == {"total": 6.0, "rows": list(data.index)}
+    assert len(calls) == 1
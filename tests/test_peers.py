@@ -0,0 +1,53 @@
+"""
+tests/test_peers.py
+
+Annual thresholds and peer bounds judge a quarter's ROE and asset turnover on the same
+footing as a year's: insights annualize the value, bounds are scaled to one quarter.
+"""
+
+import pandas as pd
+import pytest
+
+from analysis.insights import ratio_insights
+from analysis.peers import PeerIndex, company_bounds, set_peer_index
+from data.metric_data import MetricData
+from utils.constants import AT, CF_BOUNDS, CR, PM, ROE
+
+INFO = {"sector": "Technology", "industry": "Software"}
+
+
+@pytest.fixture
+def peers(tmp_path):
+    universe = pd.DataFrame({"Sector": "Technology", "Industry": "Software",
+                             ROE: [0.08, 0.12, 0.16, 0.20, 0.24], AT: [0.4, 0.6, 0.8, 1.0, 1.2],
+                             PM: [0.1, 0.15, 0.2, 0.25, 0.3]},
+                            index=pd.Index(["A", "B", "C", "D", "E"], name="Ticker"))
+    index = PeerIndex(str(tmp_path / "peers")).update(universe)
+    set_peer_index(index)
+    yield index
+    set_peer_index(None)
+
+
+def test_quarterly_bounds_are_a_quarter_of_annual(peers):
+    for metric in (ROE, AT):
+        lower, upper, group = company_bounds(metric, INFO)
+        quarterly = company_bounds(metric, INFO, frequency="quarterly")
+        assert quarterly[:2] == pytest.approx((lower / 4, upper / 4)) and quarterly[2] == group
+        assert company_bounds(metric, INFO, frequency="ttm") == (lower, upper, group)
+    # margins don't depend on the period's length
+    assert company_bounds(PM, INFO, frequency="quarterly") == company_bounds(PM, INFO)
+
+
+def test_quarterly_static_bounds_are_scaled(tmp_path):
+    set_peer_index(PeerIndex(str(tmp_path / "empty")))
+    lower, upper = CF_BOUNDS[AT]
+    assert company_bounds(AT, {}, CF_BOUNDS[AT], "quarterly") == (lower / 4, upper / 4, None)
+    assert company_bounds(AT, {}, None, "quarterly") == (None, None, None)
+    set_peer_index(None)
+
+
+def test_quarterly_ratio_insights_annualize_roe():
+    annual = {ROE: MetricData(ROE, 0.16), CR: MetricData(CR, 1.5)}
+    quarter = {ROE: MetricData(ROE, 0.04), CR: MetricData(CR, 1.5)}
+    assert ratio_insights(quarter, "quarterly") == ratio_insights(annual)
+    assert ratio_insights(quarter)[ROE] != ratio_insights(annual)[ROE]
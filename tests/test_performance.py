@@ -0,0 +1,90 @@
+"""
+tests/test_performance.py
+
+calculate_horizon_metrics gives, for every ticker and horizon, what calculate_stock_metrics
+gives on that ticker's bars from the horizon's start, including gaps in the data, tickers
+listed partway through a horizon and the YTD and 5Y windows, and _segment_drawdowns
+matches a running-max scan of each window.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.performance import (HORIZON_SLACK_DAYS, _horizon_start, _segment_drawdowns, calculate_horizon_metrics,
+                                  calculate_stock_metrics)
+from utils.constants import MAX_DRAWDOWN, SHARPE_RATIO, STOCK_HORIZONS, STOCK_LABELS, VOLATILITY
+
+END = pd.Timestamp("2024-06-14")
+
+
+def closes(n_tickers=12, years=6, seed=0):
+    """dates x tickers random walks with ~3% of bars missing, a month-long halt, a late listing and a flat price"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=END, periods=years * 261)
+    values = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, (len(dates), n_tickers)), axis=0))
+    values[rng.random(values.shape) < 0.03] = np.nan
+    frame = pd.DataFrame(values, index=dates, columns=[f"T{i:02d}" for i in range(n_tickers)])
+    frame.loc["2023-03-01":"2023-04-05", "T01"] = np.nan
+    frame.loc[:"2022-09-15", "T02"] = np.nan    # listed 21 months ago: no 3Y or 5Y metrics
+    frame.loc[:"2024-03-20", "T03"] = np.nan    # listed this year, inside the 6M and YTD windows
+    frame["T04"] = 20.0
+    return frame
+
+
+def per_window(frame):
+    """calculate_stock_metrics on each ticker's bars from each horizon's start"""
+    last = frame.index[-1]
+    rows = {}
+    for ticker in frame.columns:
+        bars = frame[[ticker]].rename(columns={ticker: "Close"}).dropna()
+        for horizon in STOCK_HORIZONS:
+            start = _horizon_start(last, horizon)
+            window = bars.loc[start:]
+            # a ticker listed after the horizon began has no value for it
+            if len(window) < 2 or bars.index[0] > start + pd.Timedelta(days=HORIZON_SLACK_DAYS):
+                rows[(ticker, horizon)] = [np.nan] * len(STOCK_LABELS)
+                continue
+            metrics = calculate_stock_metrics.uncached(window)
+            rows[(ticker, horizon)] = [np.nan if metrics[label].value is None else metrics[label].value
+                                       for label in STOCK_LABELS]
+    return pd.DataFrame.from_dict(rows, orient="index", columns=STOCK_LABELS)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_horizon_metrics_match_per_window(seed):
+    frame = closes(seed=seed)
+    table = calculate_horizon_metrics.uncached(frame)
+    expected = per_window(frame)
+    assert list(table.index) == list(expected.index)
+    np.testing.assert_allclose(table.to_numpy(), expected.to_numpy(dtype=float), rtol=1e-10, atol=1e-15,
+                               equal_nan=True)
+
+    assert table.loc[("T02", "3Y")].isna().all() and table.loc[("T02", "1Y")].notna().all()
+    assert table.loc[("T03", "6M")].isna().all() and table.loc[("T03", "1M")].notna().all()
+    # a flat price has no volatility, so no Sharpe ratio
+    flat = table.loc[("T04", "5Y")]
+    assert flat[VOLATILITY] == 0 and flat[MAX_DRAWDOWN] == 0 and np.isnan(flat[SHARPE_RATIO])
+    # the input is not modified
+    pd.testing.assert_frame_equal(frame, closes(seed=seed))
+
+
+def test_segment_drawdowns_match_running_max():
+    rng = np.random.default_rng(7)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.03, (400, 6)), axis=0))
+    close[rng.random(close.shape) < 0.05] = np.nan
+    close[:150, 2] = np.nan
+    close[:, 3] = np.nan
+    # window starts with single-row segments between some of them
+    bounds = [0, 37, 38, 149, 150, 151, 260, 399]
+    drawdowns = _segment_drawdowns(close, bounds)
+
+    for k, start in enumerate(bounds):
+        for column in range(close.shape[1]):
+            window = close[start:, column]
+            window = window[~np.isnan(window)]
+            if len(window) == 0:
+                assert np.isnan(drawdowns[k, column])
+            else:
+                expected = np.min(window / np.maximum.accumulate(window) - 1)
+                assert drawdowns[k, column] == pytest.approx(expected, rel=1e-10, abs=1e-15), (start, column)
@@ -0,0 +1,107 @@
+"""
+tests/test_periods.py
+
+trailing_twelve_months gives, for every quarter end, what adding up the four quarters
+ending there one at a time gives, only over four consecutive quarters, and combines the
+ROLLUPS items by mean, first or last instead of summing them.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.line_items import normalize_statement, set_frequency
+from data.periods import QUARTER_DAYS, ROLLUPS, at_frequency, statement_kind, trailing_twelve_months
+
+ITEMS = ["total_revenue", "net_income", "diluted_average_shares", "basic_average_shares",
+         "beginning_cash_position", "end_cash_position"]
+
+
+def quarterly(ends, seed=0):
+    """a normalized quarterly statement over the given quarter ends, most recent first"""
+    ends = pd.DatetimeIndex(sorted(pd.to_datetime(ends), reverse=True))
+    values = np.random.default_rng(seed).uniform(1, 100, (len(ITEMS), len(ends)))
+    frame = pd.DataFrame(values, index=pd.Index(ITEMS, name="line_item"), columns=ends)
+    return set_frequency(normalize_statement(frame), "quarterly")
+
+
+def baseline(statement):
+    """one quarter end at a time: the four quarters ending there, if they are consecutive"""
+    columns = sorted(statement.columns)
+    result = {}
+    for i in range(3, len(columns)):
+        window = columns[i - 3:i + 1]
+        gaps = [(b - a).days for a, b in zip(window, window[1:])]
+        if not all(QUARTER_DAYS[0] <= gap <= QUARTER_DAYS[1] for gap in gaps):
+            continue
+        quarters = statement[window]
+        column = quarters.sum(axis=1, skipna=False)
+        for key, how in ROLLUPS.items():
+            column[key] = {"mean": quarters.loc[key].mean(skipna=False), "first": quarters.loc[key].iloc[0],
+                           "last": quarters.loc[key].iloc[-1]}[how]
+        result[window[-1]] = column
+    return pd.DataFrame(result)[sorted(result, reverse=True)] if result else None
+
+
+def assert_matches_baseline(statement):
+    ttm = trailing_twelve_months.uncached(statement)
+    expected = baseline(statement)
+    assert ttm.columns.name == "ttm"
+    if expected is None:
+        assert ttm.shape[1] == 0
+        return ttm
+    assert list(ttm.columns) == list(expected.columns)
+    np.testing.assert_allclose(ttm.to_numpy(), expected.to_numpy(), rtol=1e-12)
+    return ttm
+
+
+def test_consecutive_quarters():
+    ttm = assert_matches_baseline(quarterly(pd.date_range(end="2024-12-31", periods=10, freq="QE")))
+    assert ttm.shape[1] == 7 and ttm.columns[0] == pd.Timestamp("2024-12-31")
+
+
+def test_missing_quarter():
+    ends = pd.date_range(end="2024-12-31", periods=10, freq="QE").delete(4)
+    ttm = assert_matches_baseline(quarterly(ends, seed=1))
+    # no window reaches across the missing quarter
+    assert list(ttm.columns) == [pd.Timestamp("2024-12-31"), pd.Timestamp("2024-09-30"), pd.Timestamp("2023-06-30")]
+
+
+@pytest.mark.parametrize("gap, kept", [(QUARTER_DAYS[0], True), (QUARTER_DAYS[1], True),
+                                       (QUARTER_DAYS[0] - 1, False), (QUARTER_DAYS[1] + 1, False)])
+def test_quarter_gap_bounds(gap, kept):
+    ends = [pd.Timestamp("2024-01-01") + pd.Timedelta(days=91 * i) for i in range(3)]
+    ends.append(ends[-1] + pd.Timedelta(days=gap))
+    ttm = assert_matches_baseline(quarterly(ends, seed=2))
+    assert ttm.shape[1] == int(kept)
+
+
+def test_rollups_and_missing_values():
+    statement = quarterly(pd.date_range(end="2024-12-31", periods=6, freq="QE"), seed=3)
+    statement.iloc[1, 2] = np.nan
+    ttm = assert_matches_baseline(statement)
+    latest = statement.iloc[:, :4]
+    assert ttm.at["diluted_average_shares", ttm.columns[0]] == pytest.approx(latest.loc["diluted_average_shares"].mean())
+    assert ttm.at["beginning_cash_position", ttm.columns[0]] == latest.at["beginning_cash_position", latest.columns[-1]]
+    assert ttm.at["end_cash_position", ttm.columns[0]] == latest.at["end_cash_position", latest.columns[0]]
+    # a missing quarter leaves no short sum
+    assert ttm.loc["net_income"].isna().sum() == 3
+
+
+def test_fewer_than_four_quarters():
+    assert_matches_baseline(quarterly(pd.date_range(end="2024-12-31", periods=3, freq="QE")))
+
+
+def test_at_frequency():
+    statement = quarterly(pd.date_range(end="2024-12-31", periods=5, freq="QE"))
+    assert at_frequency(statement, "financials", "ttm").shape[1] == 2
+    # balance sheets are point-in-time values, not rolled up
+    balance_sheet = at_frequency(statement, "balance_sheet", "ttm")
+    assert balance_sheet.columns.name == "ttm" and balance_sheet.equals(statement)
+    assert at_frequency(statement, "cashflow", "quarterly").columns.name == "quarterly"
+    assert at_frequency(None, "cashflow", "ttm") is None
+
+    assert statement_kind("cashflow", "annual") == "cashflow"
+    assert statement_kind("cashflow", "ttm") == "quarterly_cashflow"
+    with pytest.raises(ValueError, match="Unknown statement frequency 'monthly'"):
+        statement_kind("cashflow", "monthly")
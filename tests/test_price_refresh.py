@@ -0,0 +1,72 @@
+"""
+tests/test_price_refresh.py
+
+An incrementally refreshed price history (yesterday's stored bars plus today's) is the
+history a full download returns today, including after a dividend back-adjusts it.
+"""
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import SimulatedProvider
+from data.cache import DataCache, set_cache
+from data.fetcher import get_price_history, get_price_histories
+from data.providers import set_provider
+
+TICKERS = ["AAA", "BBB", "CCC"]
+
+TODAY = pd.Timestamp.now().normalize()
+YESTERDAY = TODAY - pd.offsets.BDay(1)
+
+
+@pytest.fixture
+def refresh(tmp_path):
+    """fetch with a cache seeded yesterday (its entries already expired) through a provider as of today"""
+    def fetch(dividends=None):
+        set_cache(DataCache(str(tmp_path / "refreshed"), ttls={"history": 0}))
+        set_provider(SimulatedProvider(YESTERDAY))
+        get_price_histories(TICKERS, period="1y")
+        get_price_history(TICKERS[0], period="1y")
+
+        provider = SimulatedProvider(TODAY, dividends)
+        set_provider(provider)
+        return get_price_histories(TICKERS, period="1y"), get_price_history(TICKERS[0], period="1y"), provider
+
+    def download(dividends=None):
+        set_cache(DataCache(str(tmp_path / "downloaded")))
+        provider = SimulatedProvider(TODAY, dividends)
+        set_provider(provider)
+        return get_price_histories(TICKERS, period="1y"), get_price_history(TICKERS[0], period="1y"), provider
+
+    yield fetch, download
+    set_cache(None)
+    set_provider(None)
+
+
+def assert_same_bars(refreshed, downloaded):
+    pd.testing.assert_frame_equal(refreshed, downloaded, check_freq=False)
+
+
+def test_refresh_appends_only_new_bars(refresh):
+    fetch, download = refresh
+    histories, history, incremental = fetch()
+    expected_histories, expected_history, full = download()
+
+    assert_same_bars(histories, expected_histories)
+    assert_same_bars(history, expected_history)
+    # one bulk request extends every ticker from its anchor bar, and a second one the single history
+    assert incremental.requests == 2
+    assert incremental.bytes * 20 < full.bytes
+
+
+def test_refresh_after_dividend_pulls_the_adjusted_history(refresh):
+    fetch, download = refresh
+    dividends = {TICKERS[0]: [(pd.offsets.BDay(0).rollback(TODAY), 0.25)]}
+    histories, history, incremental = fetch(dividends)
+    expected_histories, expected_history, _ = download(dividends)
+
+    assert_same_bars(histories, expected_histories)
+    assert_same_bars(history, expected_history)
+    # the adjusted ticker's stored bars no longer match, so its whole window is downloaded again
+    assert histories[("Close", TICKERS[0])].iloc[0] < SimulatedProvider(YESTERDAY).price_history(TICKERS[0])["Close"].iloc[0]
+    assert incremental.requests == 4
@@ -0,0 +1,129 @@
+"""
+tests/test_price_store.py
+
+The stock view's closes come from the price store when it is current, matching what a
+download returns, and from get_price_histories otherwise.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import SimulatedProvider, price_bars
+from data.cache import DataCache, set_cache
+from data.fetcher import get_closes, get_price_histories, select_field, update_price_store
+from data.price_store import PriceStore, get_price_store, set_price_store
+from data.providers import LocalProvider, set_provider
+from utils.memo import get_fingerprint
+
+TICKERS = ["AAA", "BBB", "CCC"]
+
+# the simulated provider's last bar; the store is current on the next business day
+LAST_BAR = "2024-12-31"
+
+
+@pytest.fixture
+def provider(tmp_path):
+    provider = SimulatedProvider(LAST_BAR)
+    set_cache(DataCache(directory=str(tmp_path / "cache")))
+    set_provider(provider)
+    yield provider
+    set_cache(None)
+    set_provider(None)
+    set_price_store(None)
+
+
+@pytest.fixture
+def store(tmp_path, provider):
+    return update_price_store(TICKERS, "max", store=PriceStore(str(tmp_path / "prices")))
+
+
+def test_current_store_serves_closes_without_downloading(store):
+    downloaded = select_field(get_price_histories(TICKERS, period="max"))
+
+    closes = get_closes(TICKERS, period="max", store=store, today="2025-01-01")
+    assert get_fingerprint(closes).startswith("store:")
+    pd.testing.assert_frame_equal(closes, downloaded, check_names=False, check_freq=False)
+
+
+def test_store_closes_skip_exchange_holidays(store):
+    # a day no ticker traded is on the store's business-day axis but not in a download
+    store.write(pd.concat({"Close": pd.DataFrame({t: [np.nan] for t in TICKERS}, index=pd.to_datetime(["2024-12-25"]))},
+                          axis=1, names=["Price", "Ticker"]))
+    closes = get_closes(TICKERS, period="max", store=store, today="2025-01-01")
+    assert pd.Timestamp("2024-12-25") not in closes.index
+    assert closes.notna().any(axis=1).all()
+
+
+def test_adjacent_tickers_are_views_of_the_store(store):
+    view = store.field("Close", tickers=["BBB", "CCC"])
+    assert np.shares_memory(view, store.field("Close"))
+    assert np.shares_memory(store.frame(["BBB", "CCC"]).to_numpy(), view)
+    # rows out of storage order are copied
+    np.testing.assert_array_equal(store.field("Close", tickers=["CCC", "AAA"])[1], store.series("AAA"))
+
+
+def test_stale_or_partial_store_falls_back_to_download(store):
+    stale = get_closes(TICKERS, period="max", store=store, today="2025-01-10")
+    assert not get_fingerprint(stale).startswith("store:")
+
+    partial = get_closes(TICKERS + ["DDD"], period="max", store=store, today="2025-01-01")
+    assert not get_fingerprint(partial).startswith("store:")
+    assert list(partial.columns) == TICKERS + ["DDD"]
+
+
+def test_shared_store_reopens_after_another_writer(tmp_path, provider):
+    directory = str(tmp_path / "shared")
+    set_price_store(PriceStore(directory))
+    opened = get_price_store()
+    assert len(opened) == 0
+
+    update_price_store(TICKERS, "max", store=PriceStore(directory))
+    assert get_price_store() is not opened
+    assert get_price_store().tickers == TICKERS
+
+
+def listed_early(ticker, start):
+    """a get_price_histories frame for one ticker whose bars begin before the store's first day"""
+    return pd.concat({ticker: price_bars(ticker, LAST_BAR, start=start)}, axis=1, names=["Ticker", "Price"]) \
+        .swaplevel(axis=1)
+
+
+def test_growing_the_arrays_leaves_the_open_store_consistent(store, monkeypatch):
+    directory = store.directory
+    before = PriceStore(directory).frame(TICKERS)
+
+    # a ticker with earlier bars moves the whole axis; the write fails before meta.json is replaced
+    def fail():
+        raise OSError("disk full")
+    monkeypatch.setattr(store, "_write_meta", fail)
+    with pytest.raises(OSError):
+        store.write(listed_early("EEE", "2011-06-01"))
+    pd.testing.assert_frame_equal(PriceStore(directory).frame(TICKERS), before)
+    monkeypatch.undo()
+
+    # a reader that opened the store before a successful write keeps reading the old arrays
+    reader = PriceStore(directory)
+    writer = PriceStore(directory)
+    writer.write(listed_early("EEE", "2011-06-01"))
+    pd.testing.assert_frame_equal(reader.frame(TICKERS), before)
+    reopened = PriceStore(directory)
+    assert reopened.tickers == TICKERS + ["EEE"] and reopened.dates[0] < before.index[0]
+    pd.testing.assert_frame_equal(reopened.frame(TICKERS, start=before.index[0]), before, check_freq=False)
+
+    # only the arrays of the current and the previous meta.json are kept
+    writer.write(listed_early("FFF", "2010-06-01"))
+    on_disk = {name for name in os.listdir(directory) if name.endswith(".npy")}
+    assert on_disk == set(writer.files.values()) | set(reopened.files.values())
+    assert not on_disk & set(reader.files.values())
+
+
+def test_closes_without_any_bars_are_empty(tmp_path):
+    set_provider(LocalProvider(str(tmp_path / "no-fixtures")))
+    try:
+        closes = get_closes(["AAA"], period="1y", store=PriceStore(str(tmp_path / "prices")))
+    finally:
+        set_provider(None)
+    assert closes.empty and "AAA" not in closes
@@ -0,0 +1,73 @@
+"""
+tests/test_providers.py
+
+Record mode captures fixtures (statements, info and whole price histories) even when the
+persistent cache is warm, and LocalProvider replays them.
+"""
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import SimulatedProvider, statement
+from data.cache import DataCache, set_cache
+from data.fetcher import (get_company_info, get_statement, get_price_history, get_price_histories,
+                          get_request_counts, reset_request_counts)
+from data.providers import LocalProvider, RecordingProvider, set_provider
+
+TICKERS = ["AAA", "BBB"]
+
+
+class LiveProvider(SimulatedProvider):
+    """a remote provider serving synthetic info and statements as well as prices"""
+
+    def info(self, ticker):
+        return {"shortName": f"{ticker} Corp", "regularMarketPrice": 10.0 + len(ticker)}
+
+    def statement(self, ticker, kind):
+        return statement(n_rows=40, seed=sum(map(ord, ticker + kind)))
+
+
+@pytest.fixture
+def warm_cache(tmp_path):
+    """a scratch cache already holding every ticker's info and statements from a live run"""
+    set_cache(DataCache(directory=str(tmp_path / "cache")))
+    set_provider(LiveProvider("2024-12-31"))
+    for ticker in TICKERS:
+        get_company_info(ticker)
+        get_statement(ticker, "financials")
+    reset_request_counts()
+    yield tmp_path
+    set_cache(None)
+    set_provider(None)
+
+
+def test_record_with_warm_cache_then_replay(warm_cache):
+    fixtures = str(warm_cache / "fixtures")
+    live = LiveProvider("2024-12-31")
+
+    set_provider(RecordingProvider(live, root=fixtures))
+    recorded = {ticker: (get_company_info(ticker), get_statement(ticker, "financials")) for ticker in TICKERS}
+    # every call reached the live provider instead of being answered by the warm cache
+    assert get_request_counts() == {"info": 2, "financials": 2}
+
+    set_provider(LocalProvider(fixtures))
+    for ticker, (info, financials) in recorded.items():
+        assert get_company_info(ticker) == info
+        pd.testing.assert_frame_equal(get_statement(ticker, "financials"), financials, check_freq=False)
+
+
+def test_record_prices_with_warm_incremental_store(warm_cache):
+    # the warm cache holds incrementally refreshed bars, which a cached provider would only extend with start= requests
+    fixtures = str(warm_cache / "fixtures")
+    set_provider(LiveProvider("2024-12-31"))
+    get_price_histories(TICKERS, period="1y")
+
+    set_provider(RecordingProvider(LiveProvider("2025-01-03"), root=fixtures))
+    single = get_price_history("AAA", period="1y")
+    bulk = get_price_histories(TICKERS, period="1y")
+
+    set_provider(LocalProvider(fixtures))
+    pd.testing.assert_frame_equal(get_price_history("AAA", period="1y"), single, check_freq=False)
+    replayed = get_price_histories(TICKERS, period="1y")
+    pd.testing.assert_frame_equal(replayed, bulk, check_freq=False)
+    assert replayed.index[-1] == pd.Timestamp("2025-01-03")
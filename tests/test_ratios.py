@@ -0,0 +1,77 @@
+"""
+tests/test_ratios.py
+
+ratio_history gives, for every period, the ratios the per-label functions in
+baseline_ratios.py computed for the most recent one, and calculate_ratios keeps their
+current values and deltas, with and without a reported total for liabilities.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline_ratios
+from analysis.ratios import calculate_ratios, ratio_history
+from utils.constants import DE, RATIO_LABELS
+
+PERIODS = pd.to_datetime(["2024-12-31", "2023-12-31", "2022-12-31", "2021-12-31"])
+
+
+def frame(rows, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.uniform(1e8, 5e9, (len(rows), len(PERIODS))), index=rows, columns=PERIODS)
+
+
+def statements(total_liabilities=True, aliases=False, inventory=True, seed=0):
+    financials = frame(["Revenue" if aliases else "Total Revenue", "Net Income", "Gross Profit"], seed)
+    rows = ["Total Stockholders Equity" if aliases else "Stockholders Equity",
+            "Current Assets" if aliases else "Total Current Assets",
+            "Current Liabilities", "Total Non Current Liabilities Net Minority Interest", "Cash"]
+    rows += ["Total Liabilities"] * total_liabilities + ["Inventory"] * inventory
+    return financials, frame(rows, seed + 1)
+
+
+CASES = {
+    "reported total": statements(),
+    "liabilities fallback": statements(total_liabilities=False, seed=2),
+    "aliases": statements(aliases=True, seed=4),
+    "no inventory": statements(inventory=False, seed=6),
+}
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_history_matches_per_label_ratios(case):
+    financials, balance_sheet = CASES[case]
+    history = ratio_history(financials, balance_sheet)
+    assert list(history.index) == list(PERIODS)
+    # each period's row is what the old functions gave with that period as the most recent one
+    for k in range(len(PERIODS) - 1):
+        expected = baseline_ratios.calculate_ratios(financials.iloc[:, k:], balance_sheet.iloc[:, k:])
+        for label in RATIO_LABELS:
+            value = history[label].iloc[k]
+            if expected[label] is None or expected[label].value is None:
+                assert np.isnan(value), (case, label, k)
+            else:
+                assert value == pytest.approx(expected[label].value, rel=1e-12), (case, label, k)
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_metrics_match_per_label_ratios(case):
+    expected = baseline_ratios.calculate_ratios(*CASES[case])
+    metrics = calculate_ratios.uncached(*CASES[case])
+    for label in RATIO_LABELS:
+        if expected[label] is None or expected[label].value is None:
+            assert metrics[label].value is None
+            continue
+        assert metrics[label].value == pytest.approx(expected[label].value, rel=1e-12)
+        assert metrics[label].delta == pytest.approx(expected[label].delta, rel=1e-9)
+        assert metrics[label].fmt == expected[label].fmt
+
+
+def test_liabilities_fallback():
+    financials, balance_sheet = CASES["liabilities fallback"]
+    history = ratio_history(financials, balance_sheet)
+    liabilities = (balance_sheet.loc["Current Liabilities"]
+                   + balance_sheet.loc["Total Non Current Liabilities Net Minority Interest"])
+    np.testing.assert_allclose(history[DE].to_numpy(),
+                               (liabilities / balance_sheet.loc["Stockholders Equity"]).to_numpy(), rtol=1e-12)
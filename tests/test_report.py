@@ -0,0 +1,65 @@
+"""
+tests/test_report.py
+
+Batch reports render for every ticker of a synthetic coverage pack. PDF reports need the
+optional extras in requirements-pdf.txt: without them the export fails before any fetching,
+and with them each report is a PDF.
+"""
+
+import importlib.util
+import os
+
+import pytest
+
+from benchmarks.reports import synthetic_inputs
+from benchmarks.synthetic import quarterly_statement
+from data.line_items import normalize_statement, set_frequency
+from data.statement_store import CompactStatement
+from visuals import report
+
+TICKERS = ["AAA", "BBB"]
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    return synthetic_inputs(TICKERS)
+
+
+def test_html_reports(inputs, tmp_path):
+    paths, failed = report.render_reports(inputs, str(tmp_path), workers=1)
+    assert failed == {} and sorted(paths) == TICKERS
+    assert os.path.exists(tmp_path / report.PLOTLY_JS)
+    html = (tmp_path / "AAA.html").read_text(encoding="utf-8")
+    for title in ("Core Financial Ratios", "Growth Metrics", "Valuation Metrics", "Stock Performance Metrics",
+                  "Cash Flow &amp; Efficiency"):
+        assert title in html
+    assert "AAA Corp" in html and report.PLOTLY_JS in html
+
+
+def test_quarterly_report(inputs):
+    statements = [CompactStatement.from_frame(set_frequency(normalize_statement(quarterly_statement(seed=k)), "quarterly"))
+                  for k in range(3)]
+    data = {**inputs["AAA"], **dict(zip(("financials", "balance_sheet", "cashflow"), statements))}
+    html = report.ticker_report("AAA", data, frequency="quarterly")
+    assert "Quarterly statements" in html and "Period End" in html and "2024-12-31" in html
+
+
+def test_pdf_without_extras_fails_before_fetching(monkeypatch, tmp_path):
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name, *args: None)
+    monkeypatch.setattr(report, "load_report_inputs", lambda *args: pytest.fail("fetched without the PDF extras"))
+    with pytest.raises(RuntimeError, match="weasyprint and kaleido: pip install -r requirements-pdf.txt"):
+        report.export_reports(TICKERS, str(tmp_path), fmt="pdf")
+
+
+def test_unknown_format(tmp_path, inputs):
+    with pytest.raises(ValueError, match="Unknown report format 'docx'"):
+        report.render_reports(inputs, str(tmp_path), fmt="docx")
+
+
+def test_pdf_reports(inputs, tmp_path):
+    pytest.importorskip("weasyprint")
+    pytest.importorskip("kaleido")
+    paths, failed = report.render_reports({"AAA": inputs["AAA"]}, str(tmp_path), fmt="pdf", workers=1)
+    assert failed == {}
+    with open(paths["AAA"], "rb") as f:
+        assert f.read(5) == b"%PDF-"
@@ -0,0 +1,49 @@
+"""
+tests/test_scheduler.py
+
+prefetch deadlines: a slow ticker is reported without failing the tickers queued behind it.
+"""
+
+import time
+
+from data.scheduler import prefetch
+
+
+class SlowSnapshot:
+    """stands in for a TickerSnapshot whose fields take `delay` seconds to load"""
+
+    def __init__(self, ticker, delay=0.0, error=None):
+        self.ticker = ticker
+        self.delay = delay
+        self.error = error
+
+    @property
+    def info(self):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"regularMarketPrice": 1.0}
+
+
+def test_all_tickers_load():
+    assert prefetch([SlowSnapshot("AAA"), SlowSnapshot("BBB")], ["info"], max_workers=2, timeout=1) == {}
+
+
+def test_slow_ticker_times_out():
+    failed = prefetch([SlowSnapshot("SLOW", delay=0.5), SlowSnapshot("FAST")], ["info"], max_workers=2, timeout=0.1)
+    assert list(failed) == ["SLOW"]
+    assert "timed out" in failed["SLOW"]
+
+
+def test_queued_tickers_keep_their_deadline():
+    # one worker: the healthy tickers only start once the slow one has been given up on,
+    # and are not charged for the time they spent queued
+    snapshots = [SlowSnapshot("SLOW", delay=0.3)] + [SlowSnapshot(f"T{i}", delay=0.05) for i in range(4)]
+    failed = prefetch(snapshots, ["info"], max_workers=1, timeout=0.2)
+    assert list(failed) == ["SLOW"]
+
+
+def test_errors_are_reported():
+    failed = prefetch([SlowSnapshot("BAD", error=ValueError("no data")), SlowSnapshot("OK")], ["info"],
+                      max_workers=2, timeout=1)
+    assert failed == {"BAD": "info: no data"}
@@ -0,0 +1,118 @@
+"""
+tests/test_screener.py
+
+Filters parse into (column, operator, value), screen() answers them as a pandas boolean
+mask would, and each row of a built universe holds the latest metrics the per-ticker
+views compute.
+"""
+
+import operator
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.performance import calculate_efficiency_metrics, calculate_stock_metrics
+from analysis.ratios import calculate_ratios
+from analysis.screener import build_universe, load_universe, parse_filter, save_universe, screen
+from analysis.valuation import get_valuation_metrics
+from benchmarks.synthetic import SimulatedProvider, screener_table, statement
+from data.cache import DataCache, set_cache
+from data.fetcher import get_company_info, get_price_history, get_statement
+from data.providers import set_provider
+from utils.constants import CF_LABELS, DE, FCF_MARGIN, MARKET_CAP, PM
+
+TICKERS = ["AAA", "BBB", "CCC"]
+
+
+class LiveProvider(SimulatedProvider):
+    """a remote provider serving synthetic info and statements as well as prices; MISSING isn't listed"""
+
+    def info(self, ticker):
+        if ticker == "MISSING":
+            raise LookupError("ticker not found")
+        return {"shortName": f"{ticker} Corp", "sector": "Technology", "trailingPE": 10.0 + len(ticker),
+                "priceToBook": 2.5, "marketCap": 1e9 * sum(map(ord, ticker)), "enterpriseToEbitda": 12.0}
+
+    def statement(self, ticker, kind):
+        return statement(n_rows=40, seed=sum(map(ord, ticker + kind)))
+
+
+@pytest.fixture
+def provider(tmp_path):
+    set_cache(DataCache(directory=str(tmp_path / "cache")))
+    # prices run up to today, as periods like "1y" are counted back from it
+    set_provider(LiveProvider(pd.Timestamp.today().normalize()))
+    yield
+    set_cache(None)
+    set_provider(None)
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("FCF Margin > 15%", ("FCF Margin", operator.gt, 0.15)),
+    ("Market Cap >= 2B", ("Market Cap", operator.ge, 2e9)),
+    ("Debt-to-Equity Ratio<0.5", ("Debt-to-Equity Ratio", operator.lt, 0.5)),
+    ("  P/B <= 1.5e1 ", ("P/B", operator.le, 15.0)),
+    ("Revenue != -3k", ("Revenue", operator.ne, -3000.0)),
+    ("Current Ratio == 2", ("Current Ratio", operator.eq, 2.0)),
+])
+def test_parse_filter(expression, expected):
+    column, op, value = parse_filter(expression)
+    assert (column, op) == expected[:2] and value == pytest.approx(expected[2])
+
+
+@pytest.mark.parametrize("expression", ["FCF Margin", "FCF Margin > high", "> 5"])
+def test_parse_filter_rejects(expression):
+    with pytest.raises(ValueError, match="Invalid filter"):
+        parse_filter(expression)
+
+
+def test_screen_matches_boolean_mask():
+    table = screener_table(500, seed=3)
+    result = screen(table, [f"{PM} > 10%", f"{DE} < 2", (MARKET_CAP, operator.ge, 1e9)], sort_by=PM, top_n=25)
+
+    # missing values never pass a filter
+    expected = table[(table[PM] > 0.1) & (table[DE] < 2) & (table[MARKET_CAP] >= 1e9)]
+    pd.testing.assert_frame_equal(result, expected.sort_values(PM, ascending=False).head(25))
+    assert result[[PM, DE, MARKET_CAP]].notna().all().all()
+
+    # unfiltered, missing values sort last either way
+    for ascending in (True, False):
+        ordered = screen(table, sort_by=DE, ascending=ascending)
+        assert len(ordered) == len(table) and ordered[DE].iloc[-table[DE].isna().sum():].isna().all()
+        assert ordered[DE].dropna().is_monotonic_increasing == ascending
+
+
+def test_screen_unknown_column():
+    with pytest.raises(KeyError, match="Unknown screener column 'Nope'"):
+        screen(screener_table(10), ["Nope > 1"])
+
+
+def test_universe_rows_match_per_ticker_metrics(provider, tmp_path):
+    table = build_universe(TICKERS + ["MISSING"])
+    assert list(table.index) == TICKERS and list(table.attrs["failed"]) == ["MISSING"]
+
+    for ticker in TICKERS:
+        row = table.loc[ticker]
+        financials, balance_sheet, cashflow = (get_statement(ticker, kind)
+                                               for kind in ("financials", "balance_sheet", "cashflow"))
+        expected = {label: metric.value for label, metric in calculate_ratios.uncached(financials, balance_sheet).items()}
+        efficiency = calculate_efficiency_metrics.uncached(cashflow, financials, balance_sheet)
+        expected.update({label: efficiency[label].dropna().iloc[-1] if efficiency[label] is not None else None
+                         for label in CF_LABELS})
+        expected.update({label: metric.value for label, metric in get_valuation_metrics(get_company_info(ticker)).items()})
+        expected.update({label: metric.value
+                         for label, metric in calculate_stock_metrics.uncached(get_price_history(ticker)).items()})
+
+        assert row["Name"] == f"{ticker} Corp"
+        for label, value in expected.items():
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                assert np.isnan(row[label]), (ticker, label)
+            else:
+                assert row[label] == pytest.approx(value, rel=1e-9), (ticker, label)
+
+    path = tmp_path / "universe.parquet"
+    save_universe(table, path)
+    loaded = load_universe(path)
+    pd.testing.assert_frame_equal(loaded, table)
+    assert list(screen(loaded, [f"{FCF_MARGIN} > -1000%"]).index) == list(table[table[FCF_MARGIN] > -10].index)
@@ -0,0 +1,63 @@
+"""
+tests/test_snapshot.py
+
+A TickerSnapshot field is fetched once even when a prefetch worker that was given up on
+and the page asking for the same field reach it at the same time.
+"""
+
+import threading
+import time
+
+import pytest
+
+from data.cache import DataCache, set_cache
+from data.providers import set_provider
+from data.scheduler import prefetch
+from data.snapshot import TickerSnapshot
+
+
+class SlowProvider:
+    """serves company info after `delay` seconds, counting the requests"""
+
+    name = "slow"
+    remote = True
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def info(self, ticker):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return {"shortName": f"{ticker} Corp", "regularMarketPrice": 10.0}
+
+
+@pytest.fixture
+def provider(tmp_path):
+    set_cache(DataCache(directory=str(tmp_path / "cache")))
+    provider = SlowProvider(delay=0.3)
+    set_provider(provider)
+    yield provider
+    set_cache(None)
+    set_provider(None)
+
+
+def test_late_prefetch_and_caller_share_one_fetch(provider):
+    snapshot = TickerSnapshot("AAA")
+    # the worker is given up on but keeps loading; the caller then asks for the same field
+    assert list(prefetch([snapshot], ["info"], max_workers=1, timeout=0.05)) == ["AAA"]
+    assert snapshot.info["shortName"] == "AAA Corp"
+    assert provider.calls == 1
+
+
+def test_concurrent_callers_share_one_fetch(provider):
+    snapshot = TickerSnapshot("BBB")
+    names = []
+    threads = [threading.Thread(target=lambda: names.append(snapshot.name)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert names == ["BBB Corp"] * 8 and provider.calls == 1
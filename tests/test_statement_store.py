@@ -0,0 +1,89 @@
+"""
+tests/test_statement_store.py
+
+A CompactStatement round-trips to the normalized DataFrame it was built from, and the
+analysis functions give the same results for it as for the DataFrame.
+"""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.growth import get_growth_metrics, growth_panel
+from analysis.performance import calculate_efficiency_metrics
+from analysis.ratios import ratio_history
+from benchmarks.synthetic import quarterly_statement, statement
+from data.line_items import extract_items, normalize_statement, set_frequency, to_float
+from data.statement_store import CompactStatement
+from utils.constants import GROWTH_LABELS
+
+
+def frames(quarterly=False, seed=0):
+    """(financials, balance sheet, cash flow) provider frames with a non-numeric entry and a missing value"""
+    make = quarterly_statement if quarterly else statement
+    result = []
+    for k in range(3):
+        frame = make(n_rows=90, seed=seed + k).astype(object)
+        frame.iloc[k, 1] = "n/a"
+        frame.iloc[k + 5, 0] = None
+        result.append(set_frequency(frame, "quarterly") if quarterly else frame)
+    return result
+
+
+@pytest.mark.parametrize("quarterly", [False, True], ids=["annual", "quarterly"])
+def test_round_trip(quarterly):
+    frame = frames(quarterly)[0]
+    compact = CompactStatement.from_frame(frame)
+    normalized = to_float(normalize_statement(frame))
+    pd.testing.assert_frame_equal(compact.to_frame(), normalized, check_freq=False)
+    assert compact.frequency == ("quarterly" if quarterly else "annual")
+    assert compact.keys == list(normalized.index) and len(compact) == len(normalized)
+
+    for key in ("total_revenue", "net_income", "not_a_key"):
+        assert (key in compact) == (key in normalized.index)
+    np.testing.assert_array_equal(compact.row("net_income"), normalized.loc["net_income"].to_numpy())
+    assert compact.row("not_a_key") is None
+    np.testing.assert_array_equal(compact.extract(["total_revenue", "not_a_key"]),
+                                  extract_items(frame, ["total_revenue", "not_a_key"]).to_numpy())
+
+    copy = pickle.loads(pickle.dumps(compact))
+    pd.testing.assert_frame_equal(copy.to_frame(), compact.to_frame())
+    assert CompactStatement.from_frame(None) is None
+
+
+@pytest.mark.parametrize("quarterly", [False, True], ids=["annual", "quarterly"])
+def test_analysis_matches_frames(quarterly):
+    financials, balance_sheet, cashflow = frames(quarterly, seed=4)
+    compact = [CompactStatement.from_frame(frame) for frame in (financials, balance_sheet, cashflow)]
+
+    pd.testing.assert_frame_equal(ratio_history(*compact[:2]), ratio_history(financials, balance_sheet),
+                                  check_freq=False)
+
+    expected = calculate_efficiency_metrics.uncached(cashflow, financials, balance_sheet)
+    for label, series in calculate_efficiency_metrics.uncached(compact[2], compact[0], compact[1]).items():
+        if expected[label] is None:
+            assert series is None
+        else:
+            pd.testing.assert_series_equal(series, expected[label], check_index_type=False, check_freq=False)
+
+    for label in GROWTH_LABELS:
+        expected = get_growth_metrics.uncached(financials, cashflow, label)
+        actual = get_growth_metrics.uncached(compact[0], compact[2], label)
+        if expected is None:
+            assert actual is None
+        else:
+            pd.testing.assert_series_equal(actual, expected, check_index_type=False, check_freq=False, check_names=False)
+
+    panels = growth_panel.uncached({"AAA": (compact[0], compact[2])}), growth_panel.uncached({"AAA": (financials, cashflow)})
+    for measure in panels[1]:
+        pd.testing.assert_frame_equal(panels[0][measure], panels[1][measure], check_index_type=False, check_freq=False)
+
+
+def test_ratios_with_different_periods():
+    # the balance sheet is missing the oldest period, so the statements are aligned by date
+    financials, balance_sheet, _ = frames(seed=8)
+    balance_sheet = balance_sheet.iloc[:, :-1]
+    compact = ratio_history(CompactStatement.from_frame(financials), CompactStatement.from_frame(balance_sheet))
+    pd.testing.assert_frame_equal(compact, ratio_history(financials, balance_sheet), check_freq=False)
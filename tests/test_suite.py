@@ -0,0 +1,29 @@
+"""
+tests/test_suite.py
+
+Every benchmark suite case runs at the small scale, and compare() flags growth beyond the
+threshold, so the suite stays usable as a regression gate.
+"""
+
+import json
+
+from benchmarks import suite
+
+
+def test_every_case_runs_at_small_scale():
+    result = suite.run(list(suite.CASES), ["small"], repeat=1)
+    assert [r["case"] for r in result["results"]] == list(suite.CASES)
+    assert all(r["seconds"] > 0 and r["peak_bytes"] >= 0 for r in result["results"])
+    json.dumps(result)
+
+
+def test_compare_flags_regressions(capsys):
+    def document(seconds, peak):
+        return {"created": "now", "pandas": "x", "numpy": "x",
+                "results": [{"case": "calculate_ratios", "scale": "small", "seconds": seconds,
+                             "best_seconds": seconds, "peak_bytes": peak}]}
+
+    assert suite.compare(document(1.0, 100), document(1.1, 110), threshold=0.2) == 0
+    assert suite.compare(document(1.0, 100), document(1.5, 100), threshold=0.2) == 1
+    assert suite.compare(document(1.0, 100), document(1.0, 200), threshold=0.2) == 1
+    assert "REGRESSION (memory)" in capsys.readouterr().out
@@ -0,0 +1,188 @@
+"""
+tests/test_trace.py
+
+Spans are recorded only while tracing is on, into the recorder of the run that made them,
+and export as Chrome-trace JSON and Prometheus text that their consumers can load.
+"""
+
+import json
+import threading
+import tracemalloc
+
+import pytest
+
+from data.scheduler import prefetch
+from utils import trace
+
+
+@pytest.fixture
+def tracing():
+    trace.reset()
+    trace.enable(memory=False)
+    yield
+    trace.disable()
+    trace.reset()
+
+
+@trace.traced("compute")
+def compute(fail=False):
+    if fail:
+        raise ValueError("bad input")
+    return 1
+
+
+def test_nothing_recorded_while_off():
+    trace.reset()
+    with trace.span("noop", "fetch"):
+        compute()
+    assert trace.recorded() == []
+
+
+def test_spans_record_stage_thread_and_errors(tracing):
+    with trace.span("load AAPL", "fetch"):
+        compute()
+    with pytest.raises(ValueError):
+        compute(fail=True)
+    worker = threading.Thread(target=compute, name="fetch_0")
+    worker.start()
+    worker.join()
+
+    spans = trace.recorded()
+    assert [(s["name"], s["stage"], s["error"]) for s in spans] == [
+        ("compute", "compute", False), ("load AAPL", "fetch", False),
+        ("compute", "compute", True), ("compute", "compute", False)]
+    assert spans[-1]["thread"] == "fetch_0" and spans[-1]["thread_id"] != spans[0]["thread_id"]
+    # the outer span encloses the inner one
+    assert spans[1]["start_ns"] <= spans[0]["start_ns"]
+    assert spans[1]["start_ns"] + spans[1]["duration_ns"] >= spans[0]["start_ns"] + spans[0]["duration_ns"]
+
+
+def test_memory_peaks_cover_nested_spans():
+    trace.reset()
+    trace.enable(memory=True)
+    try:
+        with trace.span("outer", "compute"):
+            with trace.span("inner", "compute"):
+                block = bytearray(4_000_000)
+            del block
+    finally:
+        trace.disable()
+    peaks = {s["name"]: s["peak_bytes"] for s in trace.recorded()}
+    trace.reset()
+    assert peaks["inner"] >= 4_000_000 and peaks["outer"] >= peaks["inner"]
+
+
+def test_chrome_trace_export(tracing, tmp_path):
+    with trace.span("page", "page"):
+        compute()
+    with pytest.raises(ValueError):
+        compute(fail=True)
+    spans = trace.recorded()
+
+    path = tmp_path / "trace.json"
+    trace.write(str(path), spans)
+    document = json.loads(path.read_text(encoding="utf-8"))
+    assert document == json.loads(json.dumps(trace.chrome_trace(spans)))
+
+    metadata = [e for e in document["traceEvents"] if e["ph"] == "M"]
+    assert [(e["name"], e["args"]["name"]) for e in metadata] == [("thread_name", threading.current_thread().name)]
+    events = [e for e in document["traceEvents"] if e["ph"] == "X"]
+    assert [(e["name"], e["cat"]) for e in events] == [("compute", "compute"), ("page", "page"), ("compute", "compute")]
+    for event, span in zip(events, spans):
+        assert event["ts"] == span["start_ns"] / 1000 and event["dur"] == span["duration_ns"] / 1000
+        assert event["tid"] == span["thread_id"]
+    assert [e["args"] for e in events] == [{}, {}, {"error": True}]
+
+
+def test_prometheus_export(tmp_path):
+    spans = [
+        {"name": 'get "info"', "stage": "fetch", "start_ns": 0, "duration_ns": 2_000_000, "thread_id": 1,
+         "thread": "main", "peak_bytes": None, "error": False},
+        {"name": 'get "info"', "stage": "fetch", "start_ns": 0, "duration_ns": 6_000_000, "thread_id": 1,
+         "thread": "main", "peak_bytes": None, "error": False},
+        {"name": "ratios", "stage": "compute", "start_ns": 0, "duration_ns": 1_000_000, "thread_id": 1,
+         "thread": "main", "peak_bytes": 2048, "error": False},
+    ]
+    text = trace.prometheus_text(spans)
+    lines = text.splitlines()
+    assert text.endswith("\n")
+    assert 'fa_span_seconds_total{stage="fetch",name="get \\"info\\""} 0.008' in lines
+    assert 'fa_span_calls_total{stage="fetch",name="get \\"info\\""} 2' in lines
+    assert 'fa_span_max_seconds{stage="fetch",name="get \\"info\\""} 0.006' in lines
+    # only spans measured with memory have a peak sample
+    assert [line for line in lines if line.startswith("fa_span_peak_bytes{")] == \
+        ['fa_span_peak_bytes{stage="compute",name="ratios"} 2048']
+    for metric, kind in (("fa_span_seconds_total", "counter"), ("fa_span_calls_total", "counter"),
+                         ("fa_span_max_seconds", "gauge"), ("fa_span_peak_bytes", "gauge")):
+        assert f"# TYPE {metric} {kind}" in lines
+
+    path = tmp_path / "trace.prom"
+    trace.write(str(path), spans)
+    assert path.read_text(encoding="utf-8") == text
+
+
+def test_interleaved_recorders_keep_their_own_state():
+    # two app sessions' page runs on their own threads, stepping in turn
+    a_started, b_done = threading.Event(), threading.Event()
+    a = trace.Recorder(memory=True)
+    b = trace.Recorder()
+    seen = {}
+
+    def session_a():
+        with trace.recording(a):
+            with trace.span("a1", "page"):
+                block = bytearray(1_000_000)
+            a_started.set()
+            b_done.wait(5)
+            # the other session turning its panel off and clearing its spans left this one alone
+            seen["a tracing"] = trace.is_enabled() and tracemalloc.is_tracing()
+            with trace.span("a2", "page"):
+                del block
+
+    def session_b():
+        a_started.wait(5)
+        with trace.recording(b):
+            with trace.span("b1", "page"):
+                pass
+            trace.reset()
+            trace.disable()
+            with trace.span("b2", "page"):
+                pass
+        b_done.set()
+
+    threads = [threading.Thread(target=session_a), threading.Thread(target=session_b)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    a.disable()
+
+    assert seen["a tracing"]
+    assert [record[0] for record in a.recorded()] == ["a1", "a2"]
+    assert a.recorded()[0][6] >= 1_000_000
+    assert b.recorded() == []
+    # neither run recorded into the process-wide recorder, and tracemalloc stopped with the last user
+    assert not trace.is_enabled() and trace.recorded() == []
+    assert not tracemalloc.is_tracing()
+
+
+class Snapshot:
+    """a snapshot whose fields are loaded inside a fetch span, as TickerSnapshot's are"""
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    @property
+    def info(self):
+        with trace.span(f"info {self.ticker}", "fetch"):
+            return {}
+
+
+def test_prefetch_workers_record_into_the_callers_recorder():
+    recorder = trace.Recorder()
+    with trace.recording(recorder):
+        assert prefetch([Snapshot("AAA"), Snapshot("BBB")], ["info"], max_workers=2) == {}
+    names = sorted(record[0] for record in recorder.recorded())
+    assert names == ["info AAA", "info BBB"]
+    assert all(record[5].startswith("fetch") for record in recorder.recorded())
+    assert trace.recorded() == []
@@ -0,0 +1,64 @@
+"""
+utils/config.py
+
+Reads runtime settings from environment variables.
+"""
+
+import os
+
+
+def env_flag(name, default=False):
+    """Read a boolean flag from the environment ('1', 'true', 'yes' are truthy)."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# directory for the persistent data cache (SQLite database lives here)
+CACHE_DIR = os.environ.get("FA_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "financial-analyzer"))
+
+# set FA_CACHE=0 to bypass the persistent cache entirely
+CACHE_ENABLED = env_flag("FA_CACHE", True)
+
+# serve only from the cache and never go to the network
+OFFLINE = env_flag("FA_OFFLINE")
+
+# bounded thread pool used to fetch many tickers concurrently
+FETCH_WORKERS = int(os.environ.get("FA_FETCH_WORKERS", "16"))
+
+# price history refresh: 'incremental' (fetch only bars newer than the cached ones) or 'full'
+PRICE_REFRESH = os.environ.get("FA_PRICE_REFRESH", "incremental").strip().lower()
+
+# directory for the memory-mapped columnar price store (data/price_store.py)
+PRICE_STORE_DIR = os.environ.get("FA_PRICE_STORE_DIR", os.path.join(CACHE_DIR, "prices"))
+
+# directory for the sector/industry peer quantile index (analysis/peers.py)
+PEER_INDEX_DIR = os.environ.get("FA_PEER_INDEX_DIR", os.path.join(CACHE_DIR, "peers"))
+
+# seconds to wait for a ticker's data before leaving it out of the page
+FETCH_TIMEOUT = float(os.environ.get("FA_FETCH_TIMEOUT", "20"))
+
+# worker processes rendering batch reports (visuals/report.py); 1 renders in the calling process
+REPORT_WORKERS = int(os.environ.get("FA_REPORT_WORKERS", str(os.cpu_count() or 1)))
+
+# data provider: 'yfinance' (live), 'local' (recorded fixtures) or 'record' (live, saving fixtures)
+PROVIDER = os.environ.get("FA_PROVIDER", "yfinance").strip().lower()
+
+# directory the local provider reads fixtures from and the record provider writes to
+FIXTURE_DIR = os.environ.get("FA_FIXTURE_DIR", "fixtures")
+
+# record timing spans around fetch, cache, compute and render stages (utils/trace.py)
+TRACE_ENABLED = env_flag("FA_TRACE")
+
+# also record each span's tracemalloc peak memory while tracing
+TRACE_MEMORY = env_flag("FA_TRACE_MEMORY")
+
+# memoization backend for analysis functions: 'auto' (Streamlit cache in the app, LRU elsewhere), 'lru', 'disk' or 'none'
+MEMO_BACKEND = os.environ.get("FA_MEMO_BACKEND", "auto").strip().lower()
+
+# max entries in the in-process LRU backend
+MEMO_SIZE = int(os.environ.get("FA_MEMO_SIZE", "512"))
+
+# directory for the disk memoization backend
+MEMO_DIR = os.environ.get("FA_MEMO_DIR", os.path.join(CACHE_DIR, "memo"))
@@ -23,6 +23,13 @@ AT = "Asset Turnover"
 INTEREST_COVERAGE = "Interest Coverage"
 CF_LABELS = [FCF, FCF_MARGIN, OP_MARGIN, AT]
 
+# statement period choices in the app -> TickerSnapshot frequency (see data/periods.py)
+STATEMENT_PERIODS = {"Annual": "annual", "Quarterly": "quarterly", "TTM": "ttm"}
+
+# ratios of a period's flow to a balance at a date, which scale with the period's length: a quarter's
+# ROE or asset turnover is about a quarter of the year's, so they are annualized before being judged
+PERIOD_SCALED = [ROE, AT]
+
 CF_BOUNDS = {
     FCF: None,
     FCF_MARGIN: (.05, .20),  # typical FCF margin is between 5% and 15-20%
@@ -31,6 +38,10 @@ CF_BOUNDS = {
     INTEREST_COVERAGE: (1, None)  # generally, a ratio above 1.5 is considered good
 }
 
+# quantiles of a company's sector or industry peers that bound a metric's normal range
+# (analysis/peers.py); CF_BOUNDS is the fallback when no peer index has been built
+PEER_QUANTILES = (0.1, 0.9)
+
 TRAILING_PE = "Trailing P/E"
 FORWARD_PE = "Forward P/E"
 PEG = "PEG Ratio"
@@ -47,3 +58,38 @@ MAX_DRAWDOWN = "Max Drawdown"
 CUMULATIVE_RETURN = "Cumulative Return"
 STOCK_LABELS = [VOLATILITY, SHARPE_RATIO, MAX_DRAWDOWN, CUMULATIVE_RETURN]
 
+# trailing windows of the multi-horizon stock metrics, each ending at the last bar
+STOCK_HORIZONS = ["1M", "3M", "6M", "YTD", "1Y", "3Y", "5Y"]
+
+# chart intervals and the periods offered for each (Yahoo serves 1m bars for the last 7 days
+# and other intraday bars for the last 60 days, hourly bars for two years)
+CHART_INTERVAL_PERIODS = {
+    "1m": ["1d", "5d"],
+    "5m": ["1d", "5d", "1mo"],
+    "15m": ["5d", "1mo"],
+    "1h": ["1mo", "3mo", "6mo", "1y"],
+    "1d": ["1mo", "3mo", "6mo", "1y", "5y", "max"],
+    "1wk": ["1y", "5y", "max"],
+}
+
+# price charts are downsampled to about this many points per series (roughly a wide chart's
+# width in pixels) and drawn with WebGL once a series has more than CHART_WEBGL_POINTS bars
+CHART_MAX_POINTS = 1200
+CHART_WEBGL_POINTS = 5000
+
+# price fields kept in the columnar price store, one memory-mapped array each
+PRICE_STORE_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+# time-to-live (seconds) for each data type in the persistent cache
+CACHE_TTLS = {
+    "info": 5 * 60,                 # quotes inside .info change by the minute
+    "history": 5 * 60,
+    "financials": 24 * 60 * 60,     # statements change quarterly, daily refresh catches restatements
+    "balance_sheet": 24 * 60 * 60,
+    "cashflow": 24 * 60 * 60,
+    "quarterly_financials": 24 * 60 * 60,
+    "quarterly_balance_sheet": 24 * 60 * 60,
+    "quarterly_cashflow": 24 * 60 * 60,
+    "dividends": 24 * 60 * 60,
+    "earnings": 24 * 60 * 60,
+}
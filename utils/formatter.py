@@ -4,6 +4,14 @@ utils/formatter.py
 Provides formatting utilities for financial data.
 """
 
+from utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# K/M/B/T thresholds of format_large_number, largest first
+LARGE_NUMBER_SUFFIXES = [(1_000_000_000_000, "T"), (1_000_000_000, "B"), (1_000_000, "M"), (1_000, "K")]
+
 def format_delta(current, previous, is_pct=False):
     """Format the change between current and previous values."""
 
@@ -14,6 +22,21 @@ def format_delta(current, previous, is_pct=False):
     else:
         return current - previous
 
+def parse_tickers(text):
+    """Split comma or space separated ticker input into unique upper-case symbols."""
+    if not text:
+        return []
+    symbols = text.replace(",", " ").upper().split()
+    return list(dict.fromkeys(symbols))
+
+def format_period(value):
+    """Format a statement period: a fiscal year, or a period end date for quarterly and TTM statements."""
+    if value is None or value != value:
+        return "-"
+    if hasattr(value, "date"):
+        return value.date().isoformat()
+    return str(value)
+
 def format_currency(value, currency="$", decimals=2):
     """Format a number as currency."""
     if value is None:
@@ -36,18 +59,77 @@ def format_large_number(value):
     else:
         return str(value)
 
-    
+
+def format_large_numbers(values):
+    """
+    format_large_number for a whole array or DataFrame of numbers at once. Each value's suffix is
+    picked with one array comparison per threshold; the strings are then built one value at a
+    time with str.format. Returns strings of the same shape (a DataFrame for a DataFrame).
+    """
+    array = np.asarray(values)
+    numbers = array.astype(float)
+    magnitude = np.abs(numbers)
+
+    scale = np.ones(array.shape)
+    suffix = np.full(array.shape, "", dtype=object)
+    # smallest threshold first, so the largest one a value reaches wins
+    for threshold, letter in reversed(LARGE_NUMBER_SUFFIXES):
+        reached = magnitude >= threshold
+        scale[reached] = threshold
+        suffix[reached] = letter
+
+    # still one str.format call per value, but through map over plain floats rather than a
+    # per-element numpy loop; values below 1,000 are shown as they are
+    strings = np.empty(array.shape, dtype=object)
+    strings.ravel()[:] = list(map("{:.2f}{}".format, (numbers / scale).ravel().tolist(), suffix.ravel().tolist()))
+    unscaled = suffix == ""
+    strings[unscaled] = list(map(str, array[unscaled].tolist()))
+    if isinstance(values, pd.DataFrame):
+        return pd.DataFrame(strings, index=values.index, columns=values.columns)
+    return strings
+
+
+class _FormattedValues(dict):
+    """value -> display string lookup; values not formatted up front (e.g. NaN) fall back to format_large_number"""
+
+    def __missing__(self, value):
+        return format_large_number(value)
+
+
+def style_large_numbers(df, styler=None):
+    """
+    Styler showing the numeric columns of df with K, M, B, T suffixes. The strings are computed
+    for the whole frame with format_large_numbers, so formatting a cell is a dict lookup.
+    """
+    styler = df.style if styler is None else styler
+    numeric = df.select_dtypes(include='number')
+    values = numeric.to_numpy().ravel()
+    lookup = _FormattedValues(zip(values.tolist(), format_large_numbers(values).tolist()))
+    return styler.format(lookup.__getitem__, subset=numeric.columns)
+
+
+def _column_bounds(bounds, columns, missing):
+    """one bound per column from a number or a dict of per-column bounds; missing where there is none"""
+    if not isinstance(bounds, dict):
+        bounds = dict.fromkeys(columns, bounds)
+    return np.array([missing if bounds.get(c) is None else bounds[c] for c in columns], dtype=float)
+
+
 def highlight_df_bounds(df, lower=None, upper=None, low_color='lightcoral', high_color='yellow'):
-    """Highlight DataFrame values outside specified bounds."""
+    """
+    Highlight DataFrame values outside specified bounds.
+    Bounds are numbers applied to every column, or dicts of per-column bounds (e.g. from a PeerIndex).
+    The low/high masks and the CSS of every cell are computed for the whole frame at once.
+    """
 
     numeric_cols = df.select_dtypes(include='number').columns
+    values = df[numeric_cols].to_numpy(dtype=float, na_value=np.nan)
+    low = _column_bounds(lower, numeric_cols, -np.inf)
+    high = _column_bounds(upper, numeric_cols, np.inf)
 
-    def style_func(s):
-        return [
-            f'color: {low_color}' if (lower is not None and v < lower)
-            else f'color: {high_color}' if (upper is not None and v > upper)
-            else ''
-            for v in s
-        ]
+    # 0 in bounds, 1 low, 2 high; NaN compares False both ways, so missing values stay unstyled
+    codes = np.where(values < low, 1, np.where(values > high, 2, 0))
+    css = np.array(['', f'color: {low_color}', f'color: {high_color}'], dtype=object)[codes]
+    styles = pd.DataFrame(css, index=df.index, columns=numeric_cols)
 
-    return df.style.apply(style_func, subset=numeric_cols)
\ No newline at end of file
+    return df.style.apply(lambda _: styles, axis=None, subset=numeric_cols)
@@ -0,0 +1,39 @@
+"""
+utils/lazy.py
+
+Deferred imports for heavy dependencies (pandas, yfinance, plotly).
+"""
+
+import importlib
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is only imported when an attribute is first accessed.
+    Nothing is added to sys.modules until then, so tools that scan sys.modules
+    (inspect, Streamlit's file watcher) don't trigger the import either.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """
+    Return a LazyModule for `name`, letting modules keep `pd.DataFrame`-style usage
+    while pages that never touch the dependency (e.g. the Overview) skip its import cost.
+    """
+    return LazyModule(name)
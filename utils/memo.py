@@ -0,0 +1,250 @@
+"""
+utils/memo.py
+
+Pluggable memoization for the analysis layer.
+Inside the Streamlit app results are cached with st.cache_data; batch jobs and
+workers use an in-process LRU or an on-disk cache instead, so the analysis
+modules never need to import streamlit. Fetched data is tagged with a compact
+fingerprint when it is loaded, so cache lookups don't re-hash whole frames.
+"""
+
+import copy
+import functools
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+from utils.config import MEMO_BACKEND, MEMO_SIZE, MEMO_DIR
+from utils.trace import span
+
+BACKENDS = ["auto", "streamlit", "lru", "disk", "none"]
+
+
+def _streamlit_running():
+    """True when called from a script run by a Streamlit server (never imports streamlit itself)."""
+    if "streamlit" not in sys.modules:
+        return False
+    from streamlit import runtime
+    return runtime.exists()
+
+
+def resolve_backend(backend=MEMO_BACKEND):
+    """Pick the concrete backend; 'auto' means Streamlit inside the app and LRU everywhere else."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown FA_MEMO_BACKEND '{backend}', expected one of {', '.join(BACKENDS)}")
+    if backend == "auto":
+        return "streamlit" if _streamlit_running() else "lru"
+    return backend
+
+
+# compact identities registered for fetched objects: id(obj) -> (weak reference, token)
+_fingerprints = {}
+_fingerprint_lock = threading.Lock()
+
+
+def _forget(key, ref):
+    with _fingerprint_lock:
+        if key in _fingerprints and _fingerprints[key][0] is ref:
+            del _fingerprints[key]
+
+
+def set_fingerprint(obj, token):
+    """
+    Register a compact identity for obj (e.g. ticker, data type and a checksum of the fetched
+    payload), so memoized functions key it by the token instead of hashing its contents.
+    The object must not be modified afterwards. Members of a dict are tagged one by one,
+    as dicts themselves can't be weakly referenced. Returns obj.
+    """
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            set_fingerprint(value, f"{token}/{key}")
+        return obj
+    key = id(obj)
+    try:
+        ref = weakref.ref(obj, lambda ref: _forget(key, ref))
+    except TypeError:
+        return obj
+    with _fingerprint_lock:
+        _fingerprints[key] = (ref, str(token))
+    return obj
+
+
+def get_fingerprint(obj):
+    """the token registered for obj, or None"""
+    entry = _fingerprints.get(id(obj))
+    if entry is not None and entry[0]() is obj:
+        return entry[1]
+    return None
+
+
+def derive_fingerprint(obj, parent, *parts):
+    """tag obj, derived from parent (a slice, column or normalized copy), with parent's token plus parts"""
+    token = get_fingerprint(parent)
+    if token is not None and obj is not parent:
+        set_fingerprint(obj, ":".join([token] + [str(part) for part in parts]))
+    return obj
+
+
+def content_fingerprint(obj):
+    """content hash of obj, for tagging data that didn't come with a cheaper identity"""
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, obj)
+    return h.hexdigest()
+
+
+def _feed(h, obj):
+    """feed a stable representation of obj into hash h"""
+    token = get_fingerprint(obj) if _fingerprints else None
+    if token is not None:
+        h.update(b"fingerprint:" + token.encode())
+        return
+    module = type(obj).__module__
+    if module.startswith("pandas"):
+        import pandas as pd
+        if isinstance(obj, (pd.DataFrame, pd.Series)):
+            h.update(type(obj).__name__.encode())
+            h.update(pickle.dumps(obj.shape))
+            h.update(repr(obj.index.names).encode())
+            if isinstance(obj, pd.DataFrame):
+                h.update(repr(list(obj.columns)).encode())
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+            return
+    if isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for item in obj:
+            _feed(h, item)
+        return
+    if isinstance(obj, dict):
+        h.update(f"dict{len(obj)}".encode())
+        for key in sorted(obj, key=repr):
+            _feed(h, key)
+            _feed(h, obj[key])
+        return
+    h.update(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def make_key(func, args, kwargs):
+    """content hash of a function call, used by the LRU and disk backends"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{func.__module__}.{func.__qualname__}".encode())
+    _feed(h, args)
+    _feed(h, kwargs)
+    return h.hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU of call results."""
+
+    def __init__(self, maxsize=MEMO_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_MISSING = object()
+_lru = LRUCache()
+
+
+def _disk_path(key):
+    return os.path.join(MEMO_DIR, key + ".pkl")
+
+
+def streamlit_cached(func):
+    """
+    func cached with st.cache_data, keyed by make_key instead of Streamlit hashing every argument.
+    Streamlit skips parameters starting with an underscore, so the arguments travel as _args/_kwargs.
+    """
+    import streamlit as st
+
+    def call(key, _args, _kwargs):
+        with span(func.__qualname__, "compute"):
+            return func(*_args, **_kwargs)
+    call.__module__, call.__qualname__ = func.__module__, func.__qualname__
+    cached = st.cache_data(call)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return cached(make_key(func, args, kwargs), args, kwargs)
+    return wrapper
+
+
+def memoize(func):
+    """
+    Cache a pure analysis function with the configured backend (FA_MEMO_BACKEND).
+    Like st.cache_data, callers always get their own copy of the cached result.
+    """
+    streamlit_func = None
+
+    name = func.__qualname__
+
+    def compute(args, kwargs):
+        with span(name, "compute"):
+            return func(*args, **kwargs)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        nonlocal streamlit_func
+        backend = resolve_backend()
+
+        if backend == "streamlit":
+            if streamlit_func is None:
+                streamlit_func = streamlit_cached(func)
+            # the cache span includes the compute span on a miss; the rest is keying, lookup and copying
+            with span(name, "cache"):
+                return streamlit_func(*args, **kwargs)
+
+        if backend == "none":
+            return compute(args, kwargs)
+
+        with span(name, "cache"):
+            key = make_key(func, args, kwargs)
+
+            if backend == "lru":
+                result = _lru.get(key, _MISSING)
+                if result is _MISSING:
+                    result = compute(args, kwargs)
+                    _lru.set(key, result)
+                return copy.deepcopy(result)
+
+            # disk backend
+            path = _disk_path(key)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    return pickle.load(f)
+            result = compute(args, kwargs)
+            os.makedirs(MEMO_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)  # atomic, so concurrent workers never read a partial file
+            return result
+
+    wrapper.uncached = func
+    return wrapper
+
+
+def clear_memo():
+    """Clear the in-process LRU (disk entries are left for FA_MEMO_DIR cleanup)."""
+    _lru.clear()
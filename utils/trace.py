@@ -0,0 +1,276 @@
+"""
+utils/trace.py
+
+Lightweight timing spans around the page, fetch, cache, compute and render stages.
+Spans go to the current Recorder: the process-wide one, on when FA_TRACE is set or
+cli.py runs with --trace, or the one an app page run records into while its debug
+panel is toggled on, so one session's panel never starts, stops or clears another
+session's recording. While the recorder is off, span() hands back one shared no-op
+context manager, so an instrumented call costs a flag check. Recorded spans (wall
+time, thread, and optionally the tracemalloc peak) export as Chrome-trace JSON
+(chrome://tracing, Perfetto) or Prometheus text format.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+from utils.config import TRACE_ENABLED, TRACE_MEMORY
+
+STAGES = ["page", "fetch", "cache", "compute", "render"]
+
+# most recent spans kept, so a long-running traced server doesn't grow without bound
+MAX_SPANS = 100_000
+
+_NULL = contextlib.nullcontext()
+
+_tracemalloc_users = 0  # recorders measuring memory; tracemalloc runs while there is one
+_started_tracemalloc = False
+_lock = threading.Lock()
+_local = threading.local()  # per-thread stack of open memory-tracking spans
+
+
+def _use_tracemalloc(users):
+    """add (1) or remove (-1) a recorder measuring memory, starting or stopping tracemalloc as needed"""
+    global _tracemalloc_users, _started_tracemalloc
+    with _lock:
+        _tracemalloc_users += users
+        if _tracemalloc_users and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracemalloc = True
+        elif not _tracemalloc_users and _started_tracemalloc:
+            tracemalloc.stop()
+            _started_tracemalloc = False
+
+
+class Recorder:
+    """
+    A buffer of recorded spans and whether spans are being recorded into it (with memory peaks or
+    not). tracemalloc is shared by the process, so it runs while any recorder measures memory.
+    """
+
+    def __init__(self, enabled=True, memory=False):
+        self.enabled = False
+        self.memory = False
+        self._spans = deque(maxlen=MAX_SPANS)
+        self._lock = threading.Lock()
+        if enabled:
+            self.enable(memory)
+
+    def enable(self, memory=TRACE_MEMORY):
+        """start recording spans; with memory, also each span's tracemalloc peak (slows allocation-heavy code)"""
+        if memory != (self.enabled and self.memory):
+            _use_tracemalloc(1 if memory else -1)
+        self.enabled, self.memory = True, memory
+
+    def disable(self):
+        """stop recording spans (already recorded ones are kept until reset)"""
+        if self.enabled and self.memory:
+            _use_tracemalloc(-1)
+        self.enabled, self.memory = False, False
+
+    def add(self, record):
+        with self._lock:
+            self._spans.append(record)
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+
+    def recorded(self):
+        with self._lock:
+            return list(self._spans)
+
+
+# the process-wide recorder, and the one spans of the current context (thread or task) go to
+_process = Recorder(enabled=False)
+_current = contextvars.ContextVar("trace_recorder", default=_process)
+
+
+@contextlib.contextmanager
+def recording(recorder):
+    """
+    Record the spans of the enclosed code, and of threads started from it with its context
+    (see data/scheduler.py), into recorder; None keeps the current one.
+    """
+    if recorder is None:
+        yield _current.get()
+        return
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+
+def current():
+    """the Recorder spans are recorded into here"""
+    return _current.get()
+
+
+class _Span:
+    """one timed region; records itself into its recorder when it exits"""
+
+    __slots__ = ("name", "stage", "start", "memory", "recorder")
+
+    def __init__(self, name, stage, recorder):
+        self.name = name
+        self.stage = stage
+        self.recorder = recorder
+        self.memory = recorder.memory and tracemalloc.is_tracing()
+
+    def __enter__(self):
+        if self.memory:
+            # tracemalloc has one peak per process: remember how far the enclosing span has got,
+            # then measure this span's peak from a fresh start
+            current, peak = tracemalloc.get_traced_memory()
+            stack = getattr(_local, "stack", None)
+            if stack is None:
+                stack = _local.stack = []
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            stack.append([current, 0])
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        peak = None
+        if self.memory:
+            _, traced_peak = tracemalloc.get_traced_memory()
+            stack = _local.stack
+            start_memory, inner_peak = stack.pop()
+            traced_peak = max(traced_peak, inner_peak)
+            peak = max(traced_peak - start_memory, 0)
+            if stack:
+                stack[-1][1] = max(stack[-1][1], traced_peak)
+        self.recorder.add((self.name, self.stage, self.start, end - self.start,
+                           threading.get_ident(), threading.current_thread().name, peak, exc[0] is not None))
+        return False
+
+
+def span(name, stage):
+    """Context manager timing a region of one stage (see STAGES); a no-op while the current recorder is off."""
+    recorder = _current.get()
+    if not recorder.enabled:
+        return _NULL
+    return _Span(name, stage, recorder)
+
+
+def traced(stage, name=None):
+    """Decorator timing every call of a function as a span of the given stage."""
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _current.get()
+            if not recorder.enabled:
+                return func(*args, **kwargs)
+            with _Span(label, stage, recorder):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enable(memory=TRACE_MEMORY):
+    """Start recording spans into the current recorder; with memory, also each span's tracemalloc peak."""
+    _current.get().enable(memory)
+
+
+def disable():
+    """Stop recording spans into the current recorder (already recorded ones are kept until reset)."""
+    _current.get().disable()
+
+
+def is_enabled():
+    return _current.get().enabled
+
+
+def reset():
+    """Drop every span of the current recorder."""
+    _current.get().reset()
+
+
+def recorded():
+    """
+    The current recorder's spans as dicts (name, stage, start_ns, duration_ns, thread_id, thread,
+    peak_bytes, error), in the order they finished.
+    """
+    fields = ("name", "stage", "start_ns", "duration_ns", "thread_id", "thread", "peak_bytes", "error")
+    return [dict(zip(fields, s)) for s in _current.get().recorded()]
+
+
+def summary(spans=None):
+    """Per (stage, name) totals: calls, total and max milliseconds and the largest peak, slowest first."""
+    totals = {}
+    for s in recorded() if spans is None else spans:
+        row = totals.setdefault((s["stage"], s["name"]), {"stage": s["stage"], "name": s["name"], "calls": 0,
+                                                          "total_ms": 0.0, "max_ms": 0.0, "peak_bytes": None})
+        ms = s["duration_ns"] / 1e6
+        row["calls"] += 1
+        row["total_ms"] += ms
+        row["max_ms"] = max(row["max_ms"], ms)
+        if s["peak_bytes"] is not None:
+            row["peak_bytes"] = max(row["peak_bytes"] or 0, s["peak_bytes"])
+    return sorted(totals.values(), key=lambda row: -row["total_ms"])
+
+
+def chrome_trace(spans=None):
+    """The spans as a Chrome trace event document (complete events, microseconds), one track per thread."""
+    spans = recorded() if spans is None else spans
+    pid = os.getpid()
+    events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread}}
+              for tid, thread in sorted({(s["thread_id"], s["thread"]) for s in spans})]
+    for s in spans:
+        args = {"error": True} if s["error"] else {}
+        if s["peak_bytes"] is not None:
+            args["peak_bytes"] = s["peak_bytes"]
+        events.append({"name": s["name"], "cat": s["stage"], "ph": "X", "pid": pid, "tid": s["thread_id"],
+                       "ts": s["start_ns"] / 1000, "dur": s["duration_ns"] / 1000, "args": args})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def _label(value):
+    """a Prometheus label value, escaped"""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def prometheus_text(spans=None):
+    """Per-span totals in the Prometheus text exposition format."""
+    rows = summary(spans)
+    metrics = [
+        ("fa_span_seconds_total", "counter", "Wall time spent in instrumented spans.", "total_ms", 1e-3),
+        ("fa_span_calls_total", "counter", "Number of times each span ran.", "calls", 1),
+        ("fa_span_max_seconds", "gauge", "Longest single run of each span.", "max_ms", 1e-3),
+        ("fa_span_peak_bytes", "gauge", "Largest tracemalloc peak of each span.", "peak_bytes", 1),
+    ]
+    lines = []
+    for metric, kind, help_text, field, scale in metrics:
+        samples = [row for row in rows if row[field] is not None]
+        if not samples:
+            continue
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        lines += [f'{metric}{{stage="{_label(row["stage"])}",name="{_label(row["name"])}"}} {row[field] * scale:g}'
+                  for row in samples]
+    return "\n".join(lines) + "\n"
+
+
+def write(path, spans=None):
+    """Write the spans to path: Chrome-trace JSON for .json, Prometheus text otherwise."""
+    with open(path, "w", encoding="utf-8") as f:
+        if path.lower().endswith(".json"):
+            json.dump(chrome_trace(spans), f)
+        else:
+            f.write(prometheus_text(spans))
+
+
+if TRACE_ENABLED:
+    _process.enable()
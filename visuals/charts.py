@@ -6,29 +6,53 @@ Provides charting utilities using Plotly and Streamlit.
 
 import plotly.graph_objects as go
 import streamlit as st
-from data.fetcher import get_price_history
 
-def plot_stocks(ticker: str, ticker2: str = None):
-    """Plot stock price history for one or two tickers."""
-    # fetch 1 year price history (default) for primary ticker and create figure
-    hist = get_price_history(ticker)
+from utils.constants import CHART_MAX_POINTS, CHART_WEBGL_POINTS
+from utils.trace import traced, is_enabled
+from visuals.downsample import downsample
+
+def stock_figure(closes, period="1y", max_points=CHART_MAX_POINTS, method="lttb"):
+    """
+    Closing price figure for one or more tickers, with series longer than max_points downsampled
+    on the server (visuals/downsample.py) and long series drawn with WebGL.
+    Returns the figure, the number of bars and the number of points plotted.
+    """
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=hist.index, y=hist['Close'], name=ticker))
+    bars = points = 0
+    for ticker in closes.columns:
+        series = closes[ticker].dropna()
+        shown = downsample(series, max_points, method) if max_points else series
+        bars, points = bars + len(series), points + len(shown)
+        trace = go.Scattergl if len(series) > CHART_WEBGL_POINTS else go.Scatter
+        fig.add_trace(trace(x=shown.index, y=shown.values, name=ticker))
+
+    fig.update_layout(title=f"{' vs. '.join(closes.columns)} Closing Price ({period.upper()})", xaxis_title="Date", yaxis_title="Price")
+    return fig, bars, points
 
-    # add second ticker if provided
-    if ticker2:
-        hist2 = get_price_history(ticker2)
-        fig.add_trace(go.Scatter(x=hist2.index, y=hist2['Close'], name=ticker2))
-        fig.update_layout(title=f"{ticker} vs. {ticker2} Closing Price (1Y)", xaxis_title="Date", yaxis_title="Price")
+@traced("render")
+def plot_stocks(closes, period="1y", max_points=CHART_MAX_POINTS, method="lttb"):
+    """
+    Plot closing price history for one or more tickers.
+    closes is an already-loaded frame with one column per ticker, e.g. get_price_histories(...)["Close"].
+    The points plotted are shown under the chart, and while tracing (utils/trace.py) also the bytes sent.
+    """
+    fig, bars, points = stock_figure(closes, period, max_points, method)
 
-    else:
-        fig.update_layout(title=f"{ticker} Closing Price (1Y)", xaxis_title="Date", yaxis_title="Price")
-    
     st.plotly_chart(fig, use_container_width=True)
 
-def growth_line_chart(ticker, data, ticker2=None, data2=None):
-    """Create a line chart for growth data for one company"""
-    # Create line chart for growth data
+    caption = f"{bars:,} bars downsampled to {points:,} points ({method})" if points < bars else f"{bars:,} bars"
+    # measuring the payload serializes the figure a second time, so it's only done while tracing
+    if is_enabled():
+        payload = len(fig.to_json())
+        caption += f": {payload / 1024:,.0f} KB sent"
+        if points < bars:
+            caption += f", ~{payload * bars / points / 1024:,.0f} KB without downsampling"
+    st.caption(caption)
+
+    return fig
+
+def growth_figure(ticker, data):
+    """Line figure of one company's growth series (a Series named after its label)."""
     fig = go.Figure()
     fig.add_trace(go.Scatter(
         x=data.index.astype(str), 
@@ -38,7 +62,54 @@ def growth_line_chart(ticker, data, ticker2=None, data2=None):
     ))
 
     fig.update_xaxes(type='category')  # Ensure x-axis is treated as categorical
-    fig.update_layout(title=f"{ticker} {data.name} Growth Over Time", xaxis_title="Year", yaxis_title="Percent Change", yaxis_tickformat=".2%")
+    # quarterly and TTM series are indexed by period end date rather than fiscal year
+    x_title = "Period End" if data.index.dtype.kind == "M" else "Year"
+    fig.update_layout(title=f"{ticker} {data.name} Growth Over Time", xaxis_title=x_title, yaxis_title="Percent Change", yaxis_tickformat=".2%")
+    return fig
+
+@traced("render")
+def growth_line_chart(ticker, data, ticker2=None, data2=None):
+    """Create a line chart for growth data for one company"""
+    fig = growth_figure(ticker, data)
+
+    st.plotly_chart(fig, use_container_width=True)
+
+    return fig
+
+@traced("render")
+def correlation_heatmap(corr, title="Correlation of Daily Returns"):
+    """Heatmap of a ticker x ticker correlation matrix, on a fixed -1..1 color scale."""
+    fig = go.Figure(go.Heatmap(
+        z=corr.values,
+        x=list(corr.columns),
+        y=list(corr.index),
+        zmin=-1,
+        zmax=1,
+        colorscale="RdBu",
+        reversescale=True,
+        hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>",
+    ))
+
+    # label every cell only while the grid is small enough to read
+    if len(corr) <= 15:
+        fig.update_traces(text=corr.round(2).values, texttemplate="%{text}")
+
+    fig.update_layout(title=title, yaxis_autorange="reversed", height=max(400, 20 * len(corr)))
+
+    st.plotly_chart(fig, use_container_width=True)
+
+    return fig
+
+@traced("render")
+def rolling_correlation_chart(rolling, base, window):
+    """Line chart of each ticker's rolling correlation with the base ticker."""
+    fig = go.Figure()
+    for ticker in rolling.columns:
+        series = rolling[ticker].dropna()
+        fig.add_trace(go.Scatter(x=series.index, y=series.values, name=ticker))
+
+    fig.update_layout(title=f"{window}-Day Rolling Correlation with {base}", xaxis_title="Date",
+                      yaxis_title="Correlation", yaxis_range=[-1, 1])
 
     st.plotly_chart(fig, use_container_width=True)
 
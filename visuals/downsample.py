@@ -0,0 +1,73 @@
+"""
+visuals/downsample.py
+
+Server-side downsampling of long price series before they are charted.
+A chart can't show more points than it has pixels, so series are reduced to
+about one point (LTTB) or two points (min/max) per pixel column before being
+sent to the browser.
+"""
+
+import numpy as np
+import pandas as pd
+
+METHODS = ["lttb", "minmax"]
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Positions of the n_out points kept by Largest-Triangle-Three-Buckets: the first and
+    last point, plus from each bucket in between the point forming the largest triangle
+    with the previously kept point and the average of the next bucket.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    mean_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / sizes
+    mean_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / sizes
+    next_x = np.append(mean_x[1:], x[n - 1])
+    next_y = np.append(mean_y[1:], y[n - 1])
+
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[previous] - next_x[i]) * (y[lo:hi] - y[previous])
+                      - (x[previous] - x[lo:hi]) * (next_y[i] - y[previous]))
+        previous = lo + int(np.argmax(area))
+        kept[i + 1] = previous
+    return kept
+
+
+def minmax_indices(y, n_buckets):
+    """positions of the lowest and highest point of each of n_buckets equal buckets, plus the endpoints"""
+    n = len(y)
+    if 2 * n_buckets >= n:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)
+    padded = np.concatenate([y, np.full(size * n_buckets - n, y[-1])]).reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    lows = offsets + padded.argmin(axis=1)
+    highs = offsets + padded.argmax(axis=1)
+    kept = np.concatenate([[0, n - 1], lows, highs])
+    return np.unique(np.minimum(kept, n - 1))
+
+
+def downsample(series, n_out, method="lttb"):
+    """series reduced to about n_out points with the given method, or unchanged if it is already short"""
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}', expected one of {', '.join(METHODS)}")
+    if len(series) <= n_out:
+        return series
+
+    y = series.to_numpy(dtype=np.float64)
+    if method == "minmax":
+        return series.iloc[minmax_indices(y, n_out // 2)]
+
+    index = series.index
+    x = index.asi8.astype(np.float64) if isinstance(index, pd.DatetimeIndex) else np.arange(len(y), dtype=np.float64)
+    return series.iloc[lttb_indices(x, y, n_out)]
@@ -4,8 +4,11 @@ visuals/layout.py
 Provides layout and display utilities for Streamlit.
 """
 
+import json
+
 import streamlit as st
 from data.metric_data import MetricData
+from utils import trace
 
 
 def get_page_header(title, subtitle=None):
@@ -44,6 +47,7 @@ def safe_metricData(m: MetricData, is_second=False):
         st.caption(f"⚠️ {label} not available.")
 
 
+@trace.traced("render")
 def display_MetricData(label, data: dict, insights=None, is_second=False):
     """
     Displays a set of metrics in Streamlit with optional insights.
@@ -64,6 +68,7 @@ def display_MetricData(label, data: dict, insights=None, is_second=False):
             st.markdown("<hr style='margin-top: 5px; margin-bottom: 5px; border: 1px solid #0F1116'>", unsafe_allow_html=True)
 
 
+@trace.traced("render")
 def col_display_metric(tickers, data1, data2):
     """
     Displays two sets of metric data side by side in Streamlit columns.
@@ -76,6 +81,7 @@ def col_display_metric(tickers, data1, data2):
         display_MetricData(tickers[1], data2, is_second=True)
 
 
+@trace.traced("render")
 def col_display_insights(ticker1, data, insights, no_delta=True):
     """
     Displays a set of metrics with insights in Streamlit columns.
@@ -135,3 +141,39 @@ def col_display_insights(ticker1, data, insights, no_delta=True):
                 
                 st.markdown("<hr style='margin-top: 5px; margin-bottom: 5px; border: 1px solid #0F1116;'>", unsafe_allow_html=True)
 
+
+@trace.traced("render")
+def show_table(data):
+    """
+    Displays a DataFrame or Styler with st.dataframe. Styler tables are rendered (CSS and
+    display values of every cell) inside this call, so it is traced as a render stage.
+    """
+    st.dataframe(data)
+
+
+def debug_panel():
+    """
+    Sidebar panel with the time spent per stage and span in this run (see utils/trace.py),
+    an option to track peak memory, and the spans as Chrome-trace JSON and Prometheus text.
+    """
+    spans = trace.recorded()
+    rows = trace.summary(spans)
+
+    with st.sidebar.expander("Debug: Stage Timings", expanded=True):
+        st.checkbox("Track peak memory (tracemalloc)", key="debug_memory")
+
+        # totals per stage; nested spans (a compute inside a cache lookup) count towards both
+        for stage in trace.STAGES:
+            total = sum(row["total_ms"] for row in rows if row["stage"] == stage)
+            if total:
+                st.caption(f"{stage}: {total:,.1f} ms")
+
+        st.dataframe([{"stage": row["stage"], "span": row["name"], "calls": row["calls"],
+                       "total ms": round(row["total_ms"], 2), "max ms": round(row["max_ms"], 2),
+                       "peak KB": None if row["peak_bytes"] is None else round(row["peak_bytes"] / 1024, 1)}
+                      for row in rows], hide_index=True)
+
+        st.download_button("Chrome trace (JSON)", json.dumps(trace.chrome_trace(spans)),
+                           file_name="trace.json", mime="application/json")
+        st.download_button("Prometheus metrics", trace.prometheus_text(spans),
+                           file_name="metrics.prom", mime="text/plain")
@@ -0,0 +1,302 @@
+"""
+visuals/report.py
+
+Renders a standalone HTML or PDF report per ticker, with the ratio, growth,
+valuation, stock and efficiency sections, their commentary and charts.
+Data for every ticker is fetched once in the calling process; reports are then
+rendered on a process pool whose workers receive the loaded data and the peer
+index once, when they start, instead of fetching anything themselves.
+"""
+
+import datetime
+import importlib.util
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import jinja2
+import pandas as pd
+from markupsafe import Markup
+from plotly.offline import get_plotlyjs
+
+from analysis.growth import growth_panel, latest_growth, CAGR_YEARS
+from analysis.insights import ratio_insights, growth_insights, valuation_insights, efficiency_insights
+from analysis.peers import company_bounds, get_peer_index, set_peer_index
+from analysis.performance import calculate_efficiency_metrics, calculate_stock_metrics
+from analysis.ratios import calculate_ratios, calculate_ratio_history, PCT_RATIOS
+from analysis.valuation import get_valuation_metrics
+from data.fetcher import get_price_histories, select_ticker
+from data.scheduler import prefetch, STATEMENT_FIELDS
+from data.snapshot import TickerSnapshot
+from utils.config import REPORT_WORKERS
+from utils.constants import GROWTH_LABELS, CF_BOUNDS, FCF, FCF_MARGIN, OP_MARGIN
+from utils.formatter import format_period, highlight_df_bounds, style_large_numbers
+from visuals.charts import stock_figure, growth_figure
+
+REPORT_FORMATS = ["html", "pdf"]
+
+# written once next to the HTML reports, which load it instead of embedding ~3.5MB each
+PLOTLY_JS = "plotly.min.js"
+
+# outlier colors readable on the report's light background
+LOW_COLOR = "crimson"
+HIGH_COLOR = "darkorange"
+
+TEMPLATE = jinja2.Environment(autoescape=True).from_string("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{{ name }} ({{ ticker }}) Financial Report</title>
+{% if plotly_js %}<script src="{{ plotly_js }}"></script>{% endif %}
+<style>
+  body { font-family: sans-serif; margin: 2rem auto; max-width: 1100px; color: #212D41; }
+  h1 { margin-bottom: 0; }
+  h2 { border-bottom: 3px solid #212D41; padding-bottom: 4px; margin-top: 2.5rem; }
+  .subtitle, .caption { color: #888888; font-size: 0.875rem; }
+  table { border-collapse: collapse; margin: 0.75rem 0; font-size: 0.875rem; }
+  th, td { border-bottom: 1px solid #dddddd; padding: 4px 10px; text-align: right; }
+  td.commentary { text-align: left; max-width: 650px; }
+  section { page-break-inside: avoid; }
+</style>
+</head>
+<body>
+<h1>{{ name }} ({{ ticker }})</h1>
+<p class="subtitle">{{ profile }} &middot; {{ frequency }} statements &middot; generated {{ generated }}</p>
+{% for section in sections %}
+<section>
+<h2>{{ section.title }}</h2>
+{% if section.metrics %}
+<table>
+<tr><th>Metric</th><th>Value</th><th></th></tr>
+{% for metric, value, commentary in section.metrics %}
+<tr><th>{{ metric }}</th><td>{{ value }}</td><td class="commentary">{{ commentary }}</td></tr>
+{% endfor %}
+</table>
+{% endif %}
+{% for block in section.blocks %}{{ block }}
+{% endfor %}
+{% for caption in section.captions %}<p class="caption">{{ caption }}</p>
+{% endfor %}
+{% if not section.metrics and not section.blocks %}<p class="caption">Not available.</p>{% endif %}
+</section>
+{% endfor %}
+</body>
+</html>
+""")
+
+
+def load_report_inputs(tickers, frequency="annual"):
+    """
+    Fetch every ticker's info, statements (as CompactStatements) and last year of prices,
+    concurrently and once. Returns ({ticker: {field: data}}, {ticker: reason} for tickers that failed).
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    snapshots = [TickerSnapshot(t, compact=True, frequency=frequency) for t in tickers]
+    failed = prefetch(snapshots, ["info"] + STATEMENT_FIELDS)
+    histories = get_price_histories([t for t in tickers if t not in failed])
+
+    inputs = {}
+    for snapshot in snapshots:
+        if snapshot.ticker in failed:
+            continue
+        if not snapshot.exists():
+            failed[snapshot.ticker] = "ticker not found"
+            continue
+        prices = None
+        if snapshot.ticker in histories.columns.get_level_values("Ticker"):
+            prices = select_ticker(histories, snapshot.ticker)
+        inputs[snapshot.ticker] = {"info": snapshot.info, "financials": snapshot.financials,
+                                   "balance_sheet": snapshot.balance_sheet, "cashflow": snapshot.cashflow,
+                                   "prices": prices}
+    return inputs, failed
+
+
+def _metric_rows(metrics, insights):
+    """(metric, formatted value, commentary) rows of a MetricData dict"""
+    return [(label, "-" if data.value is None else data.formatted_value(), insights.get(label, ""))
+            for label, data in metrics.items()]
+
+
+def _period_index(index, frequency):
+    """fiscal years for annual results, period end dates otherwise, as in the app"""
+    return index.year if frequency == "annual" else pd.Index(index.date)
+
+
+def _table(styler):
+    return Markup(styler.to_html())
+
+
+def _figure(fig, fmt):
+    """a chart as an interactive plotly div (HTML) or a static SVG (PDF, rendered by kaleido)"""
+    if fmt == "pdf":
+        return Markup(fig.to_image(format="svg").decode("utf-8"))
+    return Markup(fig.to_html(full_html=False, include_plotlyjs=False, config={"displaylogo": False}))
+
+
+def _ratio_section(data, frequency):
+    metrics = calculate_ratios(data["financials"], data["balance_sheet"])
+    history = calculate_ratio_history(data["financials"], data["balance_sheet"])
+    history.index = _period_index(history.index, frequency)
+
+    # highlight ratios outside the normal range of the company's sector or industry peers
+    bounds = {label: company_bounds(label, data["info"], frequency=frequency) for label in history.columns}
+    styled = highlight_df_bounds(history, lower={label: b[0] for label, b in bounds.items()},
+                                 upper={label: b[1] for label, b in bounds.items()},
+                                 low_color=LOW_COLOR, high_color=HIGH_COLOR)
+    styled = (styled.format("{:.2%}", subset=PCT_RATIOS, na_rep="-")
+              .format("{:.2f}", subset=history.columns.difference(PCT_RATIOS), na_rep="-"))
+    groups = sorted({b[2] for b in bounds.values() if b[2]})
+    captions = [f"Ratios outside the normal range of {', '.join(groups)} peers are highlighted."] if groups else []
+    return {"title": "Core Financial Ratios", "metrics": _metric_rows(metrics, ratio_insights(metrics, frequency)),
+            "blocks": [_table(styled)] if len(history) else [], "captions": captions}
+
+
+def _growth_section(ticker, data, fmt):
+    panel = growth_panel({ticker: (data["financials"], data["cashflow"])})
+    reported = [label for label in GROWTH_LABELS if (label, ticker) in panel["value"].columns]
+
+    blocks = []
+    if reported:
+        latest = pd.DataFrame({label: latest_growth(panel, label).loc[ticker] for label in reported}).T.rename(
+            columns={"period": "Period", "growth": "YoY Growth", "cagr": f"{CAGR_YEARS}Y CAGR", "acceleration": "Acceleration"})
+        blocks.append(_table(latest.style.format("{:.2%}", subset=latest.columns.drop("Period"), na_rep="-")
+                             .format(format_period, subset=["Period"])))
+    for label in reported:
+        growth = panel["growth"][(label, ticker)].dropna().rename(label)
+        if len(growth):
+            blocks.append(_figure(growth_figure(ticker, growth), fmt))
+    return {"title": "Growth Metrics", "blocks": blocks, "captions": list(growth_insights(reported).values())}
+
+
+def _valuation_section(data):
+    metrics = get_valuation_metrics(data["info"])
+    return {"title": "Valuation Metrics", "metrics": _metric_rows(metrics, valuation_insights(metrics))}
+
+
+def _stock_section(ticker, data, fmt):
+    prices = data["prices"]
+    if prices is None or prices["Close"].dropna().empty:
+        return {"title": "Stock Performance Metrics"}
+    fig, _, _ = stock_figure(prices[["Close"]].rename(columns={"Close": ticker}))
+    return {"title": "Stock Performance Metrics", "metrics": _metric_rows(calculate_stock_metrics(prices), {}),
+            "blocks": [_figure(fig, fmt)]}
+
+
+def _efficiency_section(data, frequency):
+    metrics = calculate_efficiency_metrics(data["cashflow"], data["financials"], data["balance_sheet"])
+    df = pd.DataFrame({label: series for label, series in metrics.items() if series is not None})
+    if df.empty:
+        return {"title": "Cash Flow & Efficiency"}
+    if frequency == "annual":
+        df.index.name = "Year"
+    else:
+        df.index = pd.Index(df.index.date, name="Period End")
+
+    # each metric's normal range comes from the company's peers, otherwise from the static CF_BOUNDS
+    bounds = {label: company_bounds(label, data["info"], CF_BOUNDS[label], frequency) for label in df.columns if label != FCF}
+    styled = highlight_df_bounds(df, lower={label: b[0] for label, b in bounds.items()},
+                                 upper={label: b[1] for label, b in bounds.items()},
+                                 low_color=LOW_COLOR, high_color=HIGH_COLOR)
+    margins = [label for label in (FCF_MARGIN, OP_MARGIN) if label in df.columns]
+    styled = styled.format("{:.2%}", subset=margins, na_rep="-").format(
+        "{:.2f}", subset=df.columns.difference(margins + [FCF]), na_rep="-")
+    if FCF in df.columns:
+        styled = style_large_numbers(df[[FCF]], styled)
+
+    groups = sorted({b[2] for b in bounds.values() if b[2]})
+    captions = list(efficiency_insights(metrics).values())
+    if groups:
+        captions.append(f"Values outside the normal range of {', '.join(groups)} peers are highlighted.")
+    return {"title": "Cash Flow & Efficiency", "blocks": [_table(styled)], "captions": captions}
+
+
+def ticker_report(ticker, data, frequency="annual", fmt="html"):
+    """Report of one ticker's loaded data (an entry of load_report_inputs) as an HTML document."""
+    info = data["info"]
+    sections = [_ratio_section(data, frequency), _growth_section(ticker, data, fmt), _valuation_section(data),
+                _stock_section(ticker, data, fmt), _efficiency_section(data, frequency)]
+    return TEMPLATE.render(ticker=ticker, name=info.get("shortName", ticker),
+                           profile=" / ".join(info[key] for key in ("sector", "industry") if info.get(key)) or "-",
+                           frequency={"annual": "Annual", "quarterly": "Quarterly", "ttm": "TTM"}[frequency],
+                           generated=datetime.date.today().isoformat(),
+                           plotly_js=PLOTLY_JS if fmt == "html" else None, sections=sections)
+
+
+def _check_format(fmt):
+    """fail early on an unknown format, or on PDF without its optional dependencies"""
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format '{fmt}', expected one of {', '.join(REPORT_FORMATS)}")
+    if fmt == "pdf":
+        missing = [module for module in ("weasyprint", "kaleido") if importlib.util.find_spec(module) is None]
+        if missing:
+            raise RuntimeError(f"PDF reports need {' and '.join(missing)}: pip install -r requirements-pdf.txt")
+
+
+# set in each worker process by _init_worker
+_inputs = {}
+_options = {}
+
+
+def _init_worker(inputs, peer_index, directory, fmt, frequency):
+    """receive the shared data once per worker process"""
+    global _inputs, _options
+    _inputs = inputs
+    _options = {"directory": directory, "fmt": fmt, "frequency": frequency}
+    set_peer_index(peer_index)
+
+
+def _render(ticker):
+    """render one ticker's report to a file in the output directory, returning its path"""
+    html = ticker_report(ticker, _inputs[ticker], _options["frequency"], _options["fmt"])
+    path = os.path.join(_options["directory"], f"{ticker}.{_options['fmt']}")
+    if _options["fmt"] == "pdf":
+        import weasyprint
+        weasyprint.HTML(string=html).write_pdf(path)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+    return path
+
+
+def render_reports(inputs, directory, fmt="html", frequency="annual", workers=REPORT_WORKERS):
+    """
+    Render one report per ticker of load_report_inputs' result into directory, on `workers`
+    processes. Returns ({ticker: path}, {ticker: reason} for reports that failed).
+    """
+    _check_format(fmt)
+    os.makedirs(directory, exist_ok=True)
+    if fmt == "html":
+        with open(os.path.join(directory, PLOTLY_JS), "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+
+    paths, failed = {}, {}
+    shared = (inputs, get_peer_index(), directory, fmt, frequency)
+    if workers <= 1 or len(inputs) <= 1:
+        _init_worker(*shared)
+        for ticker in inputs:
+            try:
+                paths[ticker] = _render(ticker)
+            except Exception as e:
+                failed[ticker] = str(e)
+        return paths, failed
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(inputs)), initializer=_init_worker,
+                             initargs=shared) as executor:
+        futures = {executor.submit(_render, ticker): ticker for ticker in inputs}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            if future.exception() is not None:
+                failed[ticker] = str(future.exception())
+            else:
+                paths[ticker] = future.result()
+    return paths, failed
+
+
+def export_reports(tickers, directory, fmt="html", frequency="annual", workers=REPORT_WORKERS):
+    """
+    Fetch the tickers once and render an HTML or PDF report for each into directory.
+    Returns ({ticker: path}, {ticker: reason} for tickers that failed to load or render).
+    """
+    _check_format(fmt)
+    inputs, failed = load_report_inputs(tickers, frequency)
+    paths, render_failed = render_reports(inputs, directory, fmt, frequency, workers)
+    return paths, {**failed, **render_failed}